@@ -101,6 +101,8 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Match workers on several processes/hosts write to it at once, wait for the lock instead of failing
+        "OPTIONS": {"timeout": 30},
     }
 }
 
@@ -163,4 +165,27 @@ if socket.gethostname() == CS_DEPLOYMENT_HOTNAME:
 REST_FRAMEWORK = {
   'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
   'PAGE_SIZE': 10
-}
\ No newline at end of file
+}
+
+# How many processes simulate_matches in the snake project spreads its runs across (1 runs them in the request)
+SNAKE_SIMULATION_WORKERS = int(os.environ.get("SNAKE_SIMULATION_WORKERS", 1))
+
+# Stored simulation results (SimulationRun) kept at most, and dropped after this many days without being used
+SNAKE_SIMULATION_CACHE_SIZE = 500
+SNAKE_SIMULATION_CACHE_DAYS = 30
+
+# How long a match worker holds a simulation unit (see engine/sim_queue.py) before someone else can claim it
+SNAKE_UNIT_LEASE_SECONDS = 120
+
+# Finished snake match replays are cached here, precompressed, after the first time they're requested
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "snake_replays": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(BASE_DIR, "snake_replay_cache"),
+        "OPTIONS": {"MAX_ENTRIES": 2000},
+    },
+}
+SNAKE_REPLAY_CACHE = "snake_replays"
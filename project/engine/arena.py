@@ -2,8 +2,9 @@
 # Author: Dawson Maska (dawsonwm@bu.edu), 12/2/2025
 # Description: Runs the snake arena matches between specified bots on specified boards. (Runs a single move, let view handle the game loop)
 
-import random
+import time
 from collections import deque
+from .occupancy import SNAKE1, SNAKE2
 
 DIR_DELTAS = {
     "UP":    (0, -1),
@@ -22,74 +23,76 @@ RELATIVE_DELTAS = {
 
 DIRECTIONS = ["UP", "RIGHT", "DOWN", "LEFT"]
 
+# Position of each direction in DIRECTIONS (and in BoardContext.neighbors)
+DIRECTION_INDEX = {name: i for i, name in enumerate(DIRECTIONS)}
 
 
-def first_step_toward_target(head, targets, board, my_body, other_body, obstacles, wrap):
+
+def first_step_toward_target(head, targets, ctx, grid, profile=None):
     """
     Use BFS to find the first absolute direction 
     along a shortest path from head to any apple.
     Returns a direction string, or None if no path exists.
+    profile (an EngineProfile, see instrument.py) counts the searches and the cells they expanded.
     """
 
     if not targets:
         return None
 
-    width, height = board.width, board.height
+    width = ctx.width
+    neighbors = ctx.neighbors
 
-    # Cells we are not allowed to go into
-    blocked = set(obstacles)
-    # Avoid crashing into own body except for current head
-    blocked.update(my_body[1:])
-    # Avoid other snake completely
-    blocked.update(other_body)
+    # Cells we are not allowed to go into are anything taken in the occupancy grid
+    # (obstacles, our own body, the other snake). Our head is the start so it's already visited.
+    cells = grid.cells
 
-    targets = set(targets)
+    targets = {y * width + x for x, y in targets}
 
-    # BFS queue: (position, first_dir_taken) apparently deque is best to use for this for efficiency
+    # BFS queue: (cell index, first_dir_taken) apparently deque is best to use for this for efficiency
     q = deque()
-    visited = set()
+    visited = bytearray(width * ctx.height)
 
     # Start at head, no direction chosen yet
-    q.append((tuple(head), None))
-    visited.add(tuple(head))
+    start = head[1] * width + head[0]
+    q.append((start, None))
+    visited[start] = 1
 
     while q:
-        (x, y), first_dir = q.popleft()
+        i, first_dir = q.popleft()
 
         # If we reached an apple, return the first step that led us here
-        if (x, y) in targets and first_dir is not None:
+        if i in targets and first_dir is not None:
+            if profile is not None:
+                count_bfs(profile, visited, q)
             return first_dir
 
-        # Explore neighbors
-        for dir_name, (dx, dy) in DIR_DELTAS.items():
-            nx = x + dx
-            ny = y + dy
-
-            if wrap:
-                nx %= width
-                ny %= height
-            else:
-                if not (0 <= nx < width and 0 <= ny < height):
-                    continue
-
-            nxt = (nx, ny)
-
-            if nxt in blocked or nxt in visited:
+        # Explore neighbors (precomputed per board, -1 means off the board)
+        for dir_name, j in zip(DIRECTIONS, neighbors[i]):
+            if j < 0 or cells[j] or visited[j]:
                 continue
 
-            visited.add(nxt)
+            visited[j] = 1
 
             # If we have not chosen a first step yet, this neighbor is
             # reached by taking dir_name as the first step.
             if first_dir is None:
-                q.append((nxt, dir_name))
+                q.append((j, dir_name))
             else:
-                q.append((nxt, first_dir))
+                q.append((j, first_dir))
 
     # No path found
+    if profile is not None:
+        count_bfs(profile, visited, q)
     return None
 
 
+def count_bfs(profile, visited, q):
+    """Count a finished search of first_step_toward_target. Every visited cell went through the queue
+    once, so the cells expanded are the visited ones minus the ones still waiting in it."""
+    profile.count("bfs_searches")
+    profile.count("bfs_nodes", visited.count(1) - len(q))
+
+
 def rotate_direction(current, relative):
     """Rotate a direction by a relative move"""
     delta = RELATIVE_DELTAS[relative]
@@ -102,51 +105,39 @@ def manhattan(a, b):
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
 
-def min_self_distance(head, body):
-    """Return the minimum distance from head to any other part of body"""
-    min_distance = float("inf")
-
-    for x, y in body[1:]:
-        distance = abs(head[0] - x) + abs(head[1] - y)
-        if distance < min_distance:
-            min_distance = distance
-
-    return min_distance
-
-def adjacent_self_count(head, body):
-    """Return the count of body segments adjacent to head"""
-    count = 0
-
-    for x, y in body[1:]:
-        distance = abs(head[0] - x) + abs(head[1] - y)
-        if distance == 1:
-            count += 1
-
-    return count
-
-
-def choose_bot_move(bot, my_body, other_body, apples, board, current_dir):
+def choose_bot_move(bot, my_body, other_body, apples, ctx, current_dir, grid, me, rng, field=None, profile=None, state=None):
     """
     Decide LEFT / STRAIGHT / RIGHT based on bot personality.
     Personality attributes are explained in models.py
+    ctx is the BoardContext, grid is the OccupancyGrid for this turn and me is our value in it (SNAKE1 or SNAKE2)
+    rng is the match's random.Random so the match can be played again from its seed
+    field is the turn's AppleDistanceField if there is one, otherwise we BFS from our head
+    profile is an EngineProfile to time the pathfinding in (None unless the match is being profiled)
+    state is the GameState to count the decision in state.random_picks on if the rng picked it
     """
 
     head = my_body[0]
-    obstacles = set(map(tuple, board.board_json.get("obstacles", [])))
-    wrap = board.board_json.get("wrap", False)
+    cells = grid.cells
+    head_neighbors = ctx.neighbors[head[1] * ctx.width + head[0]]
 
     # where should we go to reach an apple?
+    if profile is not None:
+        start = time.perf_counter()
     path_dir = None
-    if apples:
+    if field is not None:
+        step = field.first_step(head_neighbors)
+        if step is not None:
+            path_dir = DIRECTIONS[step]
+    elif apples:
         path_dir = first_step_toward_target(
             head=head,
             targets=apples,
-            board=board,
-            my_body=my_body,
-            other_body=other_body,
-            obstacles=obstacles,
-            wrap=wrap,
+            ctx=ctx,
+            grid=grid,
+            profile=profile,
         )
+    if profile is not None:
+        profile.add("pathfinding", time.perf_counter() - start)
 
     best_score = -float("inf")
     best_moves = []
@@ -156,28 +147,21 @@ def choose_bot_move(bot, my_body, other_body, apples, board, current_dir):
 
         # simulate next head position
         new_dir = rotate_direction(current_dir, rel)
-        dx, dy = DIR_DELTAS[new_dir]
-        nx = head[0] + dx
-        ny = head[1] + dy
-
-        if wrap:
-            nx %= board.width
-            ny %= board.height
-        elif not (0 <= nx < board.width and 0 <= ny < board.height):
+        ni = head_neighbors[DIRECTION_INDEX[new_dir]]
+
+        # off the board (neighbor table already handles wraparound)
+        if ni < 0:
             score -= 1000
             continue
 
-        new_head = (nx, ny)
-
-        # collision checks
-        if (
-            new_head in obstacles
-            or new_head in my_body
-            or new_head in other_body
-        ):
+        # collision checks (obstacles, our body and the other snake are all in the grid)
+        if cells[ni]:
             score -= 1000
             continue
 
+        new_head = ctx.position(ni)
+        nx, ny = new_head
+
         # Strong bonus for following the BFS path toward food if it exists
         if path_dir is not None and new_dir == path_dir:
             # Factor in greediness
@@ -192,21 +176,8 @@ def choose_bot_move(bot, my_body, other_body, apples, board, current_dir):
 
         # caution (local free space)
         free_neighbors = 0
-        for ddx, ddy in DIR_DELTAS.values():
-            tx = new_head[0] + ddx
-            ty = new_head[1] + ddy
-
-            if wrap:
-                tx %= board.width
-                ty %= board.height
-
-            if (
-                0 <= tx < board.width
-                and 0 <= ty < board.height
-                and (tx, ty) not in obstacles
-                and (tx, ty) not in my_body
-                and (tx, ty) not in other_body
-            ):
+        for j in ctx.neighbors[ni]:
+            if j >= 0 and not cells[j]:
                 free_neighbors += 1
 
         score += bot.caution * free_neighbors
@@ -219,10 +190,13 @@ def choose_bot_move(bot, my_body, other_body, apples, board, current_dir):
 
         # circliness (compactness / self adjacency)
         if len(my_body) > 3:
-            min_dist = min_self_distance(new_head, my_body)
-            adj_count = adjacent_self_count(new_head, my_body)
+            # Count body segments next to new_head, not counting our current head
+            adj_count = grid.owned_neighbors(nx, ny, me)
+            if manhattan(head, new_head) == 1:
+                adj_count -= 1
 
-            score += bot.circliness * (2 - min(min_dist, 2))
+            # new_head is never on our body, so the closest segment is either 1 away or 2+ away
+            score += bot.circliness * (1 if adj_count else 0)
             score += bot.circliness * 0.5 * adj_count
 
         # direction bias
@@ -232,7 +206,7 @@ def choose_bot_move(bot, my_body, other_body, apples, board, current_dir):
             score += bot.direction_bias
 
         # chaos
-        score += random.uniform(-bot.chaos, bot.chaos)
+        score += rng.uniform(-bot.chaos, bot.chaos)
 
         # pick best
         if score > best_score:
@@ -241,68 +215,95 @@ def choose_bot_move(bot, my_body, other_body, apples, board, current_dir):
         elif score == best_score:
             best_moves.append(rel)
 
+    if state is not None and (bot.chaos > 0 or len(best_moves) != 1):
+        state.random_picks += 1
+
     if not best_moves:
-        return random.choice(RELATIVE_MOVES)
+        return rng.choice(RELATIVE_MOVES)
+
+    return rng.choice(best_moves)
 
-    return random.choice(best_moves)
 
 
+def next_head(ctx, body, direction):
+    """Return where the head of body ends up moving in direction (wrapped if the board wraps)"""
+    dx, dy = DIR_DELTAS[direction]
+    x, y = body[0]
+    x += dx
+    y += dy
 
-def step_game(prev, bot1, bot2, board):
+    # boundary / wrap handling (should be handled by bot move choice, but just in case)
+    if ctx.wrap:
+        return (x % ctx.width, y % ctx.height)
+    return (x, y)
+
+
+def dies(grid, head, body, me):
+    """Return True if moving the head of body (owned by me in grid) to head kills the snake"""
+    x, y = head
+    if not grid.in_bounds(x, y):
+        return True
+    if grid.is_free(x, y):
+        return False
+    # Moving into our own tail is fine since it moves out of the way this turn
+    if head == body[-1] and grid.owner(x, y) == me and not grid.is_obstacle(x, y):
+        return False
+    return True
+
+
+def step_game(state, bot1, bot2, ctx):
     """
-    prev: MoveEvent instance (previous turn)
+    Advance state (a GameState) by one turn, in place.
     bot1, bot2: Bot model instances
-    board: Board model instance
+    ctx: BoardContext for the Board being played on
 
-    Returns: dict suitable for MoveEvent.objects.create
+    Use state.snapshot() afterwards for a dict suitable for MoveEvent.objects.create
+    If state.profile is set each phase of the turn is timed into it (see instrument.py).
     """
 
-    # unpack previous state 
-    b1_body = list(prev.bot1_body)
-    b2_body = list(prev.bot2_body)
+    # previous state (bodies, apples and grid are updated in place)
+    grid = state.grid
+    rng = state.rng
+    field = state.field
+    b1_body = state.bot1_body
+    b2_body = state.bot2_body
 
-    b1_move = prev.bot1_move
-    b2_move = prev.bot2_move
+    b1_move = state.bot1_move
+    b2_move = state.bot2_move
 
-    b1_alive = prev.bot1_alive
-    b2_alive = prev.bot2_alive
+    b1_alive = state.bot1_alive
+    b2_alive = state.bot2_alive
 
-    apples = list(prev.apple_positions)
+    apples = state.apple_positions
 
-    turn = prev.move_number + 1
+    profile = state.profile
+    if profile is not None:
+        t = time.perf_counter()
+        pathfinding = profile.seconds["pathfinding"]
 
-    # move heads 
-    def next_head(body, direction):
-        dx, dy = DIR_DELTAS[direction]
-        x, y = body[0]
-        return (x + dx, y + dy)
-    
-    # boundary / wrap handling (should be handled by bot move choice, but just in case)
-    def normalize(pos):
-        x, y = pos
-        if board.board_json.get("wrap"):
-            return (x % board.width, y % board.height)
-        return (x, y)
-    
     h1 = None
     h2 = None
     # bot decisions
     if b1_alive:
-        rel1 = choose_bot_move(bot1, b1_body, b2_body, apples, board, b1_move)
+        rel1 = choose_bot_move(bot1, b1_body, b2_body, apples, ctx, b1_move, grid, SNAKE1, rng, field, profile, state)
         new_dir1 = rotate_direction(b1_move, rel1)
-        h1 = next_head(b1_body, new_dir1)
-        h1 = normalize(h1)
+        h1 = next_head(ctx, b1_body, new_dir1)
     else:
         new_dir1 = "NONE"
     
     if b2_alive:
-        rel2 = choose_bot_move(bot2, b2_body, b1_body, apples, board, b2_move)
+        rel2 = choose_bot_move(bot2, b2_body, b1_body, apples, ctx, b2_move, grid, SNAKE2, rng, field, profile, state)
         new_dir2 = rotate_direction(b2_move, rel2)
-        h2 = next_head(b2_body, new_dir2)
-        h2 = normalize(h2)
+        h2 = next_head(ctx, b2_body, new_dir2)
     else:
         new_dir2 = "NONE"
 
+    if profile is not None:
+        # choose_bot_move already put its pathfinding time in, the rest of it is scoring
+        now = time.perf_counter()
+        profile.add("scoring", now - t - (profile.seconds["pathfinding"] - pathfinding))
+        t = now
+
     # check for head on collisions
     if h1 == h2:
         b1_alive = False
@@ -316,26 +317,16 @@ def step_game(prev, bot1, bot2, board):
         b1_alive = False
         b2_alive = False
 
-    # turn board obstacles into list of tuples for checking
-    obstacles = set(map(tuple, board.board_json.get("obstacles", [])))
-
-    def dies(head, body, other_body):
-        if not board.board_json.get("wrap"):
-            if not (0 <= head[0] < board.width and 0 <= head[1] < board.height):
-                return True
-        if head in obstacles:
-            return True
-        if head in body:
-            return True
-        if head in other_body:
-            return True
-        return False
-
-    if b1_alive and dies(h1, b1_body[:-1], b2_body):
+    if b1_alive and dies(grid, h1, b1_body, SNAKE1):
         b1_alive = False
-    if b2_alive and dies(h2, b2_body[:-1], b1_body):
+    if b2_alive and dies(grid, h2, b2_body, SNAKE2):
         b2_alive = False
 
+    if profile is not None:
+        now = time.perf_counter()
+        profile.add("collisions", now - t)
+        t = now
+
     # apple handling
     b1_ate = False
     b2_ate = False
@@ -347,77 +338,78 @@ def step_game(prev, bot1, bot2, board):
         apples.remove(h2)
         b2_ate = True
 
-    # update bodies 
+    # cells taken and vacated this turn, for the distance field
+    blocked = []
+    freed = []
+
+    # update bodies (and the grid, tail first so a head moving into the old tail cell stays marked)
     if b1_alive:
-        b1_body.insert(0, h1)
         if not b1_ate:
-            b1_body.pop()
+            tail = b1_body.pop()
+            grid.vacate(*tail)
+            freed.append(tail)
+        b1_body.appendleft(h1)
+        grid.occupy(h1[0], h1[1], SNAKE1)
+        blocked.append(h1)
 
     if b2_alive:
-        b2_body.insert(0, h2)
         if not b2_ate:
-            b2_body.pop()
-
-    # respawn apples
-    apple_cells = get_apple_cells(board, obstacles)
-
-    while len(apples) < board.food_count:
-        for _ in range(100):
-            p = random.choice(apple_cells)
-            if (
-                p not in apples
-                and p not in b1_body
-                and p not in b2_body
-            ):
-                apples.append(p)
-                break
-
-    # return next MoveEvent data 
-    return {
-        "match": prev.match,
-        "move_number": turn,
-        "bot1_move": new_dir1,
-        "bot2_move": new_dir2,
-        "bot1_body": b1_body,
-        "bot2_body": b2_body,
-        "bot1_alive": b1_alive,
-        "bot2_alive": b2_alive,
-        "apple_positions": apples,
-        "bot1_ate": b1_ate,
-        "bot2_ate": b2_ate,
-    }
-    
+            tail = b2_body.pop()
+            grid.vacate(*tail)
+            freed.append(tail)
+        b2_body.appendleft(h2)
+        grid.occupy(h2[0], h2[1], SNAKE2)
+        blocked.append(h2)
+
+    if profile is not None:
+        now = time.perf_counter()
+        profile.add("bodies", now - t)
+        t = now
+
+    width = ctx.width
+    blocked = [y * width + x for x, y in blocked]
+    freed = [y * width + x for x, y in freed]
+
+    # keep the set of open spawn cells in sync with the grid (a tail can be taken again by a head the same turn)
+    spawnable = state.spawnable
+    spawn_map = ctx.spawn_map
+    cells = grid.cells
+    for i in freed:
+        if spawn_map[i] and not cells[i]:
+            spawnable.add(i)
+    for i in blocked:
+        spawnable.discard(i)
+
+    # respawn apples, one draw each from the open spawn cells. If the snakes have filled every
+    # one of them the board just has fewer apples until something frees up.
+    apple_count = len(apples)
+    while len(apples) < ctx.food_count and spawnable:
+        apples.append(ctx.position(spawnable.pop_random(rng)))
+
+    if profile is not None:
+        now = time.perf_counter()
+        profile.add("respawn", now - t)
+        profile.count("respawn_draws", len(apples) - apple_count)
+        t = now
+
+    # only fix up the part of the distance field around what changed
+    if field is not None:
+        field.update(
+            grid,
+            blocked,
+            freed,
+            [y * width + x for x, y in apples[apple_count:]],
+        )
 
-    
-# Helper function so apples only spawn in the boxes in the two_box_arenas map
-def get_apple_cells(board, obstacles):
-    """Return list of valid apple spawn cells for this board."""
-    board_type = board.board_json.get("type")
-
-    # Special handling for two-box arenas
-    if board_type == "two_box_arenas":
-        w, h = board.width, board.height
-        mid = w // 2
-        cells = []
-
-        # Left box 
-        for x in range(3, mid - 3):
-            for y in range(3, h - 3):
-                if (x, y) not in obstacles:
-                    cells.append((x, y))
-
-        # Right box 
-        for x in range(mid + 3, w - 3):
-            for y in range(3, h - 3):
-                if (x, y) not in obstacles:
-                    cells.append((x, y))
-
-        return cells
-
-    # Default - anywhere that isn't an obstacle
-    cells = []
-    for x in range(board.width):
-        for y in range(board.height):
-            if (x, y) not in obstacles:
-                cells.append((x, y))
-    return cells
+    if profile is not None:
+        profile.add("pathfinding", time.perf_counter() - t)
+        profile.count("turns")
+
+    # write the new turn back into state
+    state.move_number += 1
+    state.bot1_move = new_dir1
+    state.bot2_move = new_dir2
+    state.bot1_alive = b1_alive
+    state.bot2_alive = b2_alive
+    state.bot1_ate = b1_ate
+    state.bot2_ate = b2_ate
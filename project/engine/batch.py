@@ -0,0 +1,518 @@
+# File: batch.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: NumPy batch engine that plays many matches of the same two bots on the same board
+# in lockstep. Every match is a row in a set of arrays (occupancy grids, snake bodies, apples) and
+# each turn is a handful of array operations over all rows at once instead of a Python loop per match.
+# The bots make their decisions the same way choose_bot_move does (same scoring terms and tie
+# breaking), but the random numbers come from one numpy Generator for the whole batch, so the
+# individual matches aren't the same ones run_match would play for a seed. The statistics are.
+
+import numpy as np
+from .context import get_board_context
+from .occupancy import EMPTY, OBSTACLE, SNAKE1, SNAKE2, NEIGHBOR_DELTAS
+from .seeding import new_seed, derive_seed
+from .confidence import DEFAULT_CONFIDENCE, WinRateEstimate
+
+# How many matches go into one batch. Memory is a few arrays of batch size x board cells.
+BATCH_SIZE = 512
+
+# Batch size in adaptive mode, so it can stop without overshooting by hundreds of runs
+ADAPTIVE_BATCH_SIZE = 64
+
+# Relative moves in RELATIVE_MOVES order (LEFT, STRAIGHT, RIGHT) as turns through DIRECTIONS
+REL_TURNS = np.array([-1, 0, 1])
+
+# direction_bias is taken off LEFT and added to RIGHT
+REL_BIAS = np.array([-1.0, 0.0, 1.0])
+
+# Distance of a cell no apple can be reached from
+UNREACHED = np.iinfo(np.int32).max
+
+# For shifting the packed bit rows the BFS works on (see BatchMatches._pack)
+ONE = np.uint64(1)
+TOP_BIT = np.uint64(63)
+
+# Shrink the arrays down to the running matches once fewer than this fraction of the rows are still going
+COMPACT_BELOW = 0.75
+
+
+class BatchBoard:
+    """A BoardContext as numpy arrays. Cell indexes are y * width + x like everywhere else, plus one
+    extra "off the board" cell at index n that is always occupied so lookups never need a bounds check"""
+
+    def __init__(self, ctx):
+        width, height = ctx.width, ctx.height
+        n = width * height
+        self.ctx = ctx
+        self.n = n
+
+        # Neighbor table (UP, RIGHT, DOWN, LEFT), wraparound included, off the board goes to n
+        nbr = np.array(ctx.neighbors, dtype=np.int64).reshape(n, 4)
+        nbr[nbr < 0] = n
+        self.neighbors = np.vstack([nbr, np.full((1, 4), n)])
+
+        # Same thing without wraparound, for circliness (OccupancyGrid.owned_neighbors doesn't wrap)
+        cells = np.arange(n)
+        xs = cells % width
+        ys = cells // width
+        flat = np.full((n + 1, 4), n)
+        for d, (dx, dy) in enumerate(NEIGHBOR_DELTAS):
+            nx = xs + dx
+            ny = ys + dy
+            ok = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+            flat[:n, d][ok] = (ny * width + nx)[ok]
+        self.flat_neighbors = flat
+
+        self.xs = np.append(xs, 0)
+        self.ys = np.append(ys, 0)
+
+        # 64 bit words per board row in the packed grids of the apple BFS, and the bit of the last column
+        self.words = (width + 63) // 64
+        self.last_bit = np.uint64((width - 1) % 64)
+
+        self.base = np.append(np.frombuffer(bytes(ctx.obstacle_map), dtype=np.uint8), np.uint8(OBSTACLE))
+
+        self.spawn = np.zeros(n + 1, dtype=bool)
+        for x, y in ctx.spawn_cells:
+            self.spawn[y * width + x] = True
+
+        self.start = [
+            np.array([y * width + x for x, y in ctx.start1], dtype=np.int64),
+            np.array([y * width + x for x, y in ctx.start2], dtype=np.int64),
+        ]
+
+
+class BatchMatches:
+    """k matches between bot1 and bot2 on board (a BatchBoard), all advanced one turn at a time by step()"""
+
+    def __init__(self, board, bot1, bot2, k, rng):
+        n = board.n
+        self.board = board
+        self.bots = (bot1, bot2)
+        self.rng = rng
+        self.k = k
+        self.turn = 0
+
+        # Original match number of every row (rows get dropped as matches finish)
+        self.ids = np.arange(k)
+
+        # Occupancy grid per match, same values as OccupancyGrid, column n is "off the board"
+        self.occ = np.tile(board.base, (k, 1))
+
+        # Bodies are ring buffers: head at heads[s], the body runs backwards from there for lengths[s] cells
+        self.bodies = []
+        self.heads = []
+        self.lengths = []
+        for s, owner in ((0, SNAKE1), (1, SNAKE2)):
+            start = board.start[s]
+            buf = np.zeros((k, n), dtype=np.int64)
+            buf[:, :len(start)] = start[::-1]
+            self.bodies.append(buf)
+            self.heads.append(np.full(k, len(start) - 1))
+            self.lengths.append(np.full(k, len(start)))
+            self.occ[:, start] = owner
+
+        # Starting directions, same as GameState.start (RIGHT and LEFT)
+        self.dirs = [np.full(k, 1), np.full(k, 3)]
+        self.alive = [np.ones(k, dtype=bool), np.ones(k, dtype=bool)]
+
+        self.apples = np.zeros((k, n + 1), dtype=bool)
+        self.apples_eaten = [np.zeros(k, dtype=np.int64), np.zeros(k, dtype=np.int64)]
+        self.survival = [np.zeros(k, dtype=np.int64), np.zeros(k, dtype=np.int64)]
+        self.turns = np.zeros(k, dtype=np.int64)
+
+        # Finished matches are copied out here by match number
+        self.results = {
+            "apples_a": np.zeros(k, dtype=np.int64),
+            "apples_b": np.zeros(k, dtype=np.int64),
+            "a_survival_time": np.zeros(k, dtype=np.int64),
+            "b_survival_time": np.zeros(k, dtype=np.int64),
+            "total_turns": np.zeros(k, dtype=np.int64),
+        }
+
+        self._respawn(np.arange(k))
+
+    def running(self):
+        """Number of matches still going"""
+        return int((self.alive[0] | self.alive[1]).sum())
+
+    def _tails(self, s):
+        rows = np.arange(len(self.ids))
+        return self.bodies[s][rows, (self.heads[s] - self.lengths[s] + 1) % self.board.n]
+
+    def _head_cells(self, s):
+        rows = np.arange(len(self.ids))
+        return self.bodies[s][rows, self.heads[s]]
+
+    def _respawn(self, rows):
+        """Top up the apples of rows to food_count, each new apple a uniform draw from the free spawn cells"""
+        food = self.board.ctx.food_count
+        need = food - self.apples[rows].sum(axis=1)
+        rows = rows[need > 0]
+        need = need[need > 0]
+
+        while len(rows):
+            candidates = self.board.spawn & (self.occ[rows] == EMPTY) & ~self.apples[rows]
+            keys = self.rng.random(candidates.shape)
+            keys[~candidates] = -1.0
+            cells = keys.argmax(axis=1)
+
+            # A match with no free cell left just has fewer apples until one frees up
+            ok = candidates[np.arange(len(rows)), cells]
+            self.apples[rows[ok], cells[ok]] = True
+
+            need = need - 1
+            keep = ok & (need > 0)
+            rows = rows[keep]
+            need = need[keep]
+
+    def _pack(self, cells):
+        """rows x n bools as bit rows (rows x height x words uint64), cell x of a board row is bit x % 64 of word x // 64"""
+        board = self.board
+        ctx = board.ctx
+        bits = np.zeros((len(cells), ctx.height, board.words * 64), dtype=bool)
+        bits[:, :, :ctx.width] = cells[:, :board.n].reshape(len(cells), ctx.height, ctx.width)
+        return np.packbits(bits, axis=2, bitorder="little").view("<u8")
+
+    def _spread(self, frontier):
+        """
+        Every cell next to a frontier cell (frontier is packed like _pack), same adjacency as BoardContext.neighbors.
+        Bits shifted into the padding past the last column land on cells that are never free, so they go away with & free.
+        """
+        board = self.board
+        reach = frontier << ONE
+        reach[:, :, 1:] |= frontier[:, :, :-1] >> TOP_BIT
+        reach |= frontier >> ONE
+        reach[:, :, :-1] |= frontier[:, :, 1:] << TOP_BIT
+        reach[:, 1:, :] |= frontier[:, :-1, :]
+        reach[:, :-1, :] |= frontier[:, 1:, :]
+        if board.ctx.wrap:
+            reach[:, 0, :] |= frontier[:, -1, :]
+            reach[:, -1, :] |= frontier[:, 0, :]
+            reach[:, :, 0] |= (frontier[:, :, -1] >> board.last_bit) & ONE
+            reach[:, :, -1] |= (frontier[:, :, 0] & ONE) << board.last_bit
+        return reach
+
+    def _apple_distances(self, heads):
+        """
+        Multi-source BFS from every apple over the free cells of every match at once.
+        Returns (rows x 2 x 4) distances to the closest apple from the cells around both heads
+        (UNREACHED if there's no path or it's off the board). It stops as soon as every live snake
+        has a reachable neighbor, since the closest neighbor is all choose_bot_move needs.
+        The grids are packed 64 cells to a word so every level of the search is a few word operations
+        per board row instead of one per cell, which is what keeps it fast on the big boards.
+        """
+        board = self.board
+        n = board.n
+
+        free = self._pack(self.occ == EMPTY)
+        visited = self._pack(self.apples)
+        frontier = visited
+
+        # the cells around each head, off the board ones are never reached
+        watch = np.concatenate([board.neighbors[h] for h in heads], axis=1)
+        on_board = watch < n
+        watch_y = board.ys[watch]
+        watch_word = board.xs[watch] >> 6
+        watch_bit = (board.xs[watch] & 63).astype(np.uint64)
+        dist = np.full(watch.shape, UNREACHED, dtype=np.int32)
+
+        # rows still being searched, and their part of watch/dist
+        rows = np.arange(len(self.ids))
+        row_dist = dist.copy()
+        needs = np.stack([self.alive[0], self.alive[1]], axis=1)
+        level = 0
+        while True:
+            words = visited[np.arange(len(rows))[:, None], watch_y, watch_word]
+            hit = ((words >> watch_bit) & ONE).astype(bool) & on_board & (row_dist == UNREACHED)
+            row_dist[hit] = level
+
+            reached = row_dist < UNREACHED
+            done = ((reached[:, :4].any(axis=1) | ~needs[:, 0]) & (reached[:, 4:].any(axis=1) | ~needs[:, 1]))
+            keep = ~done & frontier.any(axis=(1, 2))
+            if not keep.all():
+                dist[rows[~keep]] = row_dist[~keep]
+                rows = rows[keep]
+                if not len(rows):
+                    break
+                row_dist = row_dist[keep]
+                watch_y = watch_y[keep]
+                watch_word = watch_word[keep]
+                watch_bit = watch_bit[keep]
+                on_board = on_board[keep]
+                needs = needs[keep]
+                frontier = frontier[keep]
+                visited = visited[keep]
+                free = free[keep]
+
+            level += 1
+            frontier = self._spread(frontier) & free & ~visited
+            visited |= frontier
+
+        return dist.reshape(len(self.ids), 2, 4)
+
+    def _choose(self, s, heads, dist):
+        """Vectorized choose_bot_move for snake s in every row. Returns the new direction and head cell per row."""
+        board = self.board
+        bot = self.bots[s]
+        owner = SNAKE1 if s == 0 else SNAKE2
+        rng = self.rng
+        occ = self.occ
+        k = len(self.ids)
+        rows = np.arange(k)
+
+        head = heads[s]
+        other = heads[1 - s]
+        nb = board.neighbors[head]
+
+        # BFS direction: the neighbor closest to an apple, ties go to the first one in DIRECTIONS order,
+        # which is the same first step first_step_toward_target finds
+        nd = dist[:, s]
+        path_dir = nd.argmin(axis=1)
+        has_path = nd.min(axis=1) < UNREACHED
+
+        new_dirs = (self.dirs[s][:, None] + REL_TURNS) % 4
+        ni = np.take_along_axis(nb, new_dirs, axis=1)
+
+        # off the board or occupied moves are never picked (unless nothing else is possible)
+        valid = np.take_along_axis(occ, ni, axis=1) == EMPTY
+
+        score = np.zeros((k, 3))
+
+        # greediness
+        score += bot.greediness * 3.0 * ((new_dirs == path_dir[:, None]) & has_path[:, None])
+
+        # caution (free cells around the new head)
+        score += bot.caution * (occ[rows[:, None, None], board.neighbors[ni]] == EMPTY).sum(axis=2)
+
+        # introversion (manhattan distance to the other head, no wraparound, same as manhattan())
+        hx, hy = board.xs[head], board.ys[head]
+        ox, oy = board.xs[other], board.ys[other]
+        nx, ny = board.xs[ni], board.ys[ni]
+        before = np.abs(hx - ox) + np.abs(hy - oy)
+        after = np.abs(nx - ox[:, None]) + np.abs(ny - oy[:, None])
+        score += bot.introversion * (after - before[:, None])
+
+        # circliness (own body next to the new head, not counting the current head)
+        owned = (occ[rows[:, None, None], board.flat_neighbors[ni]] == owner).sum(axis=2)
+        owned -= (np.abs(nx - hx[:, None]) + np.abs(ny - hy[:, None])) == 1
+        circliness = bot.circliness * ((owned > 0) + 0.5 * owned)
+        score += np.where((self.lengths[s] > 3)[:, None], circliness, 0.0)
+
+        # direction bias and chaos
+        score += bot.direction_bias * REL_BIAS
+        score += rng.uniform(-bot.chaos, bot.chaos, size=(k, 3))
+
+        # best valid move, random among ties, random among all three if none are valid
+        score[~valid] = -np.inf
+        best = score.max(axis=1)
+        ties = valid & (score == best[:, None])
+        ties[~valid.any(axis=1)] = True
+        keys = rng.random((k, 3))
+        keys[~ties] = -1.0
+        pick = keys.argmax(axis=1)
+
+        new_dir = new_dirs[rows, pick]
+        return new_dir, nb[rows, new_dir]
+
+    def step(self):
+        """Advance every running match one turn, same rules as step_game"""
+        n = self.board.n
+        base = self.board.base
+        occ = self.occ
+        rows = np.arange(len(self.ids))
+
+        heads = [self._head_cells(0), self._head_cells(1)]
+        dist = self._apple_distances(heads)
+
+        was_alive = [a.copy() for a in self.alive]
+        new_dirs = [None, None]
+        new_heads = [None, None]
+        for s in (0, 1):
+            new_dirs[s], new_heads[s] = self._choose(s, heads, dist)
+
+        # dead snakes get a head that never matches anything
+        h1 = np.where(was_alive[0], new_heads[0], -1)
+        h2 = np.where(was_alive[1], new_heads[1], -2)
+
+        # head on and crossing collisions
+        crash = (h1 == h2) | ((h1 == heads[1]) & (h2 == heads[0]))
+        alive = [was_alive[0] & ~crash, was_alive[1] & ~crash]
+
+        # walls, bodies and the edge of the board (your own tail is fine, it moves out of the way)
+        for s, owner, h in ((0, SNAKE1, h1), (1, SNAKE2, h2)):
+            cell_idx = np.where(alive[s], h, n)
+            cell = occ[rows, cell_idx]
+            own_tail = (cell_idx == self._tails(s)) & (cell == owner) & (base[cell_idx] == EMPTY)
+            alive[s] &= (cell == EMPTY) | own_tail
+
+        # apples and bodies, bot 1 first like step_game
+        for s, owner, h in ((0, SNAKE1, h1), (1, SNAKE2, h2)):
+            moving = alive[s]
+            ate = moving & self.apples[rows, np.where(moving, h, n)]
+            self.apples[rows[ate], h[ate]] = False
+            self.apples_eaten[s] += ate
+
+            shrink = moving & ~ate
+            tails = self._tails(s)[shrink]
+            occ[rows[shrink], tails] = base[tails]
+            self.lengths[s][shrink] -= 1
+
+            grow = rows[moving]
+            self.heads[s][grow] = (self.heads[s][grow] + 1) % n
+            self.bodies[s][grow, self.heads[s][grow]] = h[grow]
+            self.lengths[s][grow] += 1
+            occ[grow, h[grow]] = owner
+
+            self.dirs[s] = np.where(moving, new_dirs[s], self.dirs[s])
+            self.alive[s] = moving
+
+        self.turn += 1
+        self.turns[was_alive[0] | was_alive[1]] += 1
+        for s in (0, 1):
+            self.survival[s][self.alive[s]] = self.turn
+
+        self._respawn(rows[self.alive[0] | self.alive[1]])
+
+        # Compact once enough matches have finished
+        running = self.alive[0] | self.alive[1]
+        if running.sum() < COMPACT_BELOW * len(running):
+            self._keep(running)
+
+    def _save(self, rows):
+        """Copy the results of rows out by match number"""
+        ids = self.ids[rows]
+        self.results["apples_a"][ids] = self.apples_eaten[0][rows]
+        self.results["apples_b"][ids] = self.apples_eaten[1][rows]
+        self.results["a_survival_time"][ids] = self.survival[0][rows]
+        self.results["b_survival_time"][ids] = self.survival[1][rows]
+        self.results["total_turns"][ids] = self.turns[rows]
+
+    def _keep(self, keep):
+        """Save the results of the rows not in keep and drop them from every array"""
+        self._save(np.flatnonzero(~keep))
+
+        self.ids = self.ids[keep]
+        self.turns = self.turns[keep]
+        self.occ = self.occ[keep]
+        self.apples = self.apples[keep]
+        for s in (0, 1):
+            self.bodies[s] = self.bodies[s][keep]
+            self.heads[s] = self.heads[s][keep]
+            self.lengths[s] = self.lengths[s][keep]
+            self.dirs[s] = self.dirs[s][keep]
+            self.alive[s] = self.alive[s][keep]
+            self.apples_eaten[s] = self.apples_eaten[s][keep]
+            self.survival[s] = self.survival[s][keep]
+
+    def play(self, max_turns):
+        """Play every match out, returns the results dict of arrays (one entry per match)"""
+        while self.turn < max_turns and self.running():
+            self.step()
+        self._save(np.arange(len(self.ids)))
+        return self.results
+
+
+def simulate_batch(bot1, bot2, board, num_runs, seed=None, max_turns=5000, batch_size=BATCH_SIZE,
+                   margin=None, apples_margin=None, confidence=DEFAULT_CONFIDENCE):
+    """
+    Simulate num_runs matches between bot1 and bot2 on board with the batch engine.
+    Returns the same results dict as simulate_matches.
+    margin / apples_margin turn on the same adaptive mode as simulate_matches, checked after each batch
+    (of at most ADAPTIVE_BATCH_SIZE runs, so the same seed plays different runs than without it).
+    """
+    results = None
+    for results in iter_batch(bot1, bot2, board, num_runs, seed, max_turns, batch_size, margin, apples_margin, confidence):
+        pass
+    return results
+
+
+def iter_batch(bot1, bot2, board, num_runs, seed=None, max_turns=5000, batch_size=BATCH_SIZE,
+               margin=None, apples_margin=None, confidence=DEFAULT_CONFIDENCE):
+    """
+    simulate_batch one batch at a time, like iter_simulation. Yields the results dict so far after every
+    batch, the last one has "adaptive" filled in too. Closing it early stops before the next batch.
+    """
+    if seed is None:
+        seed = new_seed()
+
+    adaptive = margin is not None or apples_margin is not None
+    if adaptive:
+        batch_size = min(batch_size, ADAPTIVE_BATCH_SIZE)
+    estimate = WinRateEstimate()
+
+    batch_board = BatchBoard(get_board_context(board))
+
+    totals = {"apples_a": [], "apples_b": [], "a_survival_time": [], "b_survival_time": [], "total_turns": []}
+
+    done = 0
+    batch = 0
+    while done < num_runs:
+        k = min(batch_size, num_runs - done)
+        rng = np.random.default_rng(derive_seed(seed, batch))
+        played = BatchMatches(batch_board, bot1, bot2, k, rng).play(max_turns)
+
+        for key, arrays in totals.items():
+            arrays.append(played[key])
+        done += k
+        batch += 1
+
+        estimate.add_totals(
+            k,
+            int((played["apples_a"] > played["apples_b"]).sum()),
+            int((played["apples_b"] > played["apples_a"]).sum()),
+            int(played["apples_a"].sum()),
+            int((played["apples_a"].astype(np.int64) ** 2).sum()),
+            int(played["apples_b"].sum()),
+            int((played["apples_b"].astype(np.int64) ** 2).sum()),
+        )
+        results = _batch_results(bot1, bot2, seed, {key: np.concatenate(arrays) for key, arrays in totals.items()})
+        estimate.report(results, confidence)
+
+        finished = done >= num_runs or (adaptive and estimate.precise_enough(margin, apples_margin, confidence))
+        if finished and adaptive:
+            results["adaptive"] = {
+                "margin": margin,
+                "apples_margin": apples_margin,
+                "max_runs": num_runs,
+                "stopped_early": done < num_runs,
+            }
+        yield results
+        if finished:
+            break
+
+
+def _batch_results(bot1, bot2, seed, played):
+    """simulate_matches style results dict from the per run arrays of every batch so far"""
+    apples_a = played["apples_a"]
+    apples_b = played["apples_b"]
+    wins_a = int((apples_a > apples_b).sum())
+    wins_b = int((apples_b > apples_a).sum())
+    draws = len(apples_a) - wins_a - wins_b
+
+    return {
+        "seed": seed,
+        "bot1": {
+            "name": bot1.name,
+            "color": bot1.color,
+            "wins": wins_a,
+            "losses": wins_b,
+            "draws": draws,
+            "avg_turns": float(played["a_survival_time"].mean()),
+            "avg_apples": float(apples_a.mean()),
+        },
+        "bot2": {
+            "name": bot2.name,
+            "color": bot2.color,
+            "wins": wins_b,
+            "losses": wins_a,
+            "draws": draws,
+            "avg_turns": float(played["b_survival_time"].mean()),
+            "avg_apples": float(apples_b.mean()),
+        },
+        # No termination policies here, every run plays out (SimulationForm doesn't allow both)
+        "termination": [],
+        "terminated_by": {},
+        "avg_total_turns": float(played["total_turns"].mean()),
+        "adaptive": None,
+    }
@@ -0,0 +1,285 @@
+# File: benchmarks.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Engine benchmark suite behind the bench_suite command. Times step_game, choose_bot_move,
+# first_step_toward_target, get_apple_cells, apple respawns, every board generator and whole
+# run_match(simulate=True) matches across board types, sizes, apple counts and snake lengths.
+# Everything is seeded so every run does exactly the same work and only the speed can change.
+# Results are {case name: {"value": ops/sec, "unit": ...}} so they can be saved as JSON and
+# compared against a baseline from an earlier run.
+
+import json
+import platform
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from ..forms import BOARD_TYPES
+from ..models import Bot, Board
+from .arena import choose_bot_move, first_step_toward_target, step_game
+from .board_generator import generate_board
+from .context import get_board_context, get_apple_cells
+from .distance import AppleDistanceField
+from .occupancy import OccupancyGrid, FreeCellSet, SNAKE1
+from .run_match import run_match
+from .state import GameState
+
+# Same greedy, careful bots as the other bench_* commands, so the snakes actually get long
+BENCH_BOTS = (
+    dict(name="Greedy", greediness=2.0, caution=1.0, direction_bias=0.0, circliness=0.5, introversion=0.5, chaos=0.05),
+    dict(name="Hungry", greediness=1.8, caution=1.2, direction_bias=0.2, circliness=0.3, introversion=0.8, chaos=0.05),
+)
+
+SEED = 412
+
+# Default tolerance for compare(), 0.10 means anything more than 10% slower than the baseline fails
+DEFAULT_TOLERANCE = 0.10
+
+# The matrix the full suite runs, quick runs the first entry of each
+MATCH_BOARD_TYPES = ("open", "inner_maze", "scattered_blocks", "two_box_arenas")
+MATCH_WIDTHS = (40, 100)
+MATCH_APPLES = (10, 1)
+SNAKE_LENGTHS = (8, 24, 48)
+GENERATOR_WIDTHS = (40, 100)
+
+
+def bench_bots():
+    """The two unsaved bots every case plays with"""
+    return Bot(**BENCH_BOTS[0]), Bot(**BENCH_BOTS[1])
+
+
+def bench_board(board_type, width, apples, wrap=False):
+    """An unsaved board_type board, nothing in the suite touches the database"""
+    height = int(width * 0.6)  # 5:3 aspect ratio, same as CreateBoardView
+    return Board(
+        name="bench",
+        width=width,
+        height=height,
+        food_count=apples,
+        board_json=generate_board(board_type, width, height, wrap, SEED),
+    )
+
+
+def time_step_game(ctx, bot1, bot2, matches, max_turns):
+    """Play matches seeded matches with step_game directly, returns (turns, seconds)"""
+    turns = 0
+    elapsed = 0.0
+    for i in range(matches):
+        state = GameState.start(ctx, SEED + i)
+        start = time.perf_counter()
+        for _ in range(max_turns):
+            if not (state.bot1_alive or state.bot2_alive):
+                break
+            step_game(state, bot1, bot2, ctx)
+        elapsed += time.perf_counter() - start
+        turns += state.move_number
+    return turns, elapsed
+
+
+def time_run_match(board, bot1, bot2, matches, max_turns):
+    """Play matches seeded run_match(simulate=True) calls, returns (turns, seconds)"""
+    turns = 0
+    start = time.perf_counter()
+    for i in range(matches):
+        turns += run_match(bot1, bot2, board, max_turns=max_turns, simulate=True, seed=SEED + i)["total_turns"]
+    return turns, time.perf_counter() - start
+
+
+def snake_samples(ctx, bot1, bot2, lengths, max_turns=20000):
+    """
+    Play a seeded match and keep a copy of the turn where bot1 first got to each of lengths.
+    Returns {length: (my body, other body, apples, direction, grid cells)}, lengths it never reached are left out.
+    """
+    wanted = sorted(lengths)
+    samples = {}
+    state = GameState.start(ctx, SEED)
+    for _ in range(max_turns):
+        if not wanted or not state.bot1_alive:
+            break
+        step_game(state, bot1, bot2, ctx)
+        while wanted and len(state.bot1_body) >= wanted[0]:
+            samples[wanted.pop(0)] = (
+                deque(state.bot1_body),
+                deque(state.bot2_body) if state.bot2_alive else deque(),
+                list(state.apple_positions),
+                state.bot1_move,
+                bytes(state.grid.cells),
+            )
+    return samples
+
+
+def sample_grid(ctx, cells):
+    """OccupancyGrid holding the cells saved by snake_samples"""
+    grid = OccupancyGrid(ctx)
+    grid.cells = bytearray(cells)
+    return grid
+
+
+def time_choose_bot_move(ctx, bot, sample, calls, distance_field):
+    """Call choose_bot_move calls times on one saved turn, returns (calls, seconds)"""
+    body, other, apples, direction, cells = sample
+    grid = sample_grid(ctx, cells)
+    field = AppleDistanceField(ctx, grid, apples) if distance_field else None
+    rng = random.Random(SEED)
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        choose_bot_move(bot, body, other, apples, ctx, direction, grid, SNAKE1, rng, field)
+    return calls, time.perf_counter() - start
+
+
+def time_first_step(ctx, sample, calls):
+    """BFS from the head of one saved turn to its apples calls times, returns (calls, seconds)"""
+    body, _, apples, _, cells = sample
+    grid = sample_grid(ctx, cells)
+    head = body[0]
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        first_step_toward_target(head, apples, ctx, grid)
+    return calls, time.perf_counter() - start
+
+
+def time_apple_cells(ctx, calls):
+    """Work out the spawn cells of a compiled board calls times, returns (calls, seconds)"""
+    start = time.perf_counter()
+    for _ in range(calls):
+        get_apple_cells(ctx)
+    return calls, time.perf_counter() - start
+
+
+def time_respawn(ctx, draws):
+    """Draw and put back random spawn cells the way step_game respawns apples, returns (draws, seconds)"""
+    spawnable = FreeCellSet(ctx.width * ctx.height, (ctx.index(x, y) for x, y in ctx.spawn_cells))
+    rng = random.Random(SEED)
+
+    start = time.perf_counter()
+    for _ in range(draws):
+        i = spawnable.pop_random(rng)
+        ctx.position(i)
+        spawnable.add(i)
+    return draws, time.perf_counter() - start
+
+
+def time_generator(board_type, width, boards):
+    """Generate boards boards of board_type, returns (boards, seconds)"""
+    height = int(width * 0.6)
+    start = time.perf_counter()
+    for i in range(boards):
+        generate_board(board_type, width, height, False, SEED + i)
+    return boards, time.perf_counter() - start
+
+
+def cases(quick=False):
+    """
+    Yield (name, unit, timer) for every case in the suite, timer() returns (ops, seconds).
+    quick only runs the first board type, size and apple count, its case names are the same as
+    in the full suite so a quick run can be compared with a full baseline.
+    """
+    bot1, bot2 = bench_bots()
+
+    board_types = MATCH_BOARD_TYPES[:1] if quick else MATCH_BOARD_TYPES
+    widths = MATCH_WIDTHS[:1] if quick else MATCH_WIDTHS
+    apple_counts = MATCH_APPLES[:1] if quick else MATCH_APPLES
+    matches = 2
+    max_turns = 2000
+
+    for board_type in board_types:
+        for width in widths:
+            for apples in apple_counts:
+                board = bench_board(board_type, width, apples)
+                ctx = get_board_context(board)
+                size = f"{board_type}/{width}x{board.height}/{apples}a"
+
+                yield f"step_game/{size}", "turns/sec", lambda ctx=ctx: time_step_game(ctx, bot1, bot2, matches, max_turns)
+                yield f"run_match/{size}", "turns/sec", lambda board=board: time_run_match(board, bot1, bot2, matches, max_turns)
+
+    # Bot decisions get slower as the snakes take up more of the board, so time them at a few lengths
+    for board_type in board_types:
+        board = bench_board(board_type, MATCH_WIDTHS[-1], 5)
+        ctx = get_board_context(board)
+        samples = snake_samples(ctx, bot1, bot2, SNAKE_LENGTHS[:1] if quick else SNAKE_LENGTHS)
+        for length, sample in sorted(samples.items()):
+            size = f"{board_type}/{board.width}x{board.height}/len{length}"
+            yield f"choose_bot_move/bfs/{size}", "calls/sec", lambda ctx=ctx, s=sample: time_choose_bot_move(ctx, bot1, s, 300, False)
+            yield f"choose_bot_move/field/{size}", "calls/sec", lambda ctx=ctx, s=sample: time_choose_bot_move(ctx, bot1, s, 5000, True)
+            yield f"first_step_toward_target/{size}", "calls/sec", lambda ctx=ctx, s=sample: time_first_step(ctx, s, 300)
+
+    for board_type, _ in BOARD_TYPES:
+        if quick and board_type not in board_types:
+            continue
+        for width in GENERATOR_WIDTHS[:1] if quick else GENERATOR_WIDTHS:
+            yield f"board_generator/{board_type}/{width}", "boards/sec", lambda t=board_type, w=width: time_generator(t, w, 100)
+
+            ctx = get_board_context(bench_board(board_type, width, 5))
+            yield f"get_apple_cells/{board_type}/{width}", "calls/sec", lambda ctx=ctx: time_apple_cells(ctx, 300)
+            yield f"respawn/{board_type}/{width}", "draws/sec", lambda ctx=ctx: time_respawn(ctx, 200000)
+
+
+def run_suite(quick=False, repeat=3, only=None, progress=None):
+    """
+    Run every case repeat times and keep the best ops/sec of each (the least disturbed by anything
+    else running on the machine). only is a substring a case name has to contain to run.
+    progress(name, result) is called after each case.
+    Returns {case name: {"value": ops/sec, "unit": unit}}.
+    """
+    results = {}
+    for name, unit, timer in cases(quick):
+        if only and only not in name:
+            continue
+
+        best = 0.0
+        for _ in range(max(1, repeat)):
+            ops, seconds = timer()
+            if seconds:
+                best = max(best, ops / seconds)
+
+        results[name] = {"value": best, "unit": unit}
+        if progress is not None:
+            progress(name, results[name])
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare results with baseline (both from run_suite).
+    Returns (regressions, rows) where rows is (name, baseline value or None, value, change) for every
+    case in results and regressions are the rows more than tolerance slower than the baseline.
+    Cases the baseline doesn't have are new and never count as regressions.
+    """
+    rows = []
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or not base["value"]:
+            rows.append((name, None, result["value"], None))
+            continue
+
+        change = result["value"] / base["value"] - 1
+        row = (name, base["value"], result["value"], change)
+        rows.append(row)
+        if change < -tolerance:
+            regressions.append(row)
+    return regressions, rows
+
+
+def save_results(path, results):
+    """Write results to path as JSON together with where and when they were measured"""
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "created": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            },
+            f,
+            indent=2,
+            sort_keys=True,
+        )
+
+
+def load_results(path):
+    """Read the results back out of a file written by save_results"""
+    with open(path) as f:
+        return json.load(f)["results"]
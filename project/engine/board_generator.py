@@ -1,6 +1,7 @@
 # File: board_generator.py
 # Author: Dawson Maska (dawsonwm@bu.edu), 11/25/2025
 # Description: Generates different types of snake boards based on user input from the BoardGeneratorForm.
+# Randomness comes from a random.Random seeded with the board's seed so a board can be generated again exactly.
 
 import random
 
@@ -19,7 +20,7 @@ def rect_walls(width, height):
 # -----------------------------------------------------------
 # 1. OPEN FIELD 
 # -----------------------------------------------------------
-def gen_open(width, height, wraparound):
+def gen_open(width, height, wraparound, rng):
     return {
         "type": "open",
         "obstacles": [],
@@ -30,7 +31,7 @@ def gen_open(width, height, wraparound):
 # -----------------------------------------------------------
 # 2. OUTER WALLS (classic snake)
 # -----------------------------------------------------------
-def gen_outer_wall(width, height, wraparound):
+def gen_outer_wall(width, height, wraparound, rng):
     return {
         "type": "outer_wall",
         "obstacles": rect_walls(width, height),
@@ -47,7 +48,7 @@ def gen_outer_wall(width, height, wraparound):
 WALL = 1
 EMPTY = 0
 
-def generate_maze(log_w, log_h):
+def generate_maze(log_w, log_h, rng):
     """
     Generate a maze on a logical grid of size log_w x log_h.
     log_w and log_h should be odd and >= 3.
@@ -88,7 +89,7 @@ def generate_maze(log_w, log_h):
             stack.pop()
             continue
 
-        nx, ny = random.choice(unvisited)
+        nx, ny = rng.choice(unvisited)
         visited.add((nx, ny))
 
         # Carve passage between (x, y) and (nx, ny)
@@ -101,7 +102,7 @@ def generate_maze(log_w, log_h):
 
     return maze
 
-def add_multiple_exits(maze, log_w, log_h, exit_count=3):
+def add_multiple_exits(maze, log_w, log_h, rng, exit_count=3):
     """
     Convert some border walls into empty cells if they border an empty interior cell,
     to create multiple exits.
@@ -122,14 +123,14 @@ def add_multiple_exits(maze, log_w, log_h, exit_count=3):
                                 candidates.append((x, y))
                                 break
 
-    random.shuffle(candidates)
+    rng.shuffle(candidates)
     for (x, y) in candidates[:exit_count]:
         maze[(x, y)] = EMPTY
 
     return maze
 
 
-def gen_inner_maze(width, height, wraparound):
+def gen_inner_maze(width, height, wraparound, rng):
     """
     Maze with:
       - 3-cell empty border all around
@@ -162,8 +163,8 @@ def gen_inner_maze(width, height, wraparound):
             "wrap": wraparound,
         }
 
-    maze = generate_maze(log_w, log_h)
-    maze = add_multiple_exits(maze, log_w, log_h, exit_count=3)
+    maze = generate_maze(log_w, log_h, rng)
+    maze = add_multiple_exits(maze, log_w, log_h, rng, exit_count=3)
 
     obstacles = []
 
@@ -198,14 +199,14 @@ def gen_inner_maze(width, height, wraparound):
 # -----------------------------------------------------------
 # 5. SCATTERED BLOCKS (random obstacles)
 # -----------------------------------------------------------
-def gen_scattered_blocks(width, height, wraparound, density=0.05):
+def gen_scattered_blocks(width, height, wraparound, rng, density=0.05):
     obstacles = []
     total_cells = width * height
-    block_count = int(total_cells * density * random.uniform(0.8, 1.5))
+    block_count = int(total_cells * density * rng.uniform(0.8, 1.5))
 
     for _ in range(block_count):
-        x = random.randrange(width)
-        y = random.randrange(height)
+        x = rng.randrange(width)
+        y = rng.randrange(height)
         obstacles.append((x, y))
 
     return {
@@ -218,7 +219,7 @@ def gen_scattered_blocks(width, height, wraparound, density=0.05):
 # -----------------------------------------------------------
 # 6. CORRIDORS (tunnels)
 # -----------------------------------------------------------
-def gen_corridors(width, height, wraparound):
+def gen_corridors(width, height, wraparound, rng):
     obstacles = []
 
     # Every 4 rows, add a horizontal wall segment with some holes
@@ -237,7 +238,7 @@ def gen_corridors(width, height, wraparound):
 # -----------------------------------------------------------
 # 7. TWO BOX ARENAS (two symmetric chambers)
 # -----------------------------------------------------------
-def gen_two_box_arenas(width, height, wraparound):
+def gen_two_box_arenas(width, height, wraparound, rng):
     obstacles = []
 
     mid = width // 2
@@ -268,7 +269,8 @@ def gen_two_box_arenas(width, height, wraparound):
 # -----------------------------------------------------------
 # Generator dispatcher
 # -----------------------------------------------------------
-def generate_board(board_type, width, height, wraparound):
+def generate_board(board_type, width, height, wraparound, seed):
+    """Generate a board_type board, the same seed always gives the same board"""
     generators = {
         "open": gen_open,
         "outer_wall": gen_outer_wall,
@@ -278,6 +280,6 @@ def generate_board(board_type, width, height, wraparound):
         "two_box_arenas": gen_two_box_arenas,
     }
 
-    data = generators[board_type](width, height, wraparound)
+    data = generators[board_type](width, height, wraparound, random.Random(seed))
 
     return data
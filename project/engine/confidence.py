@@ -0,0 +1,124 @@
+# File: confidence.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Confidence intervals for simulations, so simulate_matches can stop as soon as the win rates
+# (and optionally average apples) are known well enough instead of always playing a fixed number of runs.
+# Win rates use the Wilson score interval, which still behaves when one bot wins every run (the normal
+# approximation collapses to zero width at 15/15). Average apples use the normal approximation of the mean.
+
+from math import sqrt
+from statistics import NormalDist
+
+DEFAULT_CONFIDENCE = 0.95
+
+# Never stop before this many runs, the intervals are too rough to trust before then
+MIN_RUNS = 10
+
+# Most runs the regular engine will play in a request when it can stop early (SimulationForm)
+ADAPTIVE_MAX_RUNS = 1000
+
+
+def z_value(confidence):
+    """Two sided z value for confidence, 1.96 for 0.95"""
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def wilson_interval(successes, n, confidence=DEFAULT_CONFIDENCE):
+    """Wilson score interval (lo, hi) for a proportion of successes out of n"""
+    if n == 0:
+        return (0.0, 1.0)
+    z = z_value(confidence)
+    p = successes / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return (max(0.0, center - half), min(1.0, center + half))
+
+
+def mean_interval(n, total, total_sq, confidence=DEFAULT_CONFIDENCE):
+    """Normal approximation interval (lo, hi) for a mean, from the count, sum and sum of squares"""
+    if n == 0:
+        return (0.0, 0.0)
+    mean = total / n
+    if n < 2:
+        return (mean, mean)
+    variance = max(0.0, (total_sq - total * total / n) / (n - 1))
+    half = z_value(confidence) * sqrt(variance / n)
+    return (mean - half, mean + half)
+
+
+def half_width(interval):
+    """Half the width of an interval (the +/- margin of error)"""
+    return (interval[1] - interval[0]) / 2
+
+
+class WinRateEstimate:
+    """Running totals of a simulation's runs, enough to work out the intervals at any point"""
+
+    __slots__ = ("runs", "wins1", "wins2", "apples1", "apples1_sq", "apples2", "apples2_sq")
+
+    def __init__(self):
+        self.runs = 0
+        self.wins1 = 0
+        self.wins2 = 0
+        self.apples1 = 0
+        self.apples1_sq = 0
+        self.apples2 = 0
+        self.apples2_sq = 0
+
+    def add(self, results):
+        """Add the results dict of one run (from play_match)"""
+        self.runs += 1
+        if results["winner"] == 1:
+            self.wins1 += 1
+        elif results["winner"] == 2:
+            self.wins2 += 1
+        self.apples1 += results["apples_a"]
+        self.apples1_sq += results["apples_a"] ** 2
+        self.apples2 += results["apples_b"]
+        self.apples2_sq += results["apples_b"] ** 2
+
+    def add_totals(self, runs, wins1, wins2, apples1, apples1_sq, apples2, apples2_sq):
+        """Add a whole batch of runs at once (the batch engine adds up its arrays itself)"""
+        self.runs += runs
+        self.wins1 += wins1
+        self.wins2 += wins2
+        self.apples1 += apples1
+        self.apples1_sq += apples1_sq
+        self.apples2 += apples2
+        self.apples2_sq += apples2_sq
+
+    def intervals(self, confidence=DEFAULT_CONFIDENCE):
+        """{"bot1": {"win_rate_ci": ..., "avg_apples_ci": ...}, "bot2": {...}} at confidence"""
+        return {
+            "bot1": {
+                "win_rate_ci": wilson_interval(self.wins1, self.runs, confidence),
+                "avg_apples_ci": mean_interval(self.runs, self.apples1, self.apples1_sq, confidence),
+            },
+            "bot2": {
+                "win_rate_ci": wilson_interval(self.wins2, self.runs, confidence),
+                "avg_apples_ci": mean_interval(self.runs, self.apples2, self.apples2_sq, confidence),
+            },
+        }
+
+    def precise_enough(self, margin=None, apples_margin=None, confidence=DEFAULT_CONFIDENCE):
+        """
+        True once both bots' win rates are within +/- margin and their average apples within
+        +/- apples_margin (either can be None to not care about it) at confidence.
+        """
+        if self.runs < MIN_RUNS:
+            return False
+        intervals = self.intervals(confidence)
+        for bot in ("bot1", "bot2"):
+            if margin is not None and half_width(intervals[bot]["win_rate_ci"]) > margin:
+                return False
+            if apples_margin is not None and half_width(intervals[bot]["avg_apples_ci"]) > apples_margin:
+                return False
+        return True
+
+    def report(self, results, confidence=DEFAULT_CONFIDENCE):
+        """Put the runs played and the intervals into a simulation results dict"""
+        results["runs"] = self.runs
+        results["confidence"] = confidence
+        for bot, intervals in self.intervals(confidence).items():
+            results[bot]["win_rate_ci"] = list(intervals["win_rate_ci"])
+            results[bot]["avg_apples_ci"] = list(intervals["avg_apples_ci"])
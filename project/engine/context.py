@@ -0,0 +1,157 @@
+# File: context.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Compiled, read-only version of a Board for the arena engine.
+# Everything the engine used to rebuild from board_json every turn (obstacle set, wrap flag,
+# apple spawn cells, neighbor lookups) is worked out once per Board and cached per process.
+
+import threading
+from collections import OrderedDict
+from .occupancy import OBSTACLE
+
+# How many compiled boards we keep around per process
+CONTEXT_CACHE_SIZE = 64
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class BoardContext:
+    """Everything the engine needs to know about a Board, precomputed"""
+
+    __slots__ = (
+        "board_id", "width", "height", "food_count", "board_type", "wrap",
+        "obstacles", "obstacle_map", "spawn_cells", "spawn_map", "neighbors", "start1", "start2",
+    )
+
+    def __init__(self, board):
+        self.board_id = board.pk
+        self.width = board.width
+        self.height = board.height
+        self.food_count = board.food_count
+        self.board_type = board.board_json.get("type")
+        self.wrap = bool(board.board_json.get("wrap", False))
+
+        # set of (x, y) plus a bitmap indexed by y * width + x
+        self.obstacles = frozenset(map(tuple, board.board_json.get("obstacles", [])))
+        self.obstacle_map = bytearray(self.width * self.height)
+        for x, y in self.obstacles:
+            if 0 <= x < self.width and 0 <= y < self.height:
+                self.obstacle_map[y * self.width + x] = OBSTACLE
+
+        self.spawn_cells = get_apple_cells(self)
+        # 1 for every cell an apple is allowed to spawn in
+        self.spawn_map = bytearray(self.width * self.height)
+        for x, y in self.spawn_cells:
+            self.spawn_map[y * self.width + x] = 1
+        self.neighbors = self._build_neighbors()
+        self.start1, self.start2 = self._starting_bodies()
+
+    def index(self, x, y):
+        """Return the flat index of (x, y)"""
+        return y * self.width + x
+
+    def position(self, i):
+        """Return the (x, y) of flat index i"""
+        return (i % self.width, i // self.width)
+
+    def _build_neighbors(self):
+        """For every cell, the index of the neighbor in each direction (UP, RIGHT, DOWN, LEFT),
+        following wraparound if the board has it, or -1 if it's off the board"""
+        width, height = self.width, self.height
+        table = []
+        for y in range(height):
+            for x in range(width):
+                row = []
+                for dx, dy in ((0, -1), (1, 0), (0, 1), (-1, 0)):
+                    nx = x + dx
+                    ny = y + dy
+                    if self.wrap:
+                        nx %= width
+                        ny %= height
+                    elif not (0 <= nx < width and 0 <= ny < height):
+                        row.append(-1)
+                        continue
+                    row.append(ny * width + nx)
+                table.append(tuple(row))
+        return table
+
+    def _starting_bodies(self):
+        """Starting bodies for both snakes (head first)"""
+        # if two_box_arenas start must be different
+        if self.board_type == "two_box_arenas":
+            b1_start = ((4, 4), (3, 4), (3, 3))
+            b2_start = (
+                (self.width - 6, self.height - 6),
+                (self.width - 5, self.height - 6),
+                (self.width - 5, self.height - 5),
+            )
+        else:
+            b1_start = ((1, 1), (0, 1), (0, 0))
+            b2_start = (
+                (self.width - 2, self.height - 2),
+                (self.width - 1, self.height - 2),
+                (self.width - 1, self.height - 1),
+            )
+        return b1_start, b2_start
+
+
+def get_board_context(board):
+    """Return the BoardContext for board, compiling it on a cache miss.
+    Keyed by board id and timestamp so editing a board (auto_now timestamp) recompiles it."""
+
+    # Unsaved boards (benchmarks, previews) don't have a stable key, just compile them
+    if board.pk is None:
+        return BoardContext(board)
+
+    key = (board.pk, board.timestamp)
+
+    with _cache_lock:
+        ctx = _cache.get(key)
+        if ctx is not None:
+            _cache.move_to_end(key)
+            return ctx
+
+    ctx = BoardContext(board)
+
+    with _cache_lock:
+        _cache[key] = ctx
+        _cache.move_to_end(key)
+        while len(_cache) > CONTEXT_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return ctx
+
+
+# Helper function so apples only spawn in the boxes in the two_box_arenas map
+def get_apple_cells(board):
+    """Return list of valid apple spawn cells for this board (a BoardContext)."""
+    board_type = board.board_type
+    obstacles = board.obstacles
+
+    # Special handling for two-box arenas
+    if board_type == "two_box_arenas":
+        w, h = board.width, board.height
+        mid = w // 2
+        cells = []
+
+        # Left box
+        for x in range(3, mid - 3):
+            for y in range(3, h - 3):
+                if (x, y) not in obstacles:
+                    cells.append((x, y))
+
+        # Right box
+        for x in range(mid + 3, w - 3):
+            for y in range(3, h - 3):
+                if (x, y) not in obstacles:
+                    cells.append((x, y))
+
+        return cells
+
+    # Default - anywhere that isn't an obstacle
+    cells = []
+    for x in range(board.width):
+        for y in range(board.height):
+            if (x, y) not in obstacles:
+                cells.append((x, y))
+    return cells
@@ -0,0 +1,127 @@
+# File: distance.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Shared distance field for apple pathfinding. Instead of a BFS from each snake's head
+# every turn (which floods the whole board when no apple is reachable), one multi-source BFS from all
+# the apples gives every free cell its distance to the closest apple. Both bots then read their first
+# step off the field by looking at the cells around their head. After each turn only the cells that
+# changed (new heads, vacated tails, eaten and spawned apples) are fixed up instead of redoing the BFS.
+
+from collections import deque
+from heapq import heappop, heappush
+
+# Distance of a cell that isn't free or can't reach any apple
+UNREACHABLE = 1 << 30
+
+
+class AppleDistanceField:
+    """Distance from every free cell to the closest apple, moving only through free cells"""
+
+    __slots__ = ("neighbors", "dist")
+
+    def __init__(self, ctx, grid, apples):
+        self.neighbors = ctx.neighbors
+        self.dist = [UNREACHABLE] * (ctx.width * ctx.height)
+        self.rebuild(ctx, grid, apples)
+
+    def rebuild(self, ctx, grid, apples):
+        """Work the whole field out from scratch with a multi-source BFS"""
+        cells = grid.cells
+        neighbors = self.neighbors
+        dist = self.dist
+        for i in range(len(dist)):
+            dist[i] = UNREACHABLE
+
+        q = deque()
+        for x, y in apples:
+            i = y * ctx.width + x
+            dist[i] = 0
+            q.append(i)
+
+        while q:
+            i = q.popleft()
+            d = dist[i] + 1
+            for j in neighbors[i]:
+                if j >= 0 and not cells[j] and dist[j] == UNREACHABLE:
+                    dist[j] = d
+                    q.append(j)
+
+    def first_step(self, head_neighbors):
+        """
+        Given the neighbor indexes of a head (ctx.neighbors of the head cell), return the index of the
+        direction with the shortest path to an apple, or None if no apple can be reached.
+        Ties go to the first direction in DIRECTIONS order, which is the same step the old per-head
+        BFS (first_step_toward_target) found.
+        """
+        dist = self.dist
+        best = UNREACHABLE
+        best_dir = None
+        for d, j in enumerate(head_neighbors):
+            if j >= 0 and dist[j] < best:
+                best = dist[j]
+                best_dir = d
+        return best_dir
+
+    def update(self, grid, blocked, freed, spawned):
+        """
+        Fix the field up after a turn. grid is the occupancy grid after the turn, blocked the indexes of
+        cells that got occupied (new heads, including eaten apples), freed the ones that got vacated
+        (tails) and spawned the indexes of new apples.
+        """
+        cells = grid.cells
+        neighbors = self.neighbors
+        dist = self.dist
+
+        # Distances can only go up around cells that left the graph. Going out from them in order of
+        # distance, any cell that no longer has a neighbor one step closer to an apple has lost its
+        # shortest path and gets reset (and so might the cells that were counting on it).
+        check = []
+        for i in blocked:
+            d = dist[i]
+            if cells[i] and d != UNREACHABLE:
+                dist[i] = UNREACHABLE
+                for j in neighbors[i]:
+                    if j >= 0 and dist[j] == d + 1:
+                        heappush(check, (d + 1, j))
+
+        lost = []
+        while check:
+            d, i = heappop(check)
+            if dist[i] != d:
+                continue
+            for j in neighbors[i]:
+                if j >= 0 and dist[j] == d - 1:
+                    break
+            else:
+                dist[i] = UNREACHABLE
+                lost.append(i)
+                for j in neighbors[i]:
+                    if j >= 0 and dist[j] == d + 1:
+                        heappush(check, (d + 1, j))
+
+        # Distances can only go down around cells that joined the graph (freed tails, new apples).
+        # Those and the reset cells get their best guess from their neighbors, then a Dijkstra style
+        # pass spreads the changes out.
+        repair = []
+        for i in spawned:
+            dist[i] = 0
+            heappush(repair, (0, i))
+
+        for i in lost + [i for i in freed if not cells[i]]:
+            best = dist[i]
+            for j in neighbors[i]:
+                if j >= 0 and dist[j] + 1 < best:
+                    best = dist[j] + 1
+            if best < dist[i]:
+                dist[i] = best
+            if best != UNREACHABLE:
+                heappush(repair, (best, i))
+
+        while repair:
+            d, i = heappop(repair)
+            if d != dist[i]:
+                continue
+            d += 1
+            for j in neighbors[i]:
+                if j >= 0 and not cells[j] and dist[j] > d:
+                    dist[j] = d
+                    heappush(repair, (d, j))
@@ -0,0 +1,61 @@
+# File: instrument.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Opt-in per-phase instrumentation for the arena engine. An EngineProfile put on a
+# GameState (state.profile) makes step_game and choose_bot_move time each phase of a turn and count
+# the work they did. With no profile (the default) the engine only pays for an "is not None" check
+# per phase, so normal matches don't get slower.
+
+# Phases of a turn, in the order they happen. pathfinding is the BFS / distance field lookup inside
+# choose_bot_move plus updating the distance field, scoring is the rest of choose_bot_move.
+PHASES = ("pathfinding", "scoring", "collisions", "bodies", "respawn", "replay", "db_write")
+
+# Counters
+COUNTERS = ("turns", "bfs_searches", "bfs_nodes", "respawn_draws", "rows_written")
+
+
+class EngineProfile:
+    """Seconds spent in each phase and counters, added up over one or more matches"""
+
+    __slots__ = ("seconds", "counts", "matches")
+
+    def __init__(self):
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.matches = 0
+
+    def add(self, phase, seconds):
+        """Add seconds to phase"""
+        self.seconds[phase] += seconds
+
+    def count(self, name, n=1):
+        """Add n to counter name"""
+        self.counts[name] += n
+
+    def merge(self, summary):
+        """Add a summary() (of another match or another process) to this profile"""
+        for phase, seconds in summary["seconds"].items():
+            self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+        for name, n in summary["counts"].items():
+            self.counts[name] = self.counts.get(name, 0) + n
+        self.matches += summary["matches"]
+
+    def summary(self):
+        """Plain dict (JSON friendly, picklable) with the totals, each phase's share and time per turn"""
+        total = sum(self.seconds.values())
+        turns = self.counts["turns"]
+        return {
+            "matches": self.matches,
+            "total_seconds": total,
+            "seconds": dict(self.seconds),
+            "counts": dict(self.counts),
+            "share": {phase: s / total if total else 0.0 for phase, s in self.seconds.items()},
+            "us_per_turn": {phase: s * 1e6 / turns if turns else 0.0 for phase, s in self.seconds.items()},
+        }
+
+
+def merge_summaries(summaries):
+    """Add up summary() dicts (e.g. one per simulated match), returns the summary of all of them"""
+    profile = EngineProfile()
+    for summary in summaries:
+        profile.merge(summary)
+    return profile.summary()
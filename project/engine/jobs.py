@@ -0,0 +1,160 @@
+# File: jobs.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Database backed job queue for playing matches outside the web request.
+# MatchCreateView just saves a MatchJob and sends the user to a status page, and one or more
+# match_worker processes claim the jobs, play them with run_match and report progress as they go.
+# The same workers also play simulations from the site (see sim_jobs.py), queued tournaments
+# (see tournament.py) and simulation units (see sim_queue.py).
+# Claiming a job is a single conditional UPDATE (only succeeds if nobody else got to it first),
+# so any number of workers can share the queue without locking.
+
+import multiprocessing
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import MatchJob
+from .run_match import run_match
+from .seeding import new_seed
+from .sim_jobs import claim_simulation, run_simulation_job
+from .sim_queue import claim_unit, run_unit
+from .tournament import claim_tournament, run_tournament_job
+
+# How long an idle worker waits before checking the queue again
+POLL_SECONDS = 1.0
+
+# A running job that hasn't reported progress in this long has lost its worker and can be claimed again
+JOB_STALE_SECONDS = 300
+
+
+def enqueue_match(bot1, bot2, board, seed=None, max_turns=5000):
+    """Queue a match between bot1 and bot2 on board for a worker to play, returns the MatchJob"""
+    if seed is None:
+        seed = new_seed()
+    return MatchJob.objects.create(bot1=bot1, bot2=bot2, board=board, seed=seed, max_turns=max_turns)
+
+
+def claim_job(worker):
+    """
+    Claim the oldest queued job for worker (a name for the worker process), or a running one whose
+    worker went quiet. Returns the MatchJob or None if there's nothing to do.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=JOB_STALE_SECONDS)
+    candidates = (
+        MatchJob.objects
+        .filter(Q(status=MatchJob.QUEUED) | Q(status=MatchJob.RUNNING, updated_at__lt=stale))
+        .order_by("created_at")
+        .values_list("pk", "status", "updated_at")[:10]
+    )
+
+    for pk, status, updated_at in candidates:
+        # Only one worker's UPDATE can match the row as it was, everyone else gets 0 rows back and moves on
+        claimed = MatchJob.objects.filter(pk=pk, status=status, updated_at=updated_at).update(
+            status=MatchJob.RUNNING,
+            worker=worker,
+            turn=0,
+            rows=0,
+            started_at=now,
+            updated_at=now,
+        )
+        if claimed:
+            return MatchJob.objects.select_related("bot1", "bot2", "board").get(pk=pk)
+
+    return None
+
+
+def run_job(job):
+    """Play a claimed job's match, keeping its progress up to date. Returns the Match (None if it failed)."""
+    # Filtering on the worker too means a worker that lost its job (it went stale and someone else
+    # claimed it) can't overwrite the new worker's progress
+    mine = MatchJob.objects.filter(pk=job.pk, worker=job.worker)
+
+    def progress(turn, rows):
+        mine.update(turn=turn, rows=rows, updated_at=timezone.now())
+
+    try:
+        match = run_match(job.bot1, job.bot2, job.board, max_turns=job.max_turns, seed=job.seed, progress=progress)
+    except Exception:
+        mine.update(status=MatchJob.FAILED, error=traceback.format_exc(), updated_at=timezone.now())
+        return None
+
+    if not mine.update(status=MatchJob.DONE, match=match, updated_at=timezone.now()):
+        # Someone else took the job over, their match is the one that counts
+        match.delete()
+        return None
+    return match
+
+
+def work(worker, poll=POLL_SECONDS, once=False, stop=None):
+    """Claim and run jobs forever (or until the queue is empty if once, or stop is set if it's given).
+    Single matches and simulations someone is watching go first, then queued tournaments, then simulation units.
+    Returns how many jobs were run."""
+    done = 0
+    while stop is None or not stop.is_set():
+        job = claim_job(worker)
+        if job is not None:
+            run_job(job)
+            done += 1
+            continue
+
+        simulation = claim_simulation(worker)
+        if simulation is not None:
+            run_simulation_job(simulation)
+            done += 1
+            continue
+
+        tournament = claim_tournament(worker)
+        if tournament is not None:
+            run_tournament_job(tournament)
+            done += 1
+            continue
+
+        unit = claim_unit(worker)
+        if unit is not None:
+            run_unit(unit)
+            done += 1
+            continue
+
+        if once:
+            return done
+        time.sleep(poll)
+    return done
+
+
+def _worker_main(worker, poll, once, stop=None):
+    """Entry point of each worker process"""
+    # Processes started with spawn/forkserver need Django set up before the models can be used
+    import django
+    django.setup()
+    work(worker, poll, once, stop)
+
+
+def start_workers(processes, poll=POLL_SECONDS, once=False, stop=None):
+    """Start processes worker processes in the background and return them. stop is an optional
+    multiprocessing Event that tells them to quit once they're done with what they're working on."""
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    # Children can't share the parent's database connection
+    connections.close_all()
+    workers = [
+        multiprocessing.Process(target=_worker_main, args=(f"{name}:{i}", poll, once, stop))
+        for i in range(processes)
+    ]
+    for p in workers:
+        p.start()
+    return workers
+
+
+def run_workers(processes=1, poll=POLL_SECONDS, once=False):
+    """Run processes workers side by side, each in its own process, and wait for them"""
+    if processes <= 1:
+        return work(f"{socket.gethostname()}:{os.getpid()}", poll, once)
+
+    for p in start_workers(processes, poll, once):
+        p.join()
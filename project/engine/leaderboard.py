@@ -0,0 +1,80 @@
+# File: leaderboard.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Global leaderboard stats. aggregate_global_stats adds up BotBoardStats per bot in a single
+# grouped query, and BotGlobalStats keeps those same totals materialized (added to after every match,
+# see stats.py) so the leaderboard page is an indexed ORDER BY with LIMIT/OFFSET.
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast
+
+from ..models import BotBoardStats, BotGlobalStats
+
+
+def aggregate_global_stats(bots=None):
+    """
+    Every bot's stats across all boards, worked out by the database in one GROUP BY query.
+    Rows are dicts with BotGlobalStats' fields, best win rate first. Only the bots with these pks if given.
+    """
+    stats = BotBoardStats.objects.all()
+    if bots is not None:
+        stats = stats.filter(bot__in=bots)
+
+    return (
+        stats.values("bot")
+        .annotate(
+            games=Sum("games"),
+            wins=Sum("wins"),
+            losses=Sum("losses"),
+            draws=Sum("draws"),
+            turns_sum=Sum("turns_sum"),
+            apples_sum=Sum("apples_sum"),
+            turns_games=Sum("turns_games"),
+        )
+        .annotate(
+            win_rate=Case(
+                When(games=0, then=Value(0.0)),
+                default=Cast(F("wins"), FloatField()) / F("games"),
+                output_field=FloatField(),
+            )
+        )
+        .order_by("-win_rate", "bot")
+    )
+
+
+def rebuild_global_stats(bots=None):
+    """
+    Work BotGlobalStats out from scratch from BotBoardStats (for all bots, or just the ones with these pks).
+    Everything happens in one transaction with the existing rows locked (in the same order apply_stats
+    locks them), so a match finishing at the same time either lands before the totals are read or gets
+    added on top of the rebuilt row, never lost. Returns how many rows it wrote.
+    """
+    with transaction.atomic():
+        existing = BotGlobalStats.objects.order_by("bot").select_for_update()
+        if bots is not None:
+            bots = list(bots)
+            existing = existing.filter(bot__in=bots)
+        locked = set(existing.values_list("bot", flat=True))
+
+        totals = {row.pop("bot"): row for row in aggregate_global_stats(bots)}
+
+        # Bots with no stats left on any board don't get a row
+        BotGlobalStats.objects.filter(bot__in=locked - set(totals)).delete()
+        for bot_id in sorted(locked & set(totals)):
+            BotGlobalStats.objects.filter(bot=bot_id).update(**totals[bot_id])
+
+        missing = [BotGlobalStats(bot_id=bot_id, **totals[bot_id]) for bot_id in sorted(set(totals) - locked)]
+        try:
+            with transaction.atomic():
+                BotGlobalStats.objects.bulk_create(missing, batch_size=1000)
+        except IntegrityError:
+            # A match created some of them after we looked, its change is in BotBoardStats by now too
+            for row in missing:
+                try:
+                    with transaction.atomic():
+                        row.save(force_insert=True)
+                except IntegrityError:
+                    fresh = aggregate_global_stats([row.bot_id]).first()
+                    fresh.pop("bot")
+                    BotGlobalStats.objects.select_for_update().filter(bot=row.bot_id).update(**fresh)
+    return len(totals)
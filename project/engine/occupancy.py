@@ -0,0 +1,114 @@
+# File: occupancy.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Flat occupancy grid for the arena engine. Every cell of the board is one byte
+# in a bytearray (indexed by y * width + x) so collision and free cell checks are O(1)
+# instead of scanning the snake body lists.
+
+# Cell values
+EMPTY = 0
+OBSTACLE = 1
+SNAKE1 = 2
+SNAKE2 = 3
+
+# Same order as DIR_DELTAS in arena.py
+NEIGHBOR_DELTAS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+
+class OccupancyGrid:
+    """Track which cells are free, obstacles, or owned by one of the snakes.
+    The engine keeps it up to date as heads advance and tails retract."""
+
+    __slots__ = ("width", "height", "base", "cells")
+
+    def __init__(self, ctx):
+        self.width = ctx.width
+        self.height = ctx.height
+
+        # base only holds the obstacles so we can restore a cell when a tail leaves it
+        # (the starting snakes on outer_wall boards actually sit on top of the walls).
+        # It's the BoardContext's bitmap and never written to, so it's shared, not copied.
+        self.base = ctx.obstacle_map
+        self.cells = bytearray(self.base)
+
+    def in_bounds(self, x, y):
+        """Return True if (x, y) is on the board"""
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_free(self, x, y):
+        """Return True if (x, y) is on the board and nothing is in it"""
+        return 0 <= x < self.width and 0 <= y < self.height and not self.cells[y * self.width + x]
+
+    def is_obstacle(self, x, y):
+        """Return True if (x, y) is a board obstacle (regardless of any snake on top of it)"""
+        return self.base[y * self.width + x] == OBSTACLE
+
+    def owner(self, x, y):
+        """Return the value stored at (x, y): EMPTY, OBSTACLE, SNAKE1 or SNAKE2"""
+        return self.cells[y * self.width + x]
+
+    def occupy(self, x, y, owner):
+        """Mark (x, y) as taken by owner (a new head)"""
+        self.cells[y * self.width + x] = owner
+
+    def vacate(self, x, y):
+        """Free (x, y) after a tail leaves it, putting back any obstacle underneath"""
+        i = y * self.width + x
+        self.cells[i] = self.base[i]
+
+    def place(self, body, owner):
+        """Mark every segment of body as owned by owner"""
+        for x, y in body:
+            self.occupy(x, y, owner)
+
+    def owned_neighbors(self, x, y, owner):
+        """Count the on-board (non wrapping) neighbors of (x, y) owned by owner"""
+        count = 0
+        for dx, dy in NEIGHBOR_DELTAS:
+            nx = x + dx
+            ny = y + dy
+            if 0 <= nx < self.width and 0 <= ny < self.height and self.cells[ny * self.width + nx] == owner:
+                count += 1
+        return count
+
+
+class FreeCellSet:
+    """Set of cell indexes with O(1) add, discard and uniform random draws.
+    The cells are kept in a list with pos[cell] being where each one is (or -1 if it's not in the set),
+    so removing a cell just moves the last one into its spot."""
+
+    __slots__ = ("cells", "pos")
+
+    def __init__(self, size, cells=()):
+        self.cells = []
+        self.pos = [-1] * size
+        for i in cells:
+            self.add(i)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, i):
+        return self.pos[i] >= 0
+
+    def add(self, i):
+        """Put cell i in the set (does nothing if it's already in)"""
+        if self.pos[i] < 0:
+            self.pos[i] = len(self.cells)
+            self.cells.append(i)
+
+    def discard(self, i):
+        """Take cell i out of the set (does nothing if it isn't in)"""
+        k = self.pos[i]
+        if k < 0:
+            return
+        last = self.cells.pop()
+        if last != i:
+            self.cells[k] = last
+            self.pos[last] = k
+        self.pos[i] = -1
+
+    def pop_random(self, rng):
+        """Remove and return a uniformly random cell using rng (a random.Random)"""
+        i = self.cells[rng.randrange(len(self.cells))]
+        self.discard(i)
+        return i
@@ -0,0 +1,109 @@
+# File: persist.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Writes the MoveEvents of a finished (or running) match to the database in batches
+# with bulk_create instead of one INSERT per turn. Either all at once after the engine is done,
+# or from a writer thread that drains a queue while the engine keeps going.
+
+import queue
+import threading
+import time
+from django.db import connection, transaction
+from ..models import MoveEvent
+
+# How many MoveEvents go into one bulk_create by default
+MOVE_EVENT_BATCH_SIZE = 500
+
+# Tells the writer thread the match is over
+_DONE = object()
+
+
+def make_persist_stats(rows, write_seconds, total_seconds, batch_size, mode, replay_bytes):
+    """Summary of how long saving a match took, attached to the Match as match.persist_stats"""
+    return {
+        "mode": mode,
+        "batch_size": batch_size,
+        "rows": rows,
+        "replay_bytes": replay_bytes,
+        "write_seconds": write_seconds,
+        "total_seconds": total_seconds,
+        "rows_per_sec": rows / write_seconds if write_seconds else 0,
+    }
+
+
+def bulk_write_moves(match, snapshots, batch_size=MOVE_EVENT_BATCH_SIZE):
+    """Save GameState snapshots as MoveEvents of match, batch_size rows per INSERT.
+    Returns the number of rows written."""
+    rows = 0
+    batch = []
+
+    for snap in snapshots:
+        event = MoveEvent(**snap)
+        event.match = match
+        batch.append(event)
+
+        if len(batch) >= batch_size:
+            MoveEvent.objects.bulk_create(batch)
+            rows += len(batch)
+            batch = []
+
+    if batch:
+        MoveEvent.objects.bulk_create(batch)
+        rows += len(batch)
+
+    return rows
+
+
+class MoveEventWriter(threading.Thread):
+    """Background thread that bulk writes MoveEvent snapshots as the engine produces them.
+    The match has to already be committed since this thread uses its own database connection."""
+
+    def __init__(self, match, batch_size=MOVE_EVENT_BATCH_SIZE):
+        super().__init__(daemon=True)
+        self.match = match
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        self.rows = 0
+        self.write_seconds = 0.0
+        self.error = None
+
+    def put(self, snapshot):
+        """Queue one GameState snapshot to be written"""
+        self.queue.put(snapshot)
+
+    def close(self):
+        """Tell the thread the match is over and wait for everything queued to be written"""
+        if self.is_alive():
+            self.queue.put(_DONE)
+            self.join()
+
+    def finish(self):
+        """Same as close() but re-raises anything that went wrong in the thread"""
+        self.close()
+        if self.error is not None:
+            raise self.error
+
+    def run(self):
+        try:
+            # One transaction for the whole match so a failure leaves no half written replay
+            with transaction.atomic():
+                done = False
+                while not done:
+                    # Wait for a full batch (or the end of the match)
+                    batch = []
+                    while len(batch) < self.batch_size:
+                        snapshot = self.queue.get()
+                        if snapshot is _DONE:
+                            done = True
+                            break
+                        batch.append(snapshot)
+
+                    if batch:
+                        start = time.perf_counter()
+                        self.rows += bulk_write_moves(self.match, batch, self.batch_size)
+                        self.write_seconds += time.perf_counter() - start
+        except Exception as e:
+            # Handed back to the engine's thread in finish()
+            self.error = e
+        finally:
+            # Threads get their own connection in Django, so clean it up ourselves
+            connection.close()
@@ -0,0 +1,152 @@
+# File: pool.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Process pools for simulate_matches, tournaments and parameter sweeps. Simulated runs don't touch the
+# database and only depend on their seed, so they can be spread across cores. The bots and the compiled board are sent
+# to each worker once (as initializer arguments) and after that a run is just its seed going out
+# and a small results dict coming back.
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from .state import GameState
+from .instrument import EngineProfile
+
+# Set once per worker process by _init_worker
+_worker = {}
+
+
+def _init_worker(bot1_params, bot2_params, ctx, max_turns, profile, termination):
+    """Runs once in every worker process"""
+    # Workers started with spawn/forkserver need Django set up before they can import the models
+    import django
+    django.setup()
+    from ..models import Bot
+    from .run_match import play_match
+
+    _worker["bot1"] = Bot(**bot1_params)
+    _worker["bot2"] = Bot(**bot2_params)
+    _worker["ctx"] = ctx
+    _worker["max_turns"] = max_turns
+    _worker["profile"] = profile
+    _worker["termination"] = termination
+    _worker["play_match"] = play_match
+
+
+def _run(seed):
+    """Play one simulated match in a worker and return its results dict"""
+    ctx = _worker["ctx"]
+    state = GameState.start(ctx, seed)
+    if _worker["profile"]:
+        state.profile = EngineProfile()
+    return _worker["play_match"](state, _worker["bot1"], _worker["bot2"], ctx, _worker["max_turns"], termination=_worker["termination"])
+
+
+def simulate_parallel(bot1_params, bot2_params, ctx, seeds, max_turns, workers, profile=False, termination=(), window=None):
+    """
+    Play one simulated match per seed across workers processes.
+    Yields the results dicts in the same order as seeds, so merging them gives
+    exactly what playing them one after another would. profile=True profiles every match
+    and termination is the names of the termination policies every match is played with.
+
+    With window set, only that many matches are handed out ahead of the one being yielded, so the
+    caller can stop early (close the generator) without the pool playing every seed first.
+    """
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(bot1_params, bot2_params, ctx, max_turns, profile, tuple(termination)),
+    ) as pool:
+        if window is None:
+            seeds = list(seeds)
+            # A few chunks per worker keeps them all busy when some matches run much longer than others
+            chunksize = max(1, len(seeds) // (workers * 4))
+            yield from pool.map(_run, seeds, chunksize=chunksize)
+            return
+
+        seeds = iter(seeds)
+        pending = deque(pool.submit(_run, seed) for seed in islice(seeds, window))
+        try:
+            while pending:
+                results = pending.popleft().result()
+                for seed in islice(seeds, 1):
+                    pending.append(pool.submit(_run, seed))
+                yield results
+        finally:
+            # Stopped early, don't play what hasn't started yet
+            for future in pending:
+                future.cancel()
+
+
+def _init_games_worker(bots, ctxs, max_turns, termination):
+    """Runs once in every worker process of play_games_parallel"""
+    import django
+    django.setup()
+    from ..models import Bot
+    from .run_match import play_match
+
+    _worker["bots"] = {pk: Bot(**params) for pk, params in bots.items()}
+    _worker["ctxs"] = ctxs
+    _worker["max_turns"] = max_turns
+    _worker["termination"] = termination
+    _worker["play_match"] = play_match
+
+
+def _play_game(game):
+    """Play one (bot1 pk, bot2 pk, board pk, seed) game in a worker and return its results dict"""
+    bot1, bot2, board, seed = game
+    ctx = _worker["ctxs"][board]
+    state = GameState.start(ctx, seed)
+    return _worker["play_match"](state, _worker["bots"][bot1], _worker["bots"][bot2], ctx, _worker["max_turns"], termination=_worker["termination"])
+
+
+def play_games_parallel(bots, ctxs, games, max_turns, workers, termination=()):
+    """
+    Same as simulate_parallel but every game can have different bots and a different board, for tournaments.
+    bots maps bot pk -> bot_params, ctxs maps board pk -> BoardContext and games are
+    (bot1 pk, bot2 pk, board pk, seed) tuples. Yields the results dicts in the same order as games.
+    """
+    games = list(games)
+    chunksize = max(1, len(games) // (workers * 4))
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_games_worker,
+        initargs=(bots, ctxs, max_turns, tuple(termination)),
+    ) as pool:
+        yield from pool.map(_play_game, games, chunksize=chunksize)
+
+
+def _init_sweep_worker(opponents, ctxs, games, max_turns, termination):
+    """Runs once in every worker process of evaluate_parallel"""
+    import django
+    django.setup()
+    from ..models import Bot
+    from .sweep import play_candidate
+
+    _worker["opponents"] = {pk: Bot(**params) for pk, params in opponents.items()}
+    _worker["ctxs"] = ctxs
+    _worker["games"] = games
+    _worker["max_turns"] = max_turns
+    _worker["termination"] = termination
+    _worker["play_candidate"] = play_candidate
+
+
+def _evaluate(params):
+    """Play all of one sweep candidate's games in a worker and return its totals"""
+    return _worker["play_candidate"](
+        params, _worker["opponents"], _worker["ctxs"], _worker["games"], _worker["max_turns"], _worker["termination"]
+    )
+
+
+def evaluate_parallel(opponents, ctxs, games, max_turns, termination, candidates, workers):
+    """
+    Score parameter sweep candidates (see sweep.py) across workers processes. The opponents (bot pk -> bot_params),
+    boards and games are sent to each worker once, after that a candidate is just its params going out.
+    Yields every candidate's totals in the same order as candidates.
+    """
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_sweep_worker,
+        initargs=(opponents, ctxs, games, max_turns, tuple(termination)),
+    ) as pool:
+        yield from pool.map(_evaluate, candidates)
@@ -0,0 +1,361 @@
+# File: replay.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Compact binary replay format for matches, stored on Match.replay.
+# Instead of saving both full bodies and every apple on every turn (MoveEvent), we save the starting
+# state plus, per turn, the two directions, ate/alive flags and any apples that spawned. Bodies are
+# rebuilt on demand by replaying the moves. A full keyframe every KEYFRAME_INTERVAL turns means
+# jumping to turn t only replays at most KEYFRAME_INTERVAL turns.
+#
+# Layout (little endian):
+#   header    magic "SNKR", version (u8), flags (u8, bit 0 = wrap), width (u16), height (u16),
+#             total turns (u32), keyframe count (u32)
+#   index     keyframe count x (turn u32, offset u32), offset is from the start of the blob
+#   stream    one record per turn starting at turn 0. Keyframe turns have a keyframe record,
+#             every other turn a delta record.
+#   keyframe  dir1 (u8), dir2 (u8), flags (u8), body1 length (u16) + cells, body2 length (u16) + cells,
+#             apple count (u8) + cells
+#   delta     packed (u16): dir1 bits 0-2, dir2 bits 3-5, then flags in bits 6-9,
+#             spawned apple count (u8) + cells
+#   cells are u16 flat indexes (y * width + x)
+
+import base64
+import struct
+from bisect import bisect_right
+from collections import deque
+from .arena import DIR_DELTAS, DIRECTIONS
+
+MAGIC = b"SNKR"
+VERSION = 1
+
+# Full state saved every this many turns (and at turn 0)
+KEYFRAME_INTERVAL = 100
+
+# Direction codes: index in DIRECTIONS, or 4 for a dead snake
+DIR_CODES = {name: i for i, name in enumerate(DIRECTIONS)}
+DIR_CODES["NONE"] = 4
+CODE_DIRS = DIRECTIONS + ["NONE"]
+# One letter per direction code for the columnar payload (see Replay.columns)
+CODE_LETTERS = "URDLN"
+
+# Turn flags
+BOT1_ALIVE = 1
+BOT2_ALIVE = 2
+BOT1_ATE = 4
+BOT2_ATE = 8
+
+HEADER = struct.Struct("<4sBBHHII")
+INDEX_ENTRY = struct.Struct("<II")
+KEYFRAME_HEAD = struct.Struct("<BBB")
+DELTA_HEAD = struct.Struct("<HB")
+U8 = struct.Struct("<B")
+U16 = struct.Struct("<H")
+
+
+def _flags(frame):
+    """Pack the alive/ate booleans of frame into turn flags"""
+    flags = 0
+    if frame.bot1_alive:
+        flags |= BOT1_ALIVE
+    if frame.bot2_alive:
+        flags |= BOT2_ALIVE
+    if frame.bot1_ate:
+        flags |= BOT1_ATE
+    if frame.bot2_ate:
+        flags |= BOT2_ATE
+    return flags
+
+
+class ReplayEncoder:
+    """
+    Builds a replay blob one turn at a time. add() takes anything with MoveEvent's fields
+    (a GameState while the engine runs, or a MoveEvent when backfilling old matches).
+    """
+
+    def __init__(self, width, height, wrap, keyframe_interval=KEYFRAME_INTERVAL):
+        self.width = width
+        self.height = height
+        self.wrap = wrap
+        self.keyframe_interval = keyframe_interval
+
+        self.stream = bytearray()
+        self.keyframes = []
+        self.turns = 0
+        # apples after the last turn added, to work out which ones spawned
+        self.apples = None
+
+    def _cell(self, pos):
+        return pos[1] * self.width + pos[0]
+
+    def add(self, frame):
+        """Add the next turn"""
+        apples = [tuple(p) for p in frame.apple_positions]
+
+        spawned = None
+        if self.apples is not None and frame.move_number % self.keyframe_interval:
+            # Eaten apples get removed (bot 1 first, same as step_game) and new ones go on the end
+            remaining = list(self.apples)
+            for ate, body in ((frame.bot1_ate, frame.bot1_body), (frame.bot2_ate, frame.bot2_body)):
+                head = tuple(body[0])
+                if ate:
+                    if head not in remaining:
+                        remaining = None
+                        break
+                    remaining.remove(head)
+            if remaining is not None and apples[:len(remaining)] == remaining:
+                spawned = apples[len(remaining):]
+
+        if spawned is None:
+            # First turn, keyframe turn, or apples we can't describe as a delta
+            self._add_keyframe(frame, apples)
+        else:
+            code = (
+                DIR_CODES[frame.bot1_move]
+                | DIR_CODES[frame.bot2_move] << 3
+                | _flags(frame) << 6
+            )
+            self.stream += DELTA_HEAD.pack(code, len(spawned))
+            for pos in spawned:
+                self.stream += U16.pack(self._cell(pos))
+
+        self.apples = apples
+        self.turns = frame.move_number
+
+    def _add_keyframe(self, frame, apples):
+        self.keyframes.append((frame.move_number, len(self.stream)))
+
+        self.stream += KEYFRAME_HEAD.pack(DIR_CODES[frame.bot1_move], DIR_CODES[frame.bot2_move], _flags(frame))
+        for body in (frame.bot1_body, frame.bot2_body):
+            self.stream += U16.pack(len(body))
+            for pos in body:
+                self.stream += U16.pack(self._cell(pos))
+
+        self.stream += U8.pack(len(apples))
+        for pos in apples:
+            self.stream += U16.pack(self._cell(pos))
+
+    def finish(self):
+        """Return the finished replay as bytes"""
+        prefix = HEADER.size + INDEX_ENTRY.size * len(self.keyframes)
+
+        blob = bytearray(HEADER.pack(MAGIC, VERSION, 1 if self.wrap else 0, self.width, self.height, self.turns, len(self.keyframes)))
+        for turn, offset in self.keyframes:
+            blob += INDEX_ENTRY.pack(turn, prefix + offset)
+        blob += self.stream
+
+        return bytes(blob)
+
+
+class Replay:
+    """Reads a replay blob and rebuilds the turns (bodies included) on demand"""
+
+    def __init__(self, blob):
+        self.blob = bytes(blob)
+        magic, version, flags, self.width, self.height, self.total_turns, count = HEADER.unpack_from(self.blob, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a snake replay (or an unsupported version)")
+
+        self.wrap = bool(flags & 1)
+
+        self.keyframe_turns = []
+        self.keyframe_offsets = []
+        for i in range(count):
+            turn, offset = INDEX_ENTRY.unpack_from(self.blob, HEADER.size + i * INDEX_ENTRY.size)
+            self.keyframe_turns.append(turn)
+            self.keyframe_offsets.append(offset)
+
+    def _pos(self, cell):
+        return (cell % self.width, cell // self.width)
+
+    def _read_cells(self, offset, count):
+        cells = [self._pos(c) for c in struct.unpack_from(f"<{count}H", self.blob, offset)]
+        return cells, offset + 2 * count
+
+    def _read_keyframe(self, offset):
+        """Return (state dict, offset of the next record)"""
+        dir1, dir2, flags = KEYFRAME_HEAD.unpack_from(self.blob, offset)
+        offset += KEYFRAME_HEAD.size
+
+        bodies = []
+        for _ in range(2):
+            (length,) = U16.unpack_from(self.blob, offset)
+            body, offset = self._read_cells(offset + U16.size, length)
+            bodies.append(deque(body))
+
+        (apple_count,) = U8.unpack_from(self.blob, offset)
+        apples, offset = self._read_cells(offset + U8.size, apple_count)
+
+        state = {
+            "bot1_move": CODE_DIRS[dir1],
+            "bot2_move": CODE_DIRS[dir2],
+            "bot1_body": bodies[0],
+            "bot2_body": bodies[1],
+            "flags": flags,
+            "apple_positions": apples,
+        }
+        return state, offset
+
+    def _next_head(self, body, direction):
+        dx, dy = DIR_DELTAS[direction]
+        x, y = body[0]
+        x += dx
+        y += dy
+        if self.wrap:
+            return (x % self.width, y % self.height)
+        return (x, y)
+
+    def _apply_delta(self, state, offset):
+        """Apply the delta record at offset to state (in place), return the offset of the next record"""
+        code, spawn_count = DELTA_HEAD.unpack_from(self.blob, offset)
+        spawned, offset = self._read_cells(offset + DELTA_HEAD.size, spawn_count)
+
+        dir1 = CODE_DIRS[code & 7]
+        dir2 = CODE_DIRS[(code >> 3) & 7]
+        flags = code >> 6
+        was = state["flags"]
+        apples = state["apple_positions"]
+
+        # Same order as step_game: move bot 1 then bot 2, eaten apples come out, spawned go on the end
+        for direction, alive, ate, key in (
+            (dir1, BOT1_ALIVE, BOT1_ATE, "bot1_body"),
+            (dir2, BOT2_ALIVE, BOT2_ATE, "bot2_body"),
+        ):
+            # Dead snakes (and snakes that died this turn) don't move
+            if not (flags & alive and was & alive):
+                continue
+            body = state[key]
+            head = self._next_head(body, direction)
+            if flags & ate:
+                apples.remove(head)
+            else:
+                body.pop()
+            body.appendleft(head)
+
+        apples.extend(spawned)
+
+        state["bot1_move"] = dir1
+        state["bot2_move"] = dir2
+        state["flags"] = flags
+        return offset
+
+    def _frame(self, turn, state):
+        """MoveEvent-shaped dict (same fields as MoveEventSerializer) for state at turn"""
+        flags = state["flags"]
+        return {
+            "move_number": turn,
+            "bot1_move": state["bot1_move"],
+            "bot2_move": state["bot2_move"],
+            "bot1_body": [list(p) for p in state["bot1_body"]],
+            "bot2_body": [list(p) for p in state["bot2_body"]],
+            "apple_positions": [list(p) for p in state["apple_positions"]],
+            "bot1_alive": bool(flags & BOT1_ALIVE),
+            "bot2_alive": bool(flags & BOT2_ALIVE),
+            "bot1_ate": bool(flags & BOT1_ATE),
+            "bot2_ate": bool(flags & BOT2_ATE),
+        }
+
+    def frames(self, from_turn=0, to_turn=None):
+        """Yield the turns from_turn..to_turn (inclusive) as MoveEvent-shaped dicts"""
+        if to_turn is None or to_turn > self.total_turns:
+            to_turn = self.total_turns
+        from_turn = max(from_turn, 0)
+        if from_turn > to_turn:
+            return
+
+        # Start from the last keyframe at or before from_turn
+        k = bisect_right(self.keyframe_turns, from_turn) - 1
+        turn = self.keyframe_turns[k]
+        state, offset = self._read_keyframe(self.keyframe_offsets[k])
+        next_keyframe = k + 1
+
+        while True:
+            if turn >= from_turn:
+                yield self._frame(turn, state)
+            if turn >= to_turn:
+                return
+
+            turn += 1
+            if next_keyframe < len(self.keyframe_turns) and self.keyframe_turns[next_keyframe] == turn:
+                state, offset = self._read_keyframe(offset)
+                next_keyframe += 1
+            else:
+                offset = self._apply_delta(state, offset)
+
+    def columns(self):
+        """
+        The whole match as a compact columnar dict for the JS player, read straight off the records
+        without rebuilding any bodies. Cells are flat indexes (y * width + x).
+          bot1_body, bot2_body, apples   state at turn 0
+          bot1_moves, bot2_moves         one letter per turn from CODE_LETTERS (U, R, D, L or N for dead)
+          bot1_alive, bot1_ate, ...      base64 bitsets, turn t is bit (t % 8) of byte t // 8
+          spawns                         flat [turn, cell, turn, cell, ...] of apples that spawned
+          resets                         full state at every other keyframe, to replace what the client worked out
+        Turns without a reset are rebuilt the same way as _apply_delta: snakes that are alive move one
+        cell, the tail only stays if they ate, eaten apples go away and spawned ones are added.
+        """
+        count = self.total_turns + 1
+        moves = (bytearray(count), bytearray(count))
+        bits = [bytearray((count + 7) // 8) for _ in range(4)]
+        spawns = []
+        resets = []
+        first = None
+
+        offset = self.keyframe_offsets[0]
+        next_keyframe = 0
+        for turn in range(count):
+            if next_keyframe < len(self.keyframe_turns) and self.keyframe_turns[next_keyframe] == turn:
+                dir1, dir2, flags = KEYFRAME_HEAD.unpack_from(self.blob, offset)
+                offset += KEYFRAME_HEAD.size
+                cells = []
+                for size in (U16, U16, U8):
+                    (length,) = size.unpack_from(self.blob, offset)
+                    offset += size.size
+                    cells.append(list(struct.unpack_from(f"<{length}H", self.blob, offset)))
+                    offset += 2 * length
+                state = {"turn": turn, "bot1_body": cells[0], "bot2_body": cells[1], "apples": cells[2]}
+                if first is None:
+                    first = state
+                else:
+                    resets.append(state)
+                next_keyframe += 1
+            else:
+                code, spawn_count = DELTA_HEAD.unpack_from(self.blob, offset)
+                offset += DELTA_HEAD.size
+                dir1 = code & 7
+                dir2 = (code >> 3) & 7
+                flags = code >> 6
+                for cell in struct.unpack_from(f"<{spawn_count}H", self.blob, offset):
+                    spawns += (turn, cell)
+                offset += 2 * spawn_count
+
+            moves[0][turn] = ord(CODE_LETTERS[dir1])
+            moves[1][turn] = ord(CODE_LETTERS[dir2])
+            for i, flag in enumerate((BOT1_ALIVE, BOT2_ALIVE, BOT1_ATE, BOT2_ATE)):
+                if flags & flag:
+                    bits[i][turn >> 3] |= 1 << (turn & 7)
+
+        def bitset(b):
+            return base64.b64encode(b).decode("ascii")
+
+        return {
+            "width": self.width,
+            "height": self.height,
+            "wrap": self.wrap,
+            "total_turns": self.total_turns,
+            "bot1_body": first["bot1_body"],
+            "bot2_body": first["bot2_body"],
+            "apples": first["apples"],
+            "bot1_moves": moves[0].decode("ascii"),
+            "bot2_moves": moves[1].decode("ascii"),
+            "bot1_alive": bitset(bits[0]),
+            "bot2_alive": bitset(bits[1]),
+            "bot1_ate": bitset(bits[2]),
+            "bot2_ate": bitset(bits[3]),
+            "spawns": spawns,
+            "resets": resets,
+        }
+
+    def frame(self, turn):
+        """Return a single turn as a MoveEvent-shaped dict"""
+        for frame in self.frames(turn, turn):
+            return frame
+        raise IndexError(f"Replay has no turn {turn}")
@@ -0,0 +1,93 @@
+# File: replay_cache.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Cache of finished match replays, ready to send. A finished match never changes, so the
+# first request builds the payload once, gzips it (and brotlis it if the brotli package is installed)
+# and stores it in the SNAKE_REPLAY_CACHE cache. After that every viewer gets the precompressed bytes
+# with a strong ETag (or a 304 if they already have it) without touching the database at all.
+# Entries are dropped with invalidate_replays whenever a match is deleted (see signals.py), however it goes.
+
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# The different payloads a match's replay is served as (see the replay API views)
+REPLAY_KINDS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "columns": "application/json",
+}
+
+# Browsers may keep a replay this long before asking again. Asking again is cheap (usually a 304 off the
+# ETag), and a deleted match's id can come back as a different match, so it's kept short.
+REPLAY_MAX_AGE = 60
+
+
+def _cache():
+    return caches[getattr(settings, "SNAKE_REPLAY_CACHE", "default")]
+
+
+def _key(kind, match_pk):
+    return f"snake:replay:{kind}:{match_pk}"
+
+
+def get_replay_payload(kind, match_pk):
+    """The cached payload dict (etag, gzip and br bytes) of a match, or None if it isn't cached yet"""
+    return _cache().get(_key(kind, match_pk))
+
+
+def cache_replay_payload(kind, match_pk, body, total_turns):
+    """Compress body (bytes) every way we can and cache it, returns the payload dict"""
+    payload = {
+        "etag": hashlib.sha256(body).hexdigest()[:32],
+        "total_turns": total_turns,
+        "gzip": gzip.compress(body, compresslevel=9),
+        "br": brotli.compress(body) if brotli is not None else None,
+    }
+    # Finished matches never change, so no timeout
+    _cache().set(_key(kind, match_pk), payload, None)
+    return payload
+
+
+def invalidate_replays(match_pks):
+    """Drop every cached payload of the matches with these pks"""
+    _cache().delete_many([_key(kind, pk) for pk in match_pks for kind in REPLAY_KINDS])
+
+
+def replay_response(request, kind, payload):
+    """Answer request with a cached payload: 304 if the client already has it, otherwise the
+    smallest encoding it accepts"""
+    accepts = request.headers.get("Accept-Encoding", "")
+    if payload["br"] is not None and "br" in accepts:
+        encoding = "br"
+    elif "gzip" in accepts:
+        encoding = "gzip"
+    else:
+        encoding = None
+
+    # Strong ETags have to differ between encodings of the same replay, but any of them means
+    # the client already has this replay
+    tags = {f'"{payload["etag"]}{suffix}"' for suffix in ("", "-gzip", "-br")}
+    if_none_match = {tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")}
+    etag = f'"{payload["etag"]}-{encoding}"' if encoding else f'"{payload["etag"]}"'
+
+    if tags & if_none_match or "*" in if_none_match:
+        response = HttpResponseNotModified()
+    elif encoding:
+        response = HttpResponse(payload[encoding], content_type=REPLAY_KINDS[kind])
+        response["Content-Encoding"] = encoding
+    else:
+        response = HttpResponse(gzip.decompress(payload["gzip"]), content_type=REPLAY_KINDS[kind])
+
+    response["ETag"] = etag
+    response["X-Total-Turns"] = payload["total_turns"]
+    response["Vary"] = "Accept-Encoding"
+    response["Cache-Control"] = f"private, max-age={REPLAY_MAX_AGE}, must-revalidate"
+    return response
@@ -1,212 +1,385 @@
-import random
+import time
+from django.conf import settings
 from django.db import transaction
-from ..models import Match, MoveEvent, BotBoardStats
-from .arena import step_game, get_apple_cells
-
-# Let us be lazy and just make FakeMoveEvents if we are simulating to save on database hits
-class FakeMoveEvent:
-    def __init__(
-        self,
-        match,
-        move_number,
-        bot1_move,
-        bot2_move,
-        bot1_body,
-        bot2_body,
-        bot1_alive,
-        bot2_alive,
-        apple_positions,
-        bot1_ate,
-        bot2_ate,
-    ):
-        self.match = match
-        self.move_number = move_number
-        self.bot1_move = bot1_move
-        self.bot2_move = bot2_move
-        self.bot1_body = bot1_body
-        self.bot2_body = bot2_body
-        self.bot1_alive = bot1_alive
-        self.bot2_alive = bot2_alive
-        self.apple_positions = apple_positions
-        self.bot1_ate = bot1_ate
-        self.bot2_ate = bot2_ate
-
-def run_match(bot1, bot2, board, max_turns=5000, simulate=False):
+from ..models import Match, Bot, Board
+from .arena import step_game
+from .context import get_board_context
+from .state import GameState
+from .seeding import ENGINE_VERSION, new_seed, derive_seed
+from .persist import MOVE_EVENT_BATCH_SIZE, MoveEventWriter, bulk_write_moves, make_persist_stats
+from .replay import ReplayEncoder
+from .pool import simulate_parallel
+from .stats import StatsBatch, apply_stats, outcome_change
+from .instrument import EngineProfile, merge_summaries
+from .termination import make_policies
+from .confidence import DEFAULT_CONFIDENCE, WinRateEstimate
+
+# How many turns go by between calls to run_match's progress callback
+PROGRESS_EVERY = 100
+
+# Bot fields that change how a bot plays, copied onto Match.params since bots can be edited later
+BOT_PARAMS = ("greediness", "caution", "direction_bias", "circliness", "introversion", "chaos")
+
+# Board fields a match depends on, for snapshotting a board (see board_params)
+BOARD_PARAMS = ("width", "height", "food_count", "board_json")
+
+
+def play_match(state, bot1, bot2, ctx, max_turns, on_turn=None, termination=()):
     """
-    Run a full snake match between bot1 and bot2 on board.
-    Creates Match and MoveEvents.
+    Play state (a GameState) out until both snakes are dead or max_turns is reached.
+    on_turn(state) is called after every turn if given (e.g. to save snapshots).
+    termination is the names of the termination policies (see termination.py) that can end it sooner.
+    Returns the match results as a dict, with the summary of state.profile under "profile" if it has one.
+    "terminated_by" is the name of the policy that ended the match, or None if it played out.
+    "a_cut_off"/"b_cut_off" are True when that snake was still alive when a policy stopped the match
+    before it could play out, so its survival time is where it got cut off and not when it died.
     """
 
-    # initial positions 
-    # if two_box_arenas start must be different
-    if board.board_json.get("type", []) == "two_box_arenas":
-        b1_start = [(4, 4), (3, 4), (3, 3)]
-        b2_start = [
-            (board.width - 6, board.height - 6),
-            (board.width - 5, board.height - 6),
-            (board.width - 5, board.height - 5),
-        ]
-    else:
-        b1_start = [(1, 1), (0, 1), (0, 0)]
-        b2_start = [
-            (board.width - 2, board.height - 2),
-            (board.width - 1, board.height - 2),
-            (board.width - 1, board.height - 1),
-        ]
-
-    # Initial apples 
-    obstacles = set(map(tuple, board.board_json.get("obstacles", [])))
-
-    apple_cells = get_apple_cells(board, obstacles)
-
-    apples = []
-    while len(apples) < board.food_count:
-        p = random.choice(apple_cells)
-        if (
-            p not in b1_start
-            and p not in b2_start
-            and p not in apples
-        ):
-            apples.append(p)
-
     # Accumulator Variables
     apples_a = 0
     apples_b = 0
     a_survival_time = 0
     b_survival_time = 0
-    winner = None
 
-    # different behaviour for simulations vs non simulations to save time + space
-    if not simulate:
+    policies = make_policies(termination, ctx, state, bot1, bot2)
+    terminated_by = None
+    decided = None
+    cut_off = False
+
+    # simulation loop 
+    for turn in range(max_turns):
+        if not (state.bot1_alive or state.bot2_alive):
+            break
+
+        step_game(state, bot1, bot2, ctx)
+
+        # Update accumulators
+        if state.bot1_ate:
+            apples_a += 1
+        if state.bot2_ate:
+            apples_b += 1
+
+        if state.bot1_alive:
+            a_survival_time = state.move_number
+        if state.bot2_alive:
+            b_survival_time = state.move_number
+
+        if on_turn is not None:
+            on_turn(state)
+
+        for policy in policies:
+            decided = policy.check(state, apples_a, apples_b)
+            if decided is not None:
+                terminated_by = policy.name
+                break
+        if terminated_by is not None:
+            if policy.plays_out:
+                # Nothing can change from here, so whoever's alive makes it to max_turns
+                end = state.move_number + max_turns - 1 - turn
+                if state.bot1_alive:
+                    a_survival_time = end
+                if state.bot2_alive:
+                    b_survival_time = end
+            else:
+                cut_off = True
+            break
+
+    # finalize winner 
+    if decided is not None:
+        winner = decided
+    elif apples_a > apples_b:
+        winner = 1
+    elif apples_b > apples_a:
+        winner = 2
+    else:
+        winner = 0
+
+    results = {
+        "winner": winner,
+        "apples_a": apples_a,
+        "apples_b": apples_b,
+        "a_survival_time": a_survival_time,
+        "b_survival_time": b_survival_time,
+        "total_turns": state.move_number,
+        "terminated_by": terminated_by,
+        "a_cut_off": cut_off and state.bot1_alive,
+        "b_cut_off": cut_off and state.bot2_alive,
+    }
+
+    if state.profile is not None:
+        state.profile.matches += 1
+        results["profile"] = state.profile.summary()
+
+    return results
+
+
+def bot_params(bot):
+    """The personality of bot as a dict"""
+    return {field: getattr(bot, field) for field in BOT_PARAMS}
+
+
+def board_params(board):
+    """Everything about board a match depends on as a dict, Board(**board_params(board)) plays the same"""
+    return {field: getattr(board, field) for field in BOARD_PARAMS}
+
+
+def match_params(bot1, bot2, board, max_turns, termination=()):
+    """Everything other than the seed that decides how a match plays out, stored on Match.params"""
+    params = {
+        "bot1": bot_params(bot1),
+        "bot2": bot_params(bot2),
+        "food_count": board.food_count,
+        "max_turns": max_turns,
+        "engine": ENGINE_VERSION,
+    }
+    # Only there when the match could end early, matches without it played out to max_turns
+    if termination:
+        params["termination"] = list(termination)
+    return params
+
+
+def replay_from_seed(match):
+    """
+    Play match again from its seed and params.
+    Returns (results dict, replay blob), which are the same as what run_match got the first time.
+    """
+    params = match.params
+    bot1 = Bot(**params["bot1"])
+    bot2 = Bot(**params["bot2"])
+
+    # The board's food count can be edited after the match, so use the one the match was played with
+    board = match.board
+    if board.food_count != params["food_count"]:
+        board = Board(width=board.width, height=board.height, food_count=params["food_count"], board_json=board.board_json)
+    ctx = get_board_context(board)
+
+    state = GameState.start(ctx, match.seed)
+    encoder = ReplayEncoder(ctx.width, ctx.height, ctx.wrap)
+    encoder.add(state)
+    results = play_match(state, bot1, bot2, ctx, params["max_turns"], on_turn=encoder.add, termination=params.get("termination", ()))
+
+    return results, encoder.finish()
+
+
+def run_match(bot1, bot2, board, max_turns=5000, simulate=False, save_move_events=False, batch_size=MOVE_EVENT_BATCH_SIZE, background_writer=False, seed=None, save_replay=True, progress=None, profile=False, termination=()):
+    """
+    Run a full snake match between bot1 and bot2 on board.
+    Creates a Match with a compact replay (see replay.py), unless simulate is True,
+    in which case only the results dict is returned.
+
+    Everything random in the match comes from seed (a new one if not given), which is saved on the Match
+    together with the bot parameters. With save_replay=False only those are saved and Match.get_replay()
+    plays the match again from its seed whenever the replay is needed.
+
+    With save_move_events=True every turn is also saved as a MoveEvent with bulk_create, batch_size rows
+    at a time. By default the whole match is played in memory first and then written in one transaction.
+    With background_writer=True a writer thread saves the turns while the engine is still playing.
+    Either way the returned Match has a persist_stats dict with the rows written, time spent writing,
+    rows/sec and the size of the replay.
+
+    progress(turn, rows) is called every PROGRESS_EVERY turns and once more when everything is saved,
+    with the turn the engine is on and the MoveEvent rows written so far (used by the match job queue).
+
+    With profile=True every phase of every turn is timed (see instrument.py). The summary goes in the
+    results dict under "profile" when simulating, otherwise it's match.profile (None when not profiling).
+
+    termination is the names of the termination policies that can end the match before max_turns
+    (see termination.py), results["terminated_by"] / match.terminated_by say which one did.
+    """
+
+    # Compiled board (obstacle bitmap, spawn cells, neighbor tables), cached across matches
+    ctx = get_board_context(board)
+
+    if seed is None:
+        seed = new_seed()
+
+    # move 0, updated in place by step_game from here on
+    state = GameState.start(ctx, seed)
+    prof = state.profile = EngineProfile() if profile else None
+
+    # simulate-only, nothing is saved so we never need a snapshot of state
+    if simulate:
+        return play_match(state, bot1, bot2, ctx, max_turns, termination=termination)
+
+    start = time.perf_counter()
+
+    # The replay only needs the directions, flags and spawned apples of each turn
+    encoder = ReplayEncoder(ctx.width, ctx.height, ctx.wrap)
+    encoder.add(state)
+
+    if save_move_events and background_writer:
+        # The writer thread has its own connection, so the Match has to be committed before it starts
+        match = Match.objects.create(bot1=bot1, bot2=bot2, board=board, seed=seed, params=match_params(bot1, bot2, board, max_turns, termination))
+        state.match = match
+
+        writer = MoveEventWriter(match, batch_size)
+        writer.start()
+        writer.put(state.snapshot())
+
+        def on_turn(s):
+            if prof is not None:
+                t = time.perf_counter()
+            encoder.add(s)
+            writer.put(s.snapshot())
+            if prof is not None:
+                prof.add("replay", time.perf_counter() - t)
+            if progress is not None and s.move_number % PROGRESS_EVERY == 0:
+                progress(s.move_number, writer.rows)
+
+        try:
+            results = play_match(state, bot1, bot2, ctx, max_turns, on_turn=on_turn, termination=termination)
+            writer.finish()
+        except Exception:
+            # Stop the writer and don't leave a match with half a replay around
+            writer.close()
+            match.delete()
+            raise
+
+        rows = writer.rows
+        write_seconds = writer.write_seconds
+
+        blob = encoder.finish()
+
+        # Avoid dirty writes! Made sure to find out how to do this online so it rolls back if anything fails.  
+        finish_start = time.perf_counter()
+        with transaction.atomic():
+            if save_replay:
+                match.replay = blob
+            finish_match(match, results)
+            update_match_stats(match, results)
+        # The writer thread's time overlaps the engine's, it's still time spent writing
+        db_seconds = write_seconds + time.perf_counter() - finish_start
+
+    else:
+        # Play the whole match in memory first
+        snapshots = [state.snapshot()] if save_move_events else None
+
+        def on_turn(s):
+            if prof is not None:
+                t = time.perf_counter()
+            encoder.add(s)
+            if snapshots is not None:
+                snapshots.append(s.snapshot())
+            if prof is not None:
+                prof.add("replay", time.perf_counter() - t)
+            if progress is not None and s.move_number % PROGRESS_EVERY == 0:
+                progress(s.move_number, 0)
+
+        results = play_match(state, bot1, bot2, ctx, max_turns, on_turn=on_turn, termination=termination)
+        blob = encoder.finish()
+
         # Avoid dirty writes! Made sure to find out how to do this online so it rolls back if anything fails.  
+        db_start = time.perf_counter()
         with transaction.atomic():
-            # create Match 
             match = Match.objects.create(
                 bot1=bot1,
                 bot2=bot2,
                 board=board,
+                seed=seed,
+                params=match_params(bot1, bot2, board, max_turns, termination),
+                replay=blob if save_replay else None,
             )
 
-            # move 0 
-            prev = MoveEvent.objects.create(
-                match=match,
-                move_number=0,
-                bot1_move="RIGHT",
-                bot2_move="LEFT",
-                bot1_body=b1_start,
-                bot2_body=b2_start,
-                bot1_alive=True,
-                bot2_alive=True,
-                apple_positions=apples,
-                bot1_ate=False,
-                bot2_ate=False,
-            )
-
-            # simulation loop 
-            for _ in range(max_turns):
-                if not (prev.bot1_alive or prev.bot2_alive):
-                    break
+            rows = 0
+            write_start = time.perf_counter()
+            if snapshots is not None:
+                rows = bulk_write_moves(match, snapshots, batch_size)
+            write_seconds = time.perf_counter() - write_start
 
-                data = step_game(prev, bot1, bot2, board)
+            finish_match(match, results)
+            update_match_stats(match, results)
+        db_seconds = time.perf_counter() - db_start
 
-                # Update accumulators
-                if data["bot1_ate"]:
-                    apples_a += 1
-                if data["bot2_ate"]:
-                    apples_b += 1
+    if not save_move_events:
+        mode = "replay"
+    elif background_writer:
+        mode = "thread"
+    else:
+        mode = "bulk"
+
+    match.persist_stats = make_persist_stats(
+        rows,
+        write_seconds,
+        time.perf_counter() - start,
+        batch_size,
+        mode,
+        len(blob) if save_replay else 0,
+    )
 
-                if data["bot1_alive"]:
-                    a_survival_time = data["move_number"]
-                if data["bot2_alive"]:
-                    b_survival_time = data["move_number"]
+    match.profile = None
+    if prof is not None:
+        prof.add("db_write", db_seconds)
+        prof.count("rows_written", rows)
+        match.profile = prof.summary()
 
-                prev = MoveEvent.objects.create(**data)
+    if progress is not None:
+        progress(match.total_turns, rows)
 
-            # finalize match
-            if apples_a > apples_b:
-                winner = 1
-            elif apples_b > apples_a:
-                winner = 2
-            else:
-                winner = 0
+    return match
 
-            match.a_survival_time = a_survival_time
-            match.b_survival_time = b_survival_time
-            match.apples_a = apples_a
-            match.apples_b = apples_b
-            match.winner = winner
-            match.total_turns = prev.move_number
-            match.save()
 
-            # Update stats for each bot on this board
-            update_bot_board_stats(bot1, board, 1 if winner == 1 else (2 if winner == 2 else 0), a_survival_time, apples_a)
-            update_bot_board_stats(bot2, board, 2 if winner == 1 else (1 if winner == 2 else 0), b_survival_time, apples_b)
+def finish_match(match, results):
+    """Copy the results of play_match onto match and save it"""
+    match.terminated_by = results["terminated_by"] or ""
+    match.a_survival_time = results["a_survival_time"]
+    match.b_survival_time = results["b_survival_time"]
+    match.a_cut_off = results["a_cut_off"]
+    match.b_cut_off = results["b_cut_off"]
+    match.apples_a = results["apples_a"]
+    match.apples_b = results["apples_b"]
+    match.winner = results["winner"]
+    match.total_turns = results["total_turns"]
+    match.save()
 
 
-            return match
+def update_match_stats(match, results):
+    """Update the BotBoardStats (and BotGlobalStats) of both bots of a finished match"""
+    # A batch of one, so a bot playing itself gets both results added up instead of one replacing the other
+    batch = StatsBatch()
+    batch.add_results(match.bot1_id, match.bot2_id, match.board_id, results)
+    batch.flush()
 
-    else:
-        # simulate-only
-
-        match = None
-
-        # move 0 
-        prev = FakeMoveEvent(
-            match=match,
-            move_number=0,
-            bot1_move="RIGHT",
-            bot2_move="LEFT",
-            bot1_body=b1_start,
-            bot2_body=b2_start,
-            bot1_alive=True,
-            bot2_alive=True,
-            apple_positions=apples,
-            bot1_ate=False,
-            bot2_ate=False,
-        )
 
-        # simulation loop 
-        for _ in range(max_turns):
-            if not (prev.bot1_alive or prev.bot2_alive):
-                break
 
-            data = step_game(prev, bot1, bot2, board)
-
-            # Update accumulators
-            if data["bot1_ate"]:
-                apples_a += 1
-            if data["bot2_ate"]:
-                apples_b += 1
-
-            if data["bot1_alive"]:
-                a_survival_time = data["move_number"]
-            if data["bot2_alive"]:
-                b_survival_time = data["move_number"]
-
-            prev = FakeMoveEvent(**data)
-
-        # finalize winner 
-        if apples_a > apples_b:
-            winner = 1
-        elif apples_b > apples_a:
-            winner = 2
-        else:
-            winner = 0
-
-        return {
-            "winner": winner,
-            "apples_a": apples_a,
-            "apples_b": apples_b,
-            "a_survival_time": a_survival_time,
-            "b_survival_time": b_survival_time,
-        }
+def simulate_matches(bot1, bot2, board, num_runs, seed=None, workers=None, max_turns=5000, profile=False, termination=(),
+                     margin=None, apples_margin=None, confidence=DEFAULT_CONFIDENCE):
+    """Simulate num_sims number of matches between bot1 and bot2 on board, for plotly. 
+    Return all relevent results in nice JSON format.
+    Run i is played with derive_seed(seed, i), so the same seed always gives the same results.
+    With more than one worker (SNAKE_SIMULATION_WORKERS in settings by default) the runs are spread
+    across a process pool, the results are still merged in run order so they come out the same.
+    With profile=True every run is profiled and results["profile"] adds them all up (see instrument.py).
+    termination is the names of the termination policies that can end runs early (see termination.py),
+    results["terminated_by"] counts how many runs each one ended and results["avg_total_turns"] is the
+    turns actually played per run. A bot's avg_turns leaves out the runs where it was cut off still alive.
+
+    Adaptive mode: with margin (on win rate, e.g. 0.05 for +/- 5%) and/or apples_margin (on average apples)
+    num_runs is only the cap. Runs stop as soon as both bots' intervals at confidence are that narrow
+    (see confidence.py), which for a lopsided pairing can be after a dozen runs.
+    Either way results["runs"] is the runs actually played and every bot gets win_rate_ci and avg_apples_ci."""
+    results = None
+    for results in iter_simulation(bot1, bot2, board, num_runs, seed, workers, max_turns, profile, termination,
+                                   margin, apples_margin, confidence):
+        pass
+    # The last dict it yielded got everything else added once it was done
+    return results
 
 
+def iter_simulation(bot1, bot2, board, num_runs, seed=None, workers=None, max_turns=5000, profile=False, termination=(),
+                    margin=None, apples_margin=None, confidence=DEFAULT_CONFIDENCE):
+    """
+    simulate_matches one run at a time, for showing a simulation live. Yields the same results dict after
+    every run with the totals, averages and intervals so far, and adds the rest (adaptive, profile) to it
+    once the runs are over. Closing it early stops the runs (and the process pool) right there.
+    """
+    if seed is None:
+        seed = new_seed()
+    if workers is None:
+        workers = getattr(settings, "SNAKE_SIMULATION_WORKERS", 1)
+    workers = max(1, min(workers, num_runs))
 
-def simulate_matches(bot1, bot2, board, num_runs):
-    """Simulate num_sims number of matches between bot1 and bot2 on board, for plotly. 
-    Return all relevent results in nice JSON format."""
     results = {
+        "seed": seed,
         "bot1": {
             "name": bot1.name,
             "color": bot1.color,
@@ -224,50 +397,82 @@ def simulate_matches(bot1, bot2, board, num_runs):
             "draws": 0,
             "avg_turns": 0,
             "avg_apples": 0,
+        },
+        "termination": list(termination),
+        "terminated_by": {},
+        "avg_total_turns": 0,
+        "adaptive": None,
         }
-        }
-    
-    for i in range(1, num_runs + 1):
-        match = run_match(bot1, bot2, board, simulate=True)
-        if match['winner'] == 1:
-            results["bot1"]["wins"] += 1
-            results["bot2"]["losses"] += 1
-        elif match['winner'] == 2:
-            results["bot2"]["wins"] += 1
-            results["bot1"]["losses"] += 1
-        else:
-            results["bot1"]["draws"] += 1
-            results["bot2"]["draws"] += 1
-
-        results['bot1']['avg_apples'] = (results['bot1']['avg_apples']*(i-1))/i + match["apples_a"]/i
-        results['bot2']['avg_apples'] = (results['bot2']['avg_apples']*(i-1))/i + match["apples_b"]/i 
-
-        results['bot1']['avg_turns'] = (results['bot1']['avg_turns']*(i-1))/i + match["a_survival_time"]/i
-        results['bot2']['avg_turns'] = (results['bot2']['avg_turns']*(i-1))/i + match["b_survival_time"]/i 
-
-    
-    return results
 
-def update_bot_board_stats(bot, board, outcome, turns, apples):
-    """Helper function to update bot stats in the new BotBoardStats model"""
+    adaptive = margin is not None or apples_margin is not None
+    estimate = WinRateEstimate()
 
-    # get_or_create method lets us easily prevent duplicates
-    stats, _ = BotBoardStats.objects.get_or_create(
-        bot=bot,
-        board=board
-    )
+    seeds = (derive_seed(seed, i) for i in range(1, num_runs + 1))
+    if workers > 1:
+        ctx = get_board_context(board)
+        # Adaptive runs only hand out a few runs per worker ahead of time so stopping doesn't waste the rest
+        window = workers * 2 if adaptive else None
+        matches = simulate_parallel(bot_params(bot1), bot_params(bot2), ctx, seeds, max_turns, workers, profile, termination, window)
+    else:
+        matches = (
+            run_match(bot1, bot2, board, max_turns=max_turns, simulate=True, seed=s, profile=profile, termination=termination)
+            for s in seeds
+        )
 
-    stats.games += 1
+    profiles = []
+    turn_runs = {"bot1": 0, "bot2": 0}
+    try:
+        for i, match in enumerate(matches, 1):
+            if profile:
+                profiles.append(match["profile"])
+
+            if match["terminated_by"] is not None:
+                counts = results["terminated_by"]
+                counts[match["terminated_by"]] = counts.get(match["terminated_by"], 0) + 1
+            results["avg_total_turns"] = (results["avg_total_turns"]*(i-1))/i + match["total_turns"]/i
+
+            if match['winner'] == 1:
+                results["bot1"]["wins"] += 1
+                results["bot2"]["losses"] += 1
+            elif match['winner'] == 2:
+                results["bot2"]["wins"] += 1
+                results["bot1"]["losses"] += 1
+            else:
+                results["bot1"]["draws"] += 1
+                results["bot2"]["draws"] += 1
 
-    if outcome == 1:
-        stats.wins += 1
-    elif outcome == 2:
-        stats.losses += 1
-    else:
-        stats.draws += 1
+            results['bot1']['avg_apples'] = (results['bot1']['avg_apples']*(i-1))/i + match["apples_a"]/i
+            results['bot2']['avg_apples'] = (results['bot2']['avg_apples']*(i-1))/i + match["apples_b"]/i 
+
+            # Survival times that got cut off by early stopping aren't deaths, so they're left out of avg_turns
+            for bot, survival, cut_off in (("bot1", "a_survival_time", "a_cut_off"), ("bot2", "b_survival_time", "b_cut_off")):
+                if not match[cut_off]:
+                    turn_runs[bot] += 1
+                    n = turn_runs[bot]
+                    results[bot]['avg_turns'] = (results[bot]['avg_turns']*(n-1))/n + match[survival]/n
 
-    # running averages
-    stats.avg_turns = (stats.avg_turns*(stats.games-1))/stats.games + turns / stats.games
-    stats.avg_apples = (stats.avg_apples*(stats.games-1))/stats.games + apples / stats.games
+            estimate.add(match)
+            estimate.report(results, confidence)
+            yield results
 
-    stats.save()
+            if adaptive and estimate.precise_enough(margin, apples_margin, confidence):
+                break
+    finally:
+        # Shuts the process pool (if there is one) down when we stopped before the last seed or got closed
+        matches.close()
+
+    if adaptive:
+        results["adaptive"] = {
+            "margin": margin,
+            "apples_margin": apples_margin,
+            "max_runs": num_runs,
+            "stopped_early": estimate.runs < num_runs,
+        }
+
+    if profile:
+        results["profile"] = merge_summaries(profiles)
+
+def update_bot_board_stats(bot, board, outcome, turns, apples):
+    """Helper function to update bot stats in the new BotBoardStats model.
+    outcome is 1 for a win, 2 for a loss and 0 for a draw. Safe with other matches finishing at the same time."""
+    apply_stats({(bot.pk, board.pk): outcome_change(outcome, turns, apples)})
@@ -0,0 +1,26 @@
+# File: seeding.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Seeds for the engine. Every match, simulation and board generation gets its own
+# random.Random(seed) instead of the global random module, so anything can be played again exactly
+# from its stored seed.
+
+import random
+
+# Seeds have to fit in a (signed 64 bit) BigIntegerField
+SEED_BITS = 63
+
+# Bumped whenever the same seed and params would play out a different match (like drawing the
+# random numbers in a different order), so older matches aren't played again with the wrong engine.
+# Matches saved before this was stored count as version 1.
+ENGINE_VERSION = 2
+
+
+def new_seed():
+    """Return a fresh random seed"""
+    return random.SystemRandom().getrandbits(SEED_BITS)
+
+
+def derive_seed(seed, index):
+    """Return the seed for run number index of something seeded with seed.
+    Only depends on (seed, index) so runs can be played in any order or process."""
+    return random.Random(f"{seed}:{index}").getrandbits(SEED_BITS)
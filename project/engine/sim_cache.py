@@ -0,0 +1,107 @@
+# File: sim_cache.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Cache of simulation results in the database (SimulationRun). A simulation only depends
+# on both bots' personalities, the board, the run count, the seed and the engine options, so those are
+# hashed into a key and the same request after that just loads the stored results dict.
+# Editing a bot or board changes what gets hashed, so old entries are never wrong, just unused, and get
+# evicted once they're older than SNAKE_SIMULATION_CACHE_DAYS or past the SNAKE_SIMULATION_CACHE_SIZE
+# most recently used.
+
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import SimulationRun
+from .run_match import board_params, bot_params
+from .seeding import ENGINE_VERSION
+
+# Defaults for the settings
+SIMULATION_CACHE_SIZE = 500
+SIMULATION_CACHE_DAYS = 30
+
+
+def _hash(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def simulation_config(bot1, bot2, board, runs, options):
+    """Everything other than the seed that decides a simulation's results.
+    options are the keyword arguments the engine gets (plus "batch" for which engine)."""
+    return {
+        "engine": ENGINE_VERSION,
+        "bot1": bot_params(bot1),
+        "bot2": bot_params(bot2),
+        "board": board_params(board),
+        "runs": runs,
+        "options": options,
+    }
+
+
+def simulation_keys(bot1, bot2, board, runs, seed, options):
+    """(key, config_key) of a simulation, config_key leaves the seed out"""
+    config = simulation_config(bot1, bot2, board, runs, options)
+    return _hash(dict(config, seed=seed)), _hash(config)
+
+
+def get_cached_simulation(bot1, bot2, board, runs, seed, options):
+    """
+    Stored results of this simulation, or None.
+    Without a seed any stored seed will do, since the user asked for a random one anyway.
+    """
+    key, config_key = simulation_keys(bot1, bot2, board, runs, seed, options)
+    if seed is None:
+        run = SimulationRun.objects.filter(config_key=config_key).order_by("-last_used").first()
+    else:
+        run = SimulationRun.objects.filter(key=key).first()
+    if run is None:
+        return None
+
+    SimulationRun.objects.filter(pk=run.pk).update(last_used=timezone.now(), hits=F("hits") + 1)
+
+    # Names and colors aren't part of the key, show the current ones
+    results = run.results
+    for bot, name in ((bot1, "bot1"), (bot2, "bot2")):
+        results[name]["name"] = bot.name
+        results[name]["color"] = bot.color
+    return results
+
+
+def cache_simulation(bot1, bot2, board, runs, options, results):
+    """Store the results of a simulation (results["seed"] is the seed it actually used) and evict old ones"""
+    key, config_key = simulation_keys(bot1, bot2, board, runs, results["seed"], options)
+    try:
+        with transaction.atomic():
+            SimulationRun.objects.create(
+                key=key,
+                config_key=config_key,
+                bot1=bot1,
+                bot2=bot2,
+                board=board,
+                runs=runs,
+                seed=results["seed"],
+                results=results,
+            )
+    except IntegrityError:
+        # Someone else just stored the same simulation, theirs is just as good
+        pass
+    evict_simulations()
+
+
+def evict_simulations():
+    """Delete entries not used in SNAKE_SIMULATION_CACHE_DAYS and all but the SNAKE_SIMULATION_CACHE_SIZE
+    most recently used ones. Returns how many were deleted."""
+    days = getattr(settings, "SNAKE_SIMULATION_CACHE_DAYS", SIMULATION_CACHE_DAYS)
+    size = getattr(settings, "SNAKE_SIMULATION_CACHE_SIZE", SIMULATION_CACHE_SIZE)
+
+    deleted, _ = SimulationRun.objects.filter(last_used__lt=timezone.now() - timedelta(days=days)).delete()
+
+    # Everything past the newest size entries, only ever a few since this runs on every store
+    stale = list(SimulationRun.objects.order_by("-last_used", "-pk").values_list("pk", flat=True)[size:])
+    if stale:
+        deleted += SimulationRun.objects.filter(pk__in=stale).delete()[0]
+    return deleted
@@ -0,0 +1,129 @@
+# File: sim_jobs.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Simulations asked for on the site, played by the match workers instead of inside a web
+# request. SimulationView queues a SimulationJob and shows the live results page, a match worker claims
+# it like a MatchJob and writes the totals so far onto the job every SIMULATION_PROGRESS_SECONDS, and
+# SimulationStreamView only reads them back out (and marks the job as still watched). Cancelling a job
+# (the Stop button, or no page following it for SIMULATION_WATCH_GRACE_SECONDS) is a status change the
+# worker sees on its next progress write, which stops the runs.
+
+import time
+import traceback
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import SimulationJob
+from .run_match import iter_simulation
+from .seeding import new_seed
+from .sim_cache import cache_simulation
+
+# How often the worker writes the totals so far onto the job (and checks it hasn't been cancelled)
+SIMULATION_PROGRESS_SECONDS = 0.25
+
+# A running job that hasn't written progress in this long has lost its worker and can be claimed again
+SIMULATION_STALE_SECONDS = 300
+
+# A job no live page has followed in this long gets cancelled. EventSource reconnects on its own,
+# so a dropped connection or a reload comes back well before then and the runs keep going.
+SIMULATION_WATCH_GRACE_SECONDS = 30
+
+
+def queue_simulation(bot1, bot2, board, runs, seed=None, options=None, batch=False):
+    """
+    Queue a simulation for a match worker, returns the SimulationJob. options are the engine's keyword
+    arguments, simulate_matches' or simulate_batch's if batch.
+    """
+    if seed is None:
+        seed = new_seed()
+    options = dict(options or {})
+    if "termination" in options:
+        options["termination"] = list(options["termination"])
+    return SimulationJob.objects.create(
+        bot1=bot1, bot2=bot2, board=board, runs=runs, seed=seed, options=options, batch=batch, watched_at=timezone.now(),
+    )
+
+
+def cancel_simulation(pk):
+    """Stop a queued or running simulation, returns True if it was still going"""
+    return bool(
+        SimulationJob.objects
+        .filter(pk=pk, status__in=(SimulationJob.QUEUED, SimulationJob.RUNNING))
+        .update(status=SimulationJob.CANCELLED, updated_at=timezone.now())
+    )
+
+
+def unwatched(jobs):
+    """The SimulationJobs of jobs (a queryset) no live page has followed in SIMULATION_WATCH_GRACE_SECONDS"""
+    return jobs.filter(watched_at__lt=timezone.now() - timedelta(seconds=SIMULATION_WATCH_GRACE_SECONDS))
+
+
+def claim_simulation(worker):
+    """
+    Claim the oldest queued simulation (or a running one whose worker went quiet) for worker, like claim_job.
+    Ones whose page went away while they waited are cancelled instead of played.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=SIMULATION_STALE_SECONDS)
+    unwatched(SimulationJob.objects.filter(status__in=(SimulationJob.QUEUED, SimulationJob.RUNNING))).update(
+        status=SimulationJob.CANCELLED, updated_at=now,
+    )
+    candidates = (
+        SimulationJob.objects
+        .filter(Q(status=SimulationJob.QUEUED) | Q(status=SimulationJob.RUNNING, updated_at__lt=stale))
+        .order_by("created_at")
+        .values_list("pk", "status", "updated_at")[:10]
+    )
+
+    for pk, status, updated_at in candidates:
+        claimed = SimulationJob.objects.filter(pk=pk, status=status, updated_at=updated_at).update(
+            status=SimulationJob.RUNNING,
+            worker=worker,
+            started_at=now,
+            updated_at=now,
+        )
+        if claimed:
+            return SimulationJob.objects.select_related("bot1", "bot2", "board").get(pk=pk)
+
+    return None
+
+
+def run_simulation_job(job):
+    """Play a claimed simulation, writing its totals as it goes. Returns True if it finished (and was stored)."""
+    # Only while it's still ours and nobody cancelled it
+    mine = SimulationJob.objects.filter(pk=job.pk, worker=job.worker, status=SimulationJob.RUNNING)
+    options = dict(job.options)
+    if "termination" in options:
+        options["termination"] = tuple(options["termination"])
+
+    if job.batch:
+        # numpy is only needed for the batch engine
+        from .batch import iter_batch
+        steps = iter_batch(job.bot1, job.bot2, job.board, job.runs, seed=job.seed, **options)
+    else:
+        steps = iter_simulation(job.bot1, job.bot2, job.board, job.runs, seed=job.seed, **options)
+    results = None
+    written = time.monotonic()
+    try:
+        for results in steps:
+            now = time.monotonic()
+            if now - written < SIMULATION_PROGRESS_SECONDS:
+                continue
+            written = now
+            if unwatched(mine).update(status=SimulationJob.CANCELLED, updated_at=timezone.now()):
+                # Nobody's following it anymore
+                return False
+            if not mine.update(results=results, updated_at=timezone.now()):
+                # Cancelled (or taken over), closing steps below stops the runs and the process pool
+                return False
+    except Exception:
+        mine.update(status=SimulationJob.FAILED, error=traceback.format_exc(), updated_at=timezone.now())
+        return False
+    finally:
+        steps.close()
+
+    if not mine.update(status=SimulationJob.DONE, results=results, updated_at=timezone.now()):
+        return False
+    cache_simulation(job.bot1, job.bot2, job.board, job.runs, dict(options, batch=job.batch), results)
+    return True
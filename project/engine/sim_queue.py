@@ -0,0 +1,222 @@
+# File: sim_queue.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Work queue for spreading big batches of simulated matches (overnight league runs) across
+# any number of machines. A coordinator splits every pairing's runs into SimulationUnits (snapshots of
+# both bots' personalities and the board, a seed and a range of run numbers) in the shared database,
+# and match workers on every host that can reach it lease units, play them and store the stats they
+# add up to. The coordinator then merges finished units into BotBoardStats, each one exactly once.
+# Leases work like the MatchJob heartbeat: a worker renews its lease while it plays, and a unit whose
+# lease ran out (the worker died or lost the machine) can be claimed by anyone else. Runs only depend
+# on their seed, so a unit played twice gives the same stats and whoever finishes it first wins.
+# Every host needs its clock roughly right since leases are timestamps.
+
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from ..models import Board, Bot, SimulationUnit
+from .context import get_board_context
+from .run_match import board_params, bot_params, play_match
+from .seeding import derive_seed
+from .state import GameState
+from .stats import STAT_FIELDS, StatsBatch
+
+# Default runs per unit, a few seconds of work so losing one doesn't lose much
+UNIT_SIZE = 50
+
+# Default length of a lease, SNAKE_UNIT_LEASE_SECONDS in settings
+UNIT_LEASE_SECONDS = 120
+
+# A unit whose lease ran out this many times is marked failed instead of handed out again
+UNIT_MAX_ATTEMPTS = 3
+
+
+def lease_seconds():
+    return getattr(settings, "SNAKE_UNIT_LEASE_SECONDS", UNIT_LEASE_SECONDS)
+
+
+def pairings(bots, boards):
+    """Every pair of bots (lower pk first) on every board, as (bot1, bot2, board)"""
+    bots = sorted(bots, key=lambda bot: bot.pk)
+    return [(a, b, board) for board in boards for i, a in enumerate(bots) for b in bots[i + 1:]]
+
+
+def enqueue_simulations(batch, games, runs, seed, unit_size=UNIT_SIZE, max_turns=5000, termination=()):
+    """
+    Queue runs simulated matches of each (bot1, bot2, board) in games as units of unit_size runs.
+    Each pairing gets its own seed from seed and the units take turns putting each bot first.
+    Returns how many units were queued.
+    """
+    units = []
+    for bot1, bot2, board in games:
+        pair_seed = derive_seed(seed, f"{bot1.pk}:{bot2.pk}:{board.pk}")
+        for n, first in enumerate(range(1, runs + 1, unit_size)):
+            a, b = (bot1, bot2) if n % 2 == 0 else (bot2, bot1)
+            units.append(SimulationUnit(
+                batch=batch,
+                bot1=a,
+                bot2=b,
+                board=board,
+                bots={"bot1": bot_params(a), "bot2": bot_params(b)},
+                board_params=board_params(board),
+                seed=pair_seed,
+                first=first,
+                count=min(unit_size, runs + 1 - first),
+                max_turns=max_turns,
+                termination=list(termination),
+            ))
+    SimulationUnit.objects.bulk_create(units, batch_size=500)
+    return len(units)
+
+
+def claim_unit(worker):
+    """
+    Lease the oldest queued unit (or one whose lease ran out) for worker, like claim_job.
+    Returns the SimulationUnit or None if there's nothing to do.
+    """
+    now = timezone.now()
+    candidates = (
+        SimulationUnit.objects
+        .filter(Q(status=SimulationUnit.QUEUED) | Q(status=SimulationUnit.RUNNING, lease_until__lt=now))
+        .order_by("created_at", "pk")
+        .values_list("pk", "status", "attempts")[:10]
+    )
+
+    for pk, status, attempts in candidates:
+        # attempts goes up on every claim, so only one worker's UPDATE can match the row as it was
+        unit = SimulationUnit.objects.filter(pk=pk, status=status, attempts=attempts)
+        if attempts >= UNIT_MAX_ATTEMPTS:
+            unit.update(
+                status=SimulationUnit.FAILED,
+                lease_until=None,
+                error=f"Lease ran out {attempts} times, its workers keep dying",
+                updated_at=now,
+            )
+            continue
+
+        claimed = unit.update(
+            status=SimulationUnit.RUNNING,
+            worker=worker,
+            attempts=F("attempts") + 1,
+            lease_until=now + timedelta(seconds=lease_seconds()),
+            updated_at=now,
+        )
+        if claimed:
+            return SimulationUnit.objects.get(pk=pk)
+
+    return None
+
+
+def play_unit(unit, renew=None):
+    """
+    Play all of unit's runs and return its results: the stats changes they add up to as
+    [bot pk, board pk, change] (see stats.py), how many matches, which termination policies ended them
+    and how long it took. renew() is called between runs and returning False stops it (returns None).
+    """
+    # The board as it was when the unit was queued, not whatever it is now
+    ctx = get_board_context(Board(**unit.board_params))
+    bot1 = Bot(pk=unit.bot1_id, **unit.bots["bot1"])
+    bot2 = Bot(pk=unit.bot2_id, **unit.bots["bot2"])
+    termination = tuple(unit.termination)
+
+    stats = StatsBatch()
+    terminated_by = {}
+    start = time.perf_counter()
+    for i in range(unit.first, unit.first + unit.count):
+        if renew is not None and not renew():
+            return None
+        results = play_match(GameState.start(ctx, derive_seed(unit.seed, i)), bot1, bot2, ctx, unit.max_turns, termination=termination)
+        stats.add_results(bot1.pk, bot2.pk, unit.board_id, results)
+        if results["terminated_by"] is not None:
+            terminated_by[results["terminated_by"]] = terminated_by.get(results["terminated_by"], 0) + 1
+
+    return {
+        "stats": [[bot, board, change] for (bot, board), change in stats.changes.items()],
+        "matches": stats.matches,
+        "terminated_by": terminated_by,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def run_unit(unit):
+    """Play a claimed unit for a match worker, renewing its lease as it goes. Returns True if its results were saved."""
+    # Filtering on the attempt too means a worker whose lease ran out can't touch the unit once someone else has it
+    mine = SimulationUnit.objects.filter(pk=unit.pk, worker=unit.worker, attempts=unit.attempts, status=SimulationUnit.RUNNING)
+    lease = lease_seconds()
+    renewed = time.monotonic()
+
+    def renew():
+        nonlocal renewed
+        # A third of the way through the lease is plenty early and keeps the writes down
+        if time.monotonic() - renewed < lease / 3:
+            return True
+        renewed = time.monotonic()
+        now = timezone.now()
+        return bool(mine.update(lease_until=now + timedelta(seconds=lease), updated_at=now))
+
+    try:
+        results = play_unit(unit, renew)
+    except Exception:
+        mine.update(status=SimulationUnit.FAILED, lease_until=None, error=traceback.format_exc(), updated_at=timezone.now())
+        return False
+
+    if results is None:
+        return False
+    return bool(mine.update(status=SimulationUnit.DONE, lease_until=None, results=results, updated_at=timezone.now()))
+
+
+def merge_units(batch=None):
+    """
+    Add the stats of every finished unit (of batch, or of every batch) to BotBoardStats and BotGlobalStats.
+    A unit is only marked merged in the same transaction its stats are written in, so a crash can't
+    merge it twice or lose it, and neither can two coordinators merging at once. Returns (units, matches) merged.
+    """
+    done = SimulationUnit.objects.filter(status=SimulationUnit.DONE)
+    if batch is not None:
+        done = done.filter(batch=batch)
+
+    units = 0
+    stats = StatsBatch()
+    with transaction.atomic():
+        for pk, results in done.values_list("pk", "results"):
+            if not SimulationUnit.objects.filter(pk=pk, status=SimulationUnit.DONE).update(status=SimulationUnit.MERGED):
+                continue
+            for bot, board, change in results["stats"]:
+                if len(change) < len(STAT_FIELDS):
+                    # Played before turns_games was a stat, every game's turns went into turns_sum then
+                    change = [*change, change[0]]
+                stats.add((bot, board), change)
+            stats.matches += results["matches"]
+            units += 1
+        matches = stats.flush()
+    return units, matches
+
+
+def unit_counts(batch):
+    """How many of batch's units are in each status, plus "runs" played so far"""
+    counts = {status: 0 for status, _ in SimulationUnit.STATUS_CHOICES}
+    rows = SimulationUnit.objects.filter(batch=batch).values("status").annotate(n=Count("pk"))
+    for row in rows:
+        counts[row["status"]] = row["n"]
+    counts["runs"] = (
+        SimulationUnit.objects
+        .filter(batch=batch, status__in=(SimulationUnit.DONE, SimulationUnit.MERGED))
+        .aggregate(runs=Sum("count"))["runs"] or 0
+    )
+    return counts
+
+
+def retry_failed(batch):
+    """Queue batch's failed units again, returns how many"""
+    return SimulationUnit.objects.filter(batch=batch, status=SimulationUnit.FAILED).update(
+        status=SimulationUnit.QUEUED,
+        attempts=0,
+        worker="",
+        error="",
+        updated_at=timezone.now(),
+    )
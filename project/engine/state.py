@@ -0,0 +1,114 @@
+# File: state.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Mutable game state for the arena engine. step_game updates one GameState in place
+# every turn instead of copying both bodies into a new dict, and only builds a MoveEvent-shaped
+# snapshot when something (like saving to the database) actually asks for one.
+
+import random
+from collections import deque
+from .occupancy import OccupancyGrid, FreeCellSet, SNAKE1, SNAKE2
+from .distance import AppleDistanceField
+
+
+class GameState:
+    """State of a match at one turn. Field names match MoveEvent so a snapshot
+    can go straight into MoveEvent(**state.snapshot())"""
+
+    __slots__ = (
+        "match", "move_number",
+        "bot1_move", "bot2_move",
+        "bot1_body", "bot2_body",
+        "bot1_alive", "bot2_alive",
+        "apple_positions",
+        "bot1_ate", "bot2_ate",
+        "grid", "seed", "rng", "field", "spawnable", "profile", "random_picks",
+    )
+
+    def __init__(self, match, move_number, bot1_move, bot2_move, bot1_body, bot2_body,
+                 bot1_alive, bot2_alive, apple_positions, bot1_ate, bot2_ate, grid, seed, field=None, spawnable=None, profile=None):
+        self.match = match
+        self.move_number = move_number
+        self.bot1_move = bot1_move
+        self.bot2_move = bot2_move
+        # deques so a new head is appendleft and a tail is pop, both O(1)
+        self.bot1_body = deque(bot1_body)
+        self.bot2_body = deque(bot2_body)
+        self.bot1_alive = bot1_alive
+        self.bot2_alive = bot2_alive
+        self.apple_positions = list(apple_positions)
+        self.bot1_ate = bot1_ate
+        self.bot2_ate = bot2_ate
+        # OccupancyGrid kept in sync with both bodies
+        self.grid = grid
+        # Everything random in the match comes from here, so the same seed always plays the same match
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # AppleDistanceField both bots read their path to food from (None means a BFS per head instead)
+        self.field = field
+        # FreeCellSet of the spawn cells an apple could go in right now (free and no apple yet)
+        self.spawnable = spawnable
+        # EngineProfile step_game times its phases into (see instrument.py), None unless profiling
+        self.profile = profile
+        # How many bot decisions so far came down to the rng (chaos or a tie), see RepetitionLoop
+        self.random_picks = 0
+
+    @classmethod
+    def start(cls, ctx, seed, match=None, grid_class=OccupancyGrid, distance_field=True):
+        """
+        Build move 0 of a new match on a BoardContext: starting bodies, initial apples and the occupancy grid.
+        seed seeds the match's random number generator (see seeding.py).
+        grid_class and distance_field let the benchmarks swap in the older ways of doing things.
+        """
+
+        b1_start = ctx.start1
+        b2_start = ctx.start2
+
+        grid = grid_class(ctx)
+        grid.place(b1_start, SNAKE1)
+        grid.place(b2_start, SNAKE2)
+
+        state = cls(
+            match=match,
+            move_number=0,
+            bot1_move="RIGHT",
+            bot2_move="LEFT",
+            bot1_body=b1_start,
+            bot2_body=b2_start,
+            bot1_alive=True,
+            bot2_alive=True,
+            apple_positions=[],
+            bot1_ate=False,
+            bot2_ate=False,
+            grid=grid,
+            seed=seed,
+        )
+
+        # Initial apples, each one a single draw from the cells that are still open
+        cells = grid.cells
+        spawn_map = ctx.spawn_map
+        state.spawnable = FreeCellSet(len(cells), (i for i in range(len(cells)) if spawn_map[i] and not cells[i]))
+
+        apples = state.apple_positions
+        while len(apples) < ctx.food_count and state.spawnable:
+            apples.append(ctx.position(state.spawnable.pop_random(state.rng)))
+
+        if distance_field:
+            state.field = AppleDistanceField(ctx, grid, apples)
+
+        return state
+
+    def snapshot(self):
+        """Return a copy of this turn as a dict suitable for MoveEvent.objects.create"""
+        return {
+            "match": self.match,
+            "move_number": self.move_number,
+            "bot1_move": self.bot1_move,
+            "bot2_move": self.bot2_move,
+            "bot1_body": list(self.bot1_body),
+            "bot2_body": list(self.bot2_body),
+            "bot1_alive": self.bot1_alive,
+            "bot2_alive": self.bot2_alive,
+            "apple_positions": list(self.apple_positions),
+            "bot1_ate": self.bot1_ate,
+            "bot2_ate": self.bot2_ate,
+        }
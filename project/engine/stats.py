@@ -0,0 +1,117 @@
+# File: stats.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Adding finished matches to BotBoardStats and BotGlobalStats.
+# Every change is an UPDATE ... SET games = games + 1, ... with F() expressions, so the database adds
+# it to whatever is there at that moment. Two matches finishing at the same time can't overwrite each
+# other's numbers, and nobody has to lock and read the row first. Totals are stored instead of running
+# averages so they stay exact. StatsBatch adds up lots of matches in memory and writes them all in one
+# transaction (one UPDATE per row touched) for tournaments.
+
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+from ..models import BotBoardStats, BotGlobalStats
+
+# Order of the numbers in a stats change. turns_games is how many of the games are in turns_sum.
+STAT_FIELDS = ("games", "wins", "losses", "draws", "turns_sum", "apples_sum", "turns_games")
+
+
+def outcome_change(outcome, turns, apples, cut_off=False):
+    """
+    Stats change (in STAT_FIELDS order) for one match. outcome is 1 for a win, 2 for a loss, 0 for a draw.
+    With cut_off the bot was still alive when the match was stopped early, so turns isn't when it died
+    and is left out of turns_sum.
+    """
+    if cut_off:
+        return (1, int(outcome == 1), int(outcome == 2), int(outcome == 0), 0, apples, 0)
+    return (1, int(outcome == 1), int(outcome == 2), int(outcome == 0), turns, apples, 1)
+
+
+def match_changes(bot1_id, bot2_id, board_id, results):
+    """The two ((bot pk, board pk), change) pairs for a finished match's results"""
+    winner = results["winner"]
+    return (
+        ((bot1_id, board_id), outcome_change(
+            1 if winner == 1 else (2 if winner == 2 else 0), results["a_survival_time"], results["apples_a"], results.get("a_cut_off", False),
+        )),
+        ((bot2_id, board_id), outcome_change(
+            2 if winner == 1 else (1 if winner == 2 else 0), results["b_survival_time"], results["apples_b"], results.get("b_cut_off", False),
+        )),
+    )
+
+
+def _add(model, lookup, change, extra=None):
+    """Add change to the row of model matching lookup, creating it if it isn't there yet"""
+    values = dict(zip(STAT_FIELDS, change))
+    updates = {field: F(field) + value for field, value in values.items()}
+    if extra:
+        updates.update(extra(values))
+
+    if model.objects.filter(**lookup).update(**updates):
+        return
+
+    try:
+        # savepoint, so losing the race to create it doesn't break the caller's transaction
+        with transaction.atomic():
+            row = model(**lookup, **values)
+            if model is BotGlobalStats:
+                row.win_rate = row.wins / row.games if row.games else 0.0
+            row.save(force_insert=True)
+    except IntegrityError:
+        # Someone else created it first, so now there's something to add to
+        model.objects.filter(**lookup).update(**updates)
+
+
+def _win_rate(values):
+    """Keep BotGlobalStats.win_rate in step in the same UPDATE (F() is the value before it)"""
+    return {"win_rate": Cast(F("wins") + values["wins"], FloatField()) / (F("games") + values["games"])}
+
+
+def apply_stats(changes):
+    """
+    Write stats changes, a dict of (bot pk, board pk) -> change in STAT_FIELDS order, to BotBoardStats
+    and BotGlobalStats in one transaction. Rows are always touched in the same (sorted) order so two
+    transactions doing this at once can't deadlock.
+    """
+    per_bot = defaultdict(lambda: [0] * len(STAT_FIELDS))
+    for (bot_id, _), change in changes.items():
+        total = per_bot[bot_id]
+        for i, value in enumerate(change):
+            total[i] += value
+
+    with transaction.atomic():
+        for bot_id, board_id in sorted(changes):
+            _add(BotBoardStats, {"bot_id": bot_id, "board_id": board_id}, changes[bot_id, board_id])
+        for bot_id in sorted(per_bot):
+            _add(BotGlobalStats, {"bot_id": bot_id}, per_bot[bot_id], _win_rate)
+
+
+class StatsBatch:
+    """Adds up the stats of many matches in memory, then writes them with a single apply_stats"""
+
+    def __init__(self):
+        self.changes = defaultdict(lambda: [0] * len(STAT_FIELDS))
+        self.matches = 0
+
+    def add(self, key, change):
+        total = self.changes[key]
+        for i, value in enumerate(change):
+            total[i] += value
+
+    def add_results(self, bot1_id, bot2_id, board_id, results):
+        """Add a finished match (results dict from play_match)"""
+        for key, change in match_changes(bot1_id, bot2_id, board_id, results):
+            self.add(key, change)
+        self.matches += 1
+
+    def flush(self):
+        """Write everything added so far and start over. Returns how many matches were written."""
+        matches = self.matches
+        if self.changes:
+            apply_stats(dict(self.changes))
+        self.changes.clear()
+        self.matches = 0
+        return matches
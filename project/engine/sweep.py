@@ -0,0 +1,276 @@
+# File: sweep.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Parameter sweeps for tuning bot personalities. Candidates (greediness, caution, direction_bias,
+# circliness, introversion, chaos) come from a grid, random search or an evolutionary search, and each one is
+# scored by playing a fixed pool of opponents on the chosen boards. Every candidate plays the same seeds,
+# so they're compared on the exact same games. Candidates are spread across a process pool and the
+# progress (every scored candidate plus the generations so far) is checkpointed to a JSON file after each
+# chunk, so a sweep that gets stopped picks up where it left off. The best ones can be saved as Bots.
+
+import itertools
+import json
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+from ..models import Bot
+from .context import get_board_context
+from .pool import evaluate_parallel
+from .run_match import BOT_PARAMS, bot_params, play_match
+from .seeding import derive_seed
+from .state import GameState
+
+# Same ranges and step as the sliders in CreateBotForm, so a result can be typed straight back in
+PARAM_RANGES = {
+    "greediness": (0.0, 2.0),
+    "caution": (0.0, 2.0),
+    "direction_bias": (-1.0, 1.0),
+    "circliness": (0.0, 2.0),
+    "introversion": (0.0, 2.0),
+    "chaos": (0.0, 1.0),
+}
+PARAM_STEP = 0.05
+
+SWEEP_STRATEGIES = ("grid", "random", "evolve")
+
+# How many of the best candidates the checkpoint keeps a copy of under "best"
+CHECKPOINT_BEST = 10
+
+
+def snap(field, value):
+    """Clamp value to field's range and round it to the slider step"""
+    lo, hi = PARAM_RANGES[field]
+    value = min(hi, max(lo, value))
+    return round(round(value / PARAM_STEP) * PARAM_STEP, 2)
+
+
+def candidate_key(params):
+    """String key of a candidate, the same for the same parameters"""
+    return ",".join(f"{params[field]:g}" for field in BOT_PARAMS)
+
+
+def grid_candidates(steps):
+    """Every combination of steps evenly spaced values of each parameter (steps ** 6 candidates)"""
+    axes = []
+    for field in BOT_PARAMS:
+        lo, hi = PARAM_RANGES[field]
+        if steps == 1:
+            axes.append([snap(field, (lo + hi) / 2)])
+        else:
+            axes.append(sorted({snap(field, lo + (hi - lo) * i / (steps - 1)) for i in range(steps)}))
+    return [dict(zip(BOT_PARAMS, values)) for values in itertools.product(*axes)]
+
+
+def random_candidate(rng):
+    """Uniformly random parameters"""
+    return {field: snap(field, rng.uniform(*PARAM_RANGES[field])) for field in BOT_PARAMS}
+
+
+def mutate(params, rng, scale=0.15):
+    """Copy of params with every parameter nudged by a gaussian, scale is a fraction of its range"""
+    child = {}
+    for field in BOT_PARAMS:
+        lo, hi = PARAM_RANGES[field]
+        child[field] = snap(field, params[field] + rng.gauss(0, scale * (hi - lo)))
+    return child
+
+
+def crossover(a, b, rng):
+    """Each parameter taken from a or b at random"""
+    return {field: (a if rng.random() < 0.5 else b)[field] for field in BOT_PARAMS}
+
+
+def play_candidate(params, opponents, ctxs, games, max_turns, termination):
+    """
+    Play all of one candidate's games and add them up.
+    opponents maps bot pk -> Bot, ctxs board pk -> BoardContext and games are (opponent pk, board pk, seed, side)
+    with side 1 meaning the candidate is bot 1. Returns {"games", "wins", "losses", "draws", "apples"}.
+    """
+    bot = Bot(**params)
+    totals = {"games": 0, "wins": 0, "losses": 0, "draws": 0, "apples": 0}
+    for opponent, board, seed, side in games:
+        ctx = ctxs[board]
+        if side == 1:
+            results = play_match(GameState.start(ctx, seed), bot, opponents[opponent], ctx, max_turns, termination=termination)
+            apples = results["apples_a"]
+        else:
+            results = play_match(GameState.start(ctx, seed), opponents[opponent], bot, ctx, max_turns, termination=termination)
+            apples = results["apples_b"]
+
+        totals["games"] += 1
+        totals["apples"] += apples
+        if results["winner"] == 0:
+            totals["draws"] += 1
+        elif results["winner"] == side:
+            totals["wins"] += 1
+        else:
+            totals["losses"] += 1
+    return totals
+
+
+def score(totals):
+    """Win rate with draws as half a win, and apples per game to break ties"""
+    games = totals["games"] or 1
+    return ((totals["wins"] + 0.5 * totals["draws"]) / games, totals["apples"] / games)
+
+
+class Sweep:
+    """
+    One sweep, set up with the opponent Bots and Boards to score candidates on.
+    games is how many games each candidate plays against every opponent on every board (taking turns being bot 1).
+    """
+
+    def __init__(self, strategy, opponents, boards, games=4, max_turns=2000, seed=0, termination=(),
+                 checkpoint=None, steps=3, candidates=100, population=24, generations=10):
+        if strategy not in SWEEP_STRATEGIES:
+            raise ValueError(f"Unknown sweep strategy {strategy}")
+        self.strategy = strategy
+        self.opponents = list(opponents)
+        self.boards = list(boards)
+        self.max_turns = max_turns
+        self.seed = seed
+        self.termination = tuple(termination)
+        self.checkpoint = checkpoint
+        self.steps = steps
+        self.candidates = candidates
+        self.population = population
+        self.generations = generations
+
+        # The same seeds for every candidate
+        self.games = [
+            (opponent.pk, board.pk, derive_seed(seed, f"{opponent.pk}:{board.pk}:{g}"), 1 if g % 2 == 0 else 2)
+            for opponent in self.opponents
+            for board in self.boards
+            for g in range(games)
+        ]
+
+        self.config = {
+            "strategy": strategy,
+            "opponents": {str(bot.pk): bot_params(bot) for bot in self.opponents},
+            "boards": {str(board.pk): [board.width, board.height, board.food_count, board.board_json] for board in self.boards},
+            "games": games,
+            "max_turns": max_turns,
+            "seed": seed,
+            "termination": list(self.termination),
+            "steps": steps,
+            "population": population,
+        }
+        # (candidates and generations aren't in there, a sweep can be resumed with more of either)
+        # candidate key -> {"params", "score", "apples", "games", "wins", "losses", "draws"}
+        self.evaluated = {}
+        # Candidates of each evolve generation, kept so a resumed sweep breeds from the same parents
+        self.generation_lists = []
+
+    def load(self):
+        """Pick up the checkpoint if there is one. Raises ValueError if it's from a different sweep."""
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return False
+        with open(self.checkpoint) as f:
+            data = json.load(f)
+        if data["config"] != json.loads(json.dumps(self.config)):
+            raise ValueError(f"{self.checkpoint} is a checkpoint of a different sweep")
+        self.evaluated = data["evaluated"]
+        self.generation_lists = data["generations"]
+        return True
+
+    def save(self):
+        """Write the checkpoint, to a temporary file first so a crash mid-write can't ruin it"""
+        if not self.checkpoint:
+            return
+        tmp = f"{self.checkpoint}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(
+                {
+                    "updated": datetime.now(timezone.utc).isoformat(),
+                    "config": self.config,
+                    "best": self.best(CHECKPOINT_BEST),
+                    "evaluated": self.evaluated,
+                    "generations": self.generation_lists,
+                },
+                f,
+            )
+        os.replace(tmp, self.checkpoint)
+
+    def best(self, n):
+        """The n best candidates so far, best first"""
+        ranked = sorted(self.evaluated.values(), key=lambda r: (r["score"], r["apples"], candidate_key(r["params"])), reverse=True)
+        return ranked[:n]
+
+    def _evaluate(self, candidates, workers, chunk, progress, start, resumed):
+        """Score every candidate that isn't scored yet, checkpointing after every chunk of them"""
+        todo = []
+        seen = set(self.evaluated)
+        for params in candidates:
+            key = candidate_key(params)
+            if key not in seen:
+                seen.add(key)
+                todo.append(params)
+
+        for i in range(0, len(todo), chunk):
+            batch = todo[i:i + chunk]
+            for params, totals in zip(batch, self._play(batch, workers)):
+                win_rate, apples = score(totals)
+                self.evaluated[candidate_key(params)] = dict(totals, params=params, score=win_rate, apples=apples)
+            self.save()
+            if progress is not None:
+                elapsed = time.perf_counter() - start
+                # Only what this run scored counts towards the rate, not what the checkpoint already had
+                rate = (len(self.evaluated) - resumed) / elapsed if elapsed else 0
+                progress(len(self.evaluated), self.best(1)[0], rate)
+
+    def _play(self, candidates, workers):
+        """Yield the totals of every candidate in order, on a process pool if workers > 1"""
+        ctxs = {board.pk: get_board_context(board) for board in self.boards}
+        if workers > 1:
+            opponents = {bot.pk: bot_params(bot) for bot in self.opponents}
+            yield from evaluate_parallel(opponents, ctxs, self.games, self.max_turns, self.termination, candidates, workers)
+        else:
+            opponents = {bot.pk: bot for bot in self.opponents}
+            for params in candidates:
+                yield play_candidate(params, opponents, ctxs, self.games, self.max_turns, self.termination)
+
+    def run(self, workers=1, chunk=None, progress=None):
+        """
+        Score candidates until the strategy runs out of them, returns every result best first.
+        progress(candidates scored, best so far, candidates/sec) is called after every chunk.
+        """
+        chunk = chunk or max(1, workers * 4)
+        start = time.perf_counter()
+        resumed = len(self.evaluated)
+
+        if self.strategy == "grid":
+            self._evaluate(grid_candidates(self.steps), workers, chunk, progress, start, resumed)
+        elif self.strategy == "random":
+            candidates = [random_candidate(random.Random(derive_seed(self.seed, f"random:{i}"))) for i in range(self.candidates)]
+            self._evaluate(candidates, workers, chunk, progress, start, resumed)
+        else:
+            for g in range(self.generations):
+                if g == len(self.generation_lists):
+                    self.generation_lists.append(self._breed(g))
+                    self.save()
+                self._evaluate(self.generation_lists[g], workers, chunk, progress, start, resumed)
+
+        return self.best(len(self.evaluated))
+
+    def _breed(self, g):
+        """Candidates of generation g: random to start with, then children of the best quarter so far"""
+        rng = random.Random(derive_seed(self.seed, f"generation:{g}"))
+        if g == 0 or not self.evaluated:
+            return [random_candidate(rng) for _ in range(self.population)]
+
+        parents = [r["params"] for r in self.best(max(2, self.population // 4))]
+        children = []
+        for _ in range(self.population):
+            a, b = rng.sample(parents, 2) if len(parents) > 1 else (parents[0], parents[0])
+            children.append(mutate(crossover(a, b, rng), rng))
+        return children
+
+
+def save_top(results, n, prefix="Tuned"):
+    """Save the first n results (best first, from Sweep.run or Sweep.best) as Bots, returns them"""
+    bots = []
+    for i, result in enumerate(results[:n], 1):
+        name = f"{prefix} #{i}"[:30]
+        bots.append(Bot.objects.create(name=name, **result["params"]))
+    return bots
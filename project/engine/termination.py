@@ -0,0 +1,183 @@
+# File: termination.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Termination policies that end a match before max_turns. Without them a match keeps going
+# while a lone survivor loops around the board, or while two careful bots chase each other in circles,
+# all the way to the turn cap. A policy only ends a match when it can give the same winner the match
+# would have ended up with anyway. play_match checks every policy it was given after each turn and the first
+# one to call the match ends it. They're off unless asked for (by name, see TERMINATION_POLICIES) and the
+# names are saved on Match.params, so matches still play out the same when played again from their seed.
+
+import random
+from collections import deque
+
+from .arena import DIRECTION_INDEX, DIRECTIONS
+
+# How many times the same position has to come up for RepetitionDraw to end the match
+REPETITION_LIMIT = 3
+
+# A body cell's link is the direction (index in DIRECTIONS) to the next cell toward the head,
+# STACKED for a cell on top of the next one (only ever in a starting body)
+STACKED = 4
+LINKS = 5
+
+# Zobrist keys are the same for every match on a board of the same size, so build them once per size
+_zobrist = {}
+
+
+class DecidedOutcome:
+    """
+    Stop once one snake is dead and the survivor already has more apples. The dead snake's score can't
+    change anymore and the survivor's can only go up, so the winner can't change either.
+    (With the scores tied the survivor could still eat one more and win, so that keeps going.)
+    """
+
+    name = "decided"
+    # The survivor would have kept going, so its survival time is where the match got cut off
+    plays_out = False
+
+    def __init__(self, ctx, state, bot1, bot2):
+        pass
+
+    def check(self, state, apples_a, apples_b):
+        """Return the winner if the match can stop after this turn, otherwise None"""
+        if state.bot1_alive and not state.bot2_alive and apples_a > apples_b:
+            return 1
+        if state.bot2_alive and not state.bot1_alive and apples_b > apples_a:
+            return 2
+        return None
+
+
+def zobrist_keys(cells):
+    """Random 64 bit keys for a board with cells cells: one per cell for each head and the apples, one per
+    cell and link (see RepetitionLoop) for each body, one per direction for each snake and one for each snake being dead"""
+    keys = _zobrist.get(cells)
+    if keys is None:
+        # Fixed seed so the keys (and which matches end early) never change from run to run
+        rng = random.Random(cells)
+        keys = {
+            "head1": [rng.getrandbits(64) for _ in range(cells)],
+            "head2": [rng.getrandbits(64) for _ in range(cells)],
+            "body1": [rng.getrandbits(64) for _ in range(cells * LINKS)],
+            "body2": [rng.getrandbits(64) for _ in range(cells * LINKS)],
+            "apple": [rng.getrandbits(64) for _ in range(cells)],
+            "dir1": {d: rng.getrandbits(64) for d in DIRECTIONS + ["NONE"]},
+            "dir2": {d: rng.getrandbits(64) for d in DIRECTIONS + ["NONE"]},
+            "dead1": rng.getrandbits(64),
+            "dead2": rng.getrandbits(64),
+        }
+        _zobrist[cells] = keys
+    return keys
+
+
+class RepetitionLoop:
+    """
+    End the match once the exact same position (both bodies, the apples, which way each snake is going,
+    who's alive and the score) has come up REPETITION_LIMIT times without a single bot decision coming
+    down to the rng (chaos or a tie, GameState.random_picks) in between. Nothing was eaten either (same
+    score), so nothing random happened at all and the next turns are a function of the position: the
+    snakes go around the same loop until max_turns. That makes the result exactly what playing it out
+    gives, the winner is whoever has more apples and the survivors last until max_turns (plays_out).
+    Chaotic bots never loop like this since every move of theirs goes through the rng.
+    Positions are Zobrist hashed: every head, body cell, apple and direction has a random 64 bit key and a
+    position's hash is all of them XORed together. A body cell's key also depends on its link, the direction
+    to the next cell toward the head, so two bodies on the same cells in a different order hash differently.
+    The bodies' part is kept up to date each turn by XORing in the new head and the old head's link to it
+    and XORing out the tail it left behind, instead of hashing every body cell again.
+    """
+
+    # Matches stored with the old "repetition" policy (which called every loop a draw) or the "loop" one
+    # (which only hashed which cells the bodies were on, not their order) can't be played again
+    name = "cycle"
+    plays_out = True
+
+    def __init__(self, ctx, state, bot1, bot2):
+        self.width = ctx.width
+        self.keys = zobrist_keys(ctx.width * ctx.height)
+        self.seen = {}
+
+        self.bodies = 0
+        # Head cell, links of the other body cells (head first), last tail and length of each snake,
+        # to tell what changed after a turn
+        self.heads = []
+        self.links = []
+        for n, body in enumerate((state.bot1_body, state.bot2_body)):
+            heads = self.keys["head1" if n == 0 else "head2"]
+            table = self.keys["body1" if n == 0 else "body2"]
+            cells = [y * self.width + x for x, y in body]
+            links = deque()
+            for cell, ahead in zip(cells[1:], cells):
+                nbrs = ctx.neighbors[cell]
+                links.append(nbrs.index(ahead) if ahead in nbrs else STACKED)
+                self.bodies ^= table[cell * LINKS + links[-1]]
+            self.bodies ^= heads[cells[0]]
+            self.heads.append(cells[0])
+            self.links.append(links)
+        self.tails = [state.bot1_body[-1], state.bot2_body[-1]]
+        self.lengths = [len(state.bot1_body), len(state.bot2_body)]
+
+    def _move_body(self, n, heads, table, body, direction):
+        """
+        Swap the head key of body over to its new head and XOR in the old head's link to it,
+        then if it didn't grow XOR out the tail it left behind
+        """
+        x, y = body[0]
+        head = y * self.width + x
+        old = self.heads[n]
+        link = DIRECTION_INDEX[direction]
+        links = self.links[n]
+
+        self.bodies ^= heads[old] ^ heads[head] ^ table[old * LINKS + link]
+        links.appendleft(link)
+        if len(body) == self.lengths[n]:
+            x, y = self.tails[n]
+            self.bodies ^= table[(y * self.width + x) * LINKS + links.pop()]
+        self.heads[n] = head
+        self.tails[n] = body[-1]
+        self.lengths[n] = len(body)
+
+    def check(self, state, apples_a, apples_b):
+        """Return the winner (by apples) once the position after this turn has come up REPETITION_LIMIT times, otherwise None"""
+        keys = self.keys
+        width = self.width
+
+        # A dead snake's body stays where it was
+        if state.bot1_alive:
+            self._move_body(0, keys["head1"], keys["body1"], state.bot1_body, state.bot1_move)
+        if state.bot2_alive:
+            self._move_body(1, keys["head2"], keys["body2"], state.bot2_body, state.bot2_move)
+
+        h = self.bodies ^ keys["dir1"][state.bot1_move] ^ keys["dir2"][state.bot2_move]
+        if not state.bot1_alive:
+            h ^= keys["dead1"]
+        if not state.bot2_alive:
+            h ^= keys["dead2"]
+        apple_keys = keys["apple"]
+        for x, y in state.apple_positions:
+            h ^= apple_keys[y * width + x]
+
+        # A random pick in between makes it a different key, so only a deterministic loop adds up
+        position = (h, apples_a, apples_b, state.random_picks)
+        count = self.seen.get(position, 0) + 1
+        self.seen[position] = count
+        if count < REPETITION_LIMIT:
+            return None
+        if apples_a > apples_b:
+            return 1
+        if apples_b > apples_a:
+            return 2
+        return 0
+
+
+# Every policy by the name used in Match.params, forms and commands
+TERMINATION_POLICIES = {
+    DecidedOutcome.name: DecidedOutcome,
+    RepetitionLoop.name: RepetitionLoop,
+}
+
+# What "stop early" turns on in the simulation form and tournaments
+EARLY_STOP_POLICIES = (DecidedOutcome.name, RepetitionLoop.name)
+
+
+def make_policies(names, ctx, state, bot1, bot2):
+    """The policies called names set up for a match between bot1 and bot2 starting at state, in the order given"""
+    return [TERMINATION_POLICIES[name](ctx, state, bot1, bot2) for name in names]
@@ -0,0 +1,232 @@
+# File: tournament.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Round robin tournaments. Every pair of bots plays Tournament.rounds matches on each of the
+# tournament's boards. The matches are played on a process pool and saved in batches: each batch is one
+# bulk_create of Match summary rows (seed and params only, the replay is played again from the seed when
+# someone watches it) plus one StatsBatch flush, in a single transaction. What's already been saved is
+# never played again, so an interrupted tournament picks up where it stopped and running it after adding
+# a bot only plays that bot's pairings. A match worker running a tournament sends a heartbeat every
+# TOURNAMENT_HEARTBEAT_SECONDS while it plays and only saves a batch while the tournament is still its
+# own, so one that gets taken over after going quiet stops instead of saving the same games twice.
+
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import Bot, Match, Tournament
+from .context import get_board_context
+from .pool import play_games_parallel
+from .run_match import bot_params, match_params, play_match
+from .seeding import derive_seed
+from .state import GameState
+from .stats import StatsBatch
+from .termination import EARLY_STOP_POLICIES
+
+# How many matches are saved per transaction
+TOURNAMENT_BATCH_SIZE = 200
+
+# A running tournament that hasn't reported progress in this long has lost its worker
+TOURNAMENT_STALE_SECONDS = 300
+
+# How often a worker tells everyone it's still playing, well inside TOURNAMENT_STALE_SECONDS
+TOURNAMENT_HEARTBEAT_SECONDS = 30
+
+
+def tournament_bots(tournament):
+    """The bots playing in tournament (every bot if none were picked)"""
+    bots = tournament.bots.order_by("pk")
+    if not bots.exists():
+        bots = Bot.objects.order_by("pk")
+    return list(bots)
+
+
+def schedule(tournament):
+    """
+    The matches tournament still has to play, as (bot1, bot2, board, round) tuples of model instances.
+    Each pair plays round 0 with the lower pk as bot 1, round 1 the other way around and so on.
+    """
+    bots = tournament_bots(tournament)
+    boards = list(tournament.boards.order_by("pk"))
+    played = set(tournament.matches.values_list("bot1", "bot2", "board", "tournament_round"))
+
+    games = []
+    for board in boards:
+        for i, a in enumerate(bots):
+            for b in bots[i + 1:]:
+                for r in range(tournament.rounds):
+                    bot1, bot2 = (a, b) if r % 2 == 0 else (b, a)
+                    if (bot1.pk, bot2.pk, board.pk, r) not in played:
+                        games.append((bot1, bot2, board, r))
+    return games
+
+
+def game_seed(tournament, bot1, bot2, board, r):
+    """Seed of one tournament match, only depends on the tournament's seed and which match it is"""
+    return derive_seed(tournament.seed, f"{bot1.pk}:{bot2.pk}:{board.pk}:{r}")
+
+
+def termination(tournament):
+    """Names of the termination policies tournament's matches are played with"""
+    return EARLY_STOP_POLICIES if tournament.early_stop else ()
+
+
+def _play(games, tournament, workers):
+    """Yield the results of games in order, on a process pool if workers > 1"""
+    seeds = [(bot1.pk, bot2.pk, board.pk, game_seed(tournament, bot1, bot2, board, r)) for bot1, bot2, board, r in games]
+    ctxs = {board.pk: get_board_context(board) for _, _, board, _ in games}
+
+    if workers > 1:
+        bots = {}
+        for bot1, bot2, _, _ in games:
+            bots[bot1.pk] = bot_params(bot1)
+            bots[bot2.pk] = bot_params(bot2)
+        yield from play_games_parallel(bots, ctxs, seeds, tournament.max_turns, workers, termination(tournament))
+    else:
+        for (bot1, bot2, _, _), (_, _, board, seed) in zip(games, seeds):
+            ctx = ctxs[board]
+            yield play_match(GameState.start(ctx, seed), bot1, bot2, ctx, tournament.max_turns, termination=termination(tournament))
+
+
+def _save(tournament, batch, mine=None):
+    """
+    Save a batch of (game, results) as Match rows and add them to the stats, all in one transaction.
+    mine is the tournament's row filtered on it still being ours (see run_tournament_job), nothing is
+    saved if it isn't. Returns True if the batch was saved.
+    """
+    stats = StatsBatch()
+    matches = []
+    for (bot1, bot2, board, r), results in batch:
+        seed = game_seed(tournament, bot1, bot2, board, r)
+        matches.append(Match(
+            bot1=bot1,
+            bot2=bot2,
+            board=board,
+            seed=seed,
+            params=match_params(bot1, bot2, board, tournament.max_turns, termination(tournament)),
+            tournament=tournament,
+            tournament_round=r,
+            winner=results["winner"],
+            total_turns=results["total_turns"],
+            apples_a=results["apples_a"],
+            apples_b=results["apples_b"],
+            a_survival_time=results["a_survival_time"],
+            b_survival_time=results["b_survival_time"],
+            a_cut_off=results["a_cut_off"],
+            b_cut_off=results["b_cut_off"],
+            terminated_by=results["terminated_by"] or "",
+        ))
+        stats.add_results(bot1.pk, bot2.pk, board.pk, results)
+
+    with transaction.atomic():
+        # The UPDATE holds the row until we commit, so nobody can take the tournament over halfway through
+        if mine is not None and not mine.update(updated_at=timezone.now()):
+            return False
+        Match.objects.bulk_create(matches)
+        stats.flush()
+    return True
+
+
+def run_tournament(tournament, workers=None, batch_size=TOURNAMENT_BATCH_SIZE, progress=None, mine=None):
+    """
+    Play every match tournament doesn't have yet. progress(played, scheduled, matches_per_sec) is called
+    after every saved batch. Returns (matches played, matches/sec).
+    mine is the tournament's row filtered on it still being ours, for a match worker: it gets a heartbeat
+    every TOURNAMENT_HEARTBEAT_SECONDS and the tournament stops as soon as it's somebody else's.
+    """
+    if workers is None:
+        workers = getattr(settings, "SNAKE_SIMULATION_WORKERS", 1)
+
+    games = schedule(tournament)
+    workers = max(1, min(workers, len(games)))
+
+    start = time.perf_counter()
+    beat = time.monotonic()
+    played = 0
+    rate = 0.0
+    batch = []
+
+    def save():
+        nonlocal played, rate
+        if not _save(tournament, batch, mine):
+            return False
+        played += len(batch)
+        batch.clear()
+        elapsed = time.perf_counter() - start
+        rate = played / elapsed if elapsed else 0.0
+        if progress is not None:
+            progress(played, len(games), rate)
+        return True
+
+    def heartbeat():
+        nonlocal beat
+        if mine is None or time.monotonic() - beat < TOURNAMENT_HEARTBEAT_SECONDS:
+            return True
+        beat = time.monotonic()
+        return bool(mine.update(updated_at=timezone.now()))
+
+    results = _play(games, tournament, workers)
+    try:
+        for game, match in zip(games, results):
+            batch.append((game, match))
+            if len(batch) >= batch_size:
+                if not save():
+                    break
+            elif not heartbeat():
+                break
+        else:
+            if batch:
+                save()
+    finally:
+        # Shuts the process pool down (cancelling what it hasn't started) if we stopped early
+        results.close()
+
+    return played, rate
+
+
+def queue_tournament(tournament):
+    """Hand tournament to the match workers"""
+    Tournament.objects.filter(pk=tournament.pk).update(status=Tournament.QUEUED, error="", updated_at=timezone.now())
+
+
+def claim_tournament(worker):
+    """Claim the oldest queued tournament (or a running one whose worker went quiet) for worker, like claim_job"""
+    now = timezone.now()
+    stale = now - timedelta(seconds=TOURNAMENT_STALE_SECONDS)
+    candidates = (
+        Tournament.objects
+        .filter(Q(status=Tournament.QUEUED) | Q(status=Tournament.RUNNING, updated_at__lt=stale))
+        .order_by("updated_at")
+        .values_list("pk", "status", "updated_at")[:10]
+    )
+    for pk, status, updated_at in candidates:
+        claimed = Tournament.objects.filter(pk=pk, status=status, updated_at=updated_at).update(
+            status=Tournament.RUNNING,
+            worker=worker,
+            played=0,
+            scheduled=0,
+            updated_at=now,
+        )
+        if claimed:
+            return Tournament.objects.get(pk=pk)
+    return None
+
+
+def run_tournament_job(tournament):
+    """Run a claimed tournament for a match worker, keeping its progress up to date. If it goes quiet for
+    too long and another worker takes it over, this one stops and leaves the rest to them."""
+    mine = Tournament.objects.filter(pk=tournament.pk, worker=tournament.worker, status=Tournament.RUNNING)
+
+    def progress(played, scheduled, rate):
+        mine.update(played=played, scheduled=scheduled, matches_per_sec=rate, updated_at=timezone.now())
+
+    try:
+        run_tournament(tournament, progress=progress, mine=mine)
+    except Exception:
+        mine.update(status=Tournament.FAILED, error=traceback.format_exc(), updated_at=timezone.now())
+        return
+    mine.update(status=Tournament.DONE, updated_at=timezone.now())
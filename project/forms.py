@@ -4,6 +4,8 @@
 
 from django import forms
 from .models import *
+from .engine.seeding import SEED_BITS
+from .engine.confidence import ADAPTIVE_MAX_RUNS
  
 
 # Define constants for board generation
@@ -36,6 +38,16 @@ APPLE_OPTIONS = [
     (10, "10 Apples"),
 ]
 
+def seed_field():
+    """Optional seed field, left blank a random seed is picked"""
+    return forms.IntegerField(
+        label="Seed (optional)",
+        required=False,
+        min_value=0,
+        max_value=2 ** SEED_BITS - 1,
+        help_text="Same seed, same result. Leave blank for a random one."
+    )
+
 class CreateBotForm(forms.ModelForm):
     """Define a form to create a new Bot"""
 
@@ -150,9 +162,11 @@ class BoardGeneratorForm(forms.ModelForm):
         label="Enable Wraparound Edges",
         required=False)
 
+    seed = seed_field()
+
     class Meta:
         model = Board
-        fields = ['name', 'board_type', 'grid_width', 'num_apples', 'wraparound']
+        fields = ['name', 'board_type', 'grid_width', 'num_apples', 'wraparound', 'seed']
 
 class BoardUpdateForm(forms.ModelForm):
     """Define a form to update an existing Board"""
@@ -186,6 +200,8 @@ class StartMatchForm(forms.Form):
         label="Board"
     )
 
+    seed = seed_field()
+
 class SimulationForm(forms.Form):
     """Define a form to simulate runs number of matches"""
     bot1 = forms.ModelChoiceField(queryset=Bot.objects.all(), label = "Bot 1")
@@ -194,4 +210,83 @@ class SimulationForm(forms.Form):
 
     board = forms.ModelChoiceField(queryset=Board.objects.all(), label = "Board")
 
-    runs = forms.IntegerField(min_value=5, max_value=50, initial=20, label = "Number of Simulations")
\ No newline at end of file
+    runs = forms.IntegerField(min_value=5, max_value=5000, initial=20, label = "Number of Simulations",
+                              help_text="With a margin of error below this is the most it will run")
+
+    # Adaptive mode: keep going until the win rates (and/or average apples) are known this well
+    margin = forms.FloatField(
+        min_value=0.005, max_value=0.5, required=False,
+        label="Win rate margin of error",
+        help_text="e.g. 0.05 stops once both win rates are known to within +/- 5%"
+    )
+
+    apples_margin = forms.FloatField(
+        min_value=0.01, required=False,
+        label="Average apples margin of error",
+    )
+
+    confidence = forms.TypedChoiceField(
+        choices=[(0.9, "90%"), (0.95, "95%"), (0.99, "99%")],
+        coerce=float, initial=0.95,
+        label="Confidence"
+    )
+
+    # The batch engine plays all the runs at once with numpy, so thousands of runs are fine
+    batch = forms.BooleanField(
+        label="Use the batch engine (needed for more than 50 simulations)",
+        required=False
+    )
+
+    # Ends runs once the winner can't change or the snakes are going in circles (see engine/termination.py)
+    early_stop = forms.BooleanField(
+        label="Stop matches early once they're decided or looping (regular engine only)",
+        required=False
+    )
+
+    # Times every phase of every turn, only the regular engine has the hooks for it
+    profile = forms.BooleanField(
+        label="Show where the engine spends its time (regular engine only)",
+        required=False
+    )
+
+    seed = seed_field()
+
+    def clean(self):
+        """The regular engine plays its runs one by one, so cap it at 50 (or ADAPTIVE_MAX_RUNS when it can
+        stop early). Profiled runs are played during the request, so they're always capped at 50.
+        The batch engine can't stop matches early."""
+        cleaned_data = super().clean()
+        runs = cleaned_data.get("runs")
+        adaptive = cleaned_data.get("margin") is not None or cleaned_data.get("apples_margin") is not None
+        if cleaned_data.get("batch") and cleaned_data.get("early_stop"):
+            raise forms.ValidationError("Stopping matches early only works with the regular engine.")
+        if runs is not None and not cleaned_data.get("batch"):
+            if cleaned_data.get("profile") and runs > 50:
+                raise forms.ValidationError("Profiling is limited to 50 simulations.")
+            if adaptive and runs > ADAPTIVE_MAX_RUNS:
+                raise forms.ValidationError(f"More than {ADAPTIVE_MAX_RUNS} simulations needs the batch engine.")
+            if not adaptive and runs > 50:
+                raise forms.ValidationError("More than 50 simulations needs the batch engine (or a margin of error).")
+        return cleaned_data
+
+
+class TournamentForm(forms.ModelForm):
+    """Define a form to set up a round robin tournament"""
+
+    boards = forms.ModelMultipleChoiceField(queryset=Board.objects.all(), widget=forms.CheckboxSelectMultiple)
+
+    bots = forms.ModelMultipleChoiceField(
+        queryset=Bot.objects.all(),
+        widget=forms.CheckboxSelectMultiple,
+        required=False,
+        help_text="Leave empty to include every bot (bots added later join the next run)",
+    )
+
+    rounds = forms.IntegerField(min_value=1, max_value=20, initial=2, label="Matches per pair per board")
+
+    seed = seed_field()
+
+    class Meta:
+        model = Tournament
+        fields = ['name', 'boards', 'bots', 'rounds', 'early_stop', 'seed']
+        labels = {'early_stop': "Stop matches early once they're decided or looping"}
@@ -0,0 +1,75 @@
+# File: backfill_replays.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Management command that builds the compact Match.replay for older matches
+# that only have MoveEvent rows. Every replay is decoded again and checked against the
+# MoveEvents before it's saved, and with --delete-moves the MoveEvents are removed afterwards
+# to get the space back.
+# Usage: python manage.py backfill_replays [--delete-moves] [--match 12 --match 15]
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from project.models import Match
+from project.serializers import MoveEventSerializer
+from project.engine.replay import KEYFRAME_INTERVAL, Replay, ReplayEncoder
+
+
+def encode_moves(match, keyframe_interval):
+    """Encode the MoveEvents of match as a replay blob"""
+    board = match.board
+    encoder = ReplayEncoder(board.width, board.height, bool(board.board_json.get("wrap", False)), keyframe_interval)
+    for event in match.get_moves().iterator():
+        encoder.add(event)
+    return encoder.finish()
+
+
+def replay_matches_moves(match, blob):
+    """Return True if decoding blob gives back exactly what the API serves from the MoveEvents"""
+    frames = Replay(blob).frames()
+    for event in match.get_moves().iterator():
+        expected = dict(MoveEventSerializer(event).data)
+        if next(frames, None) != expected:
+            return False
+    return next(frames, None) is None
+
+
+class Command(BaseCommand):
+    help = "Build compact replays for matches that only have MoveEvents"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--match", type=int, action="append", help="Only backfill this match id (can be repeated)")
+        parser.add_argument("--keyframe-interval", type=int, default=KEYFRAME_INTERVAL)
+        parser.add_argument("--delete-moves", action="store_true", help="Delete the MoveEvents once the replay is saved and checked")
+
+    def handle(self, *args, **options):
+        matches = Match.objects.filter(replay__isnull=True, move_events__isnull=False).distinct().select_related("board")
+        if options["match"]:
+            matches = matches.filter(pk__in=options["match"])
+
+        done = 0
+        failed = 0
+        saved_rows = 0
+
+        for match in matches.iterator():
+            blob = encode_moves(match, options["keyframe_interval"])
+
+            # Anything the engine logic can't reproduce gets a keyframe on every turn instead,
+            # which is just a (still smaller) copy of the MoveEvents
+            if not replay_matches_moves(match, blob):
+                blob = encode_moves(match, 1)
+                if not replay_matches_moves(match, blob):
+                    self.stderr.write(f"Match {match.pk}: replay doesn't match its MoveEvents, skipped")
+                    failed += 1
+                    continue
+
+            with transaction.atomic():
+                match.replay = blob
+                match.save(update_fields=["replay"])
+                if options["delete_moves"]:
+                    deleted, _ = match.move_events.all().delete()
+                    saved_rows += deleted
+
+            done += 1
+            self.stdout.write(f"Match {match.pk}: {match.total_turns + 1} turns -> {len(blob)} bytes")
+
+        self.stdout.write(f"Backfilled {done} matches, {failed} skipped, {saved_rows} MoveEvents deleted")
@@ -0,0 +1,75 @@
+# File: bench_batch.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Management command to benchmark the numpy batch engine against the scalar engine.
+# Plays the same number of simulated matches with run_match(simulate=True) one after another and with
+# simulate_batch, then reports matches/sec for both and the aggregate stats side by side (they use
+# different random numbers so they won't be identical, but they should be close).
+# Usage: python manage.py bench_batch --width 100 --runs 200
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from project.forms import BOARD_TYPES
+from project.models import Bot, Board
+from project.engine.batch import BATCH_SIZE, simulate_batch
+from project.engine.board_generator import generate_board
+from project.engine.run_match import simulate_matches
+
+
+class Command(BaseCommand):
+    help = "Benchmark matches/sec of the numpy batch engine against run_match(simulate=True)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--board-type", default="open", choices=[t for t, _ in BOARD_TYPES])
+        parser.add_argument("--width", type=int, default=40)
+        parser.add_argument("--apples", type=int, default=5)
+        parser.add_argument("--wrap", action="store_true")
+        parser.add_argument("--runs", type=int, default=200)
+        parser.add_argument("--scalar-runs", type=int, help="Runs for the scalar engine (defaults to --runs)")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--max-turns", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=412)
+
+    def handle(self, *args, **options):
+        width = options["width"]
+        height = int(width * 0.6)  # 5:3 aspect ratio, same as CreateBoardView
+
+        # Nothing gets saved, so unsaved models are fine
+        board = Board(
+            name="bench",
+            width=width,
+            height=height,
+            food_count=options["apples"],
+            board_json=generate_board(options["board_type"], width, height, options["wrap"], options["seed"]),
+        )
+        bot1 = Bot(name="Greedy", greediness=2.0, caution=1.0, direction_bias=0.0, circliness=0.5, introversion=0.5, chaos=0.05)
+        bot2 = Bot(name="Hungry", greediness=1.8, caution=1.2, direction_bias=0.2, circliness=0.3, introversion=0.8, chaos=0.05)
+
+        self.stdout.write(f"{options['board_type']} {width}x{height}, {options['apples']} apples")
+
+        scalar_runs = options["scalar_runs"] or options["runs"]
+        start = time.perf_counter()
+        scalar = simulate_matches(bot1, bot2, board, scalar_runs, seed=options["seed"], workers=1, max_turns=options["max_turns"])
+        scalar_rate = scalar_runs / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        batch = simulate_batch(
+            bot1, bot2, board, options["runs"],
+            seed=options["seed"],
+            max_turns=options["max_turns"],
+            batch_size=options["batch_size"],
+        )
+        batch_rate = options["runs"] / (time.perf_counter() - start)
+
+        for label, runs, rate, results in (("scalar", scalar_runs, scalar_rate, scalar), ("batch", options["runs"], batch_rate, batch)):
+            b1 = results["bot1"]
+            b2 = results["bot2"]
+            self.stdout.write(
+                f"  {label:<7} {runs:>6} runs  {rate:9.2f} matches/sec  "
+                f"bot 1 win rate {b1['wins'] / runs:6.1%}  draws {b1['draws'] / runs:6.1%}  "
+                f"avg turns {b1['avg_turns']:7.1f} / {b2['avg_turns']:7.1f}  "
+                f"avg apples {b1['avg_apples']:6.2f} / {b2['avg_apples']:6.2f}"
+            )
+
+        self.stdout.write(f"  speedup: {batch_rate / scalar_rate:.2f}x")
@@ -0,0 +1,136 @@
+# File: bench_engine.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Management command to benchmark the arena engine.
+# Runs the same seeded matches with the bytearray OccupancyGrid and with the old
+# list scan approach and reports turns/sec for both.
+# Usage: python manage.py bench_engine --width 100 --apples 10 --matches 3
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from project.forms import BOARD_TYPES
+from project.models import Bot, Board
+from project.engine.arena import step_game
+from project.engine.board_generator import generate_board
+from project.engine.context import get_board_context
+from project.engine.occupancy import EMPTY, OBSTACLE, SNAKE1, SNAKE2, NEIGHBOR_DELTAS, OccupancyGrid
+from project.engine.state import GameState
+
+
+class ListOccupancy:
+    """Same interface as OccupancyGrid but every check scans the body lists,
+    which is how the engine used to do it (new_head in my_body / in other_body)"""
+
+    def __init__(self, ctx):
+        self.width = ctx.width
+        self.height = ctx.height
+        self.obstacles = set(ctx.obstacles)
+        self.bodies = {SNAKE1: [], SNAKE2: []}
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def owner(self, x, y):
+        pos = (x, y)
+        for owner, body in self.bodies.items():
+            if pos in body:
+                return owner
+        if pos in self.obstacles:
+            return OBSTACLE
+        return EMPTY
+
+    def is_free(self, x, y):
+        return self.in_bounds(x, y) and self.owner(x, y) == EMPTY
+
+    def is_obstacle(self, x, y):
+        return (x, y) in self.obstacles
+
+    def occupy(self, x, y, owner):
+        self.bodies[owner].insert(0, (x, y))
+
+    def vacate(self, x, y):
+        for body in self.bodies.values():
+            if (x, y) in body:
+                body.remove((x, y))
+                return
+
+    def place(self, body, owner):
+        self.bodies[owner].extend(body)
+
+    def owned_neighbors(self, x, y, owner):
+        count = 0
+        for dx, dy in NEIGHBOR_DELTAS:
+            if self.in_bounds(x + dx, y + dy) and (x + dx, y + dy) in self.bodies[owner]:
+                count += 1
+        return count
+
+    @property
+    def cells(self):
+        """The BFS reads the raw cells, so rebuild them from the lists like the old blocked set"""
+        cells = bytearray(self.width * self.height)
+        for x, y in self.obstacles:
+            cells[y * self.width + x] = OBSTACLE
+        for owner, body in self.bodies.items():
+            for x, y in body:
+                cells[y * self.width + x] = owner
+        return cells
+
+
+def play(bot1, bot2, ctx, grid_class, seed, max_turns):
+    """Play one simulated match with grid_class and return how many turns it lasted"""
+    state = GameState.start(ctx, seed, grid_class=grid_class)
+
+    for _ in range(max_turns):
+        if not (state.bot1_alive or state.bot2_alive):
+            break
+        step_game(state, bot1, bot2, ctx)
+
+    return state.move_number
+
+
+class Command(BaseCommand):
+    help = "Benchmark arena engine turns/sec for the occupancy grid against the old list scans"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--board-type", default="open", choices=[t for t, _ in BOARD_TYPES])
+        parser.add_argument("--width", type=int, default=100)
+        parser.add_argument("--apples", type=int, default=10)
+        parser.add_argument("--wrap", action="store_true")
+        parser.add_argument("--matches", type=int, default=3)
+        parser.add_argument("--max-turns", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=412)
+
+    def handle(self, *args, **options):
+        width = options["width"]
+        height = int(width * 0.6)  # 5:3 aspect ratio, same as CreateBoardView
+
+        board = Board(
+            name="bench",
+            width=width,
+            height=height,
+            food_count=options["apples"],
+            board_json=generate_board(options["board_type"], width, height, options["wrap"], options["seed"]),
+        )
+
+        ctx = get_board_context(board)
+
+        # Greedy, careful bots so the snakes actually get long
+        bot1 = Bot(name="Greedy", greediness=2.0, caution=1.0, direction_bias=0.0, circliness=0.5, introversion=0.5, chaos=0.05)
+        bot2 = Bot(name="Hungry", greediness=1.8, caution=1.2, direction_bias=0.2, circliness=0.3, introversion=0.8, chaos=0.05)
+
+        self.stdout.write(f"{options['board_type']} {width}x{height}, {options['apples']} apples, {options['matches']} matches")
+
+        results = {}
+        for label, grid_class in (("list scans", ListOccupancy), ("occupancy grid", OccupancyGrid)):
+            turns = 0
+            start = time.perf_counter()
+            for i in range(options["matches"]):
+                turns += play(bot1, bot2, ctx, grid_class, options["seed"] + i, options["max_turns"])
+            elapsed = time.perf_counter() - start
+
+            results[label] = turns / elapsed if elapsed else 0
+            self.stdout.write(f"  {label:<15} {turns:>7} turns in {elapsed:7.2f}s  {results[label]:>9.1f} turns/sec")
+
+        if results["list scans"]:
+            self.stdout.write(f"  speedup: {results['occupancy grid'] / results['list scans']:.2f}x")
@@ -0,0 +1,102 @@
+# File: bench_leaderboard.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Management command to benchmark the global leaderboard with lots of bots.
+# Fills the database with fake bots and BotBoardStats (all rolled back at the end), then times getting
+# one page of the leaderboard three ways: adding everything up in Python (how the page used to do it),
+# the single GROUP BY query (aggregate_global_stats) and the materialized BotGlobalStats table.
+# Usage: python manage.py bench_leaderboard --bots 10000 --boards 5
+
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from project.models import Bot, Board, BotBoardStats, BotGlobalStats
+from project.engine.leaderboard import aggregate_global_stats, rebuild_global_stats
+
+# Same page size as GlobalLeaderboardView
+PAGE_SIZE = 25
+
+
+def python_page(offset):
+    """The old GlobalLeaderboardView: every BotBoardStats row into Python, summed in dicts and sorted"""
+    totals = {}
+    for s in BotBoardStats.objects.select_related("bot"):
+        t = totals.setdefault(s.bot.pk, {"bot": s.bot, "games": 0, "wins": 0, "turns_sum": 0})
+        t["games"] += s.games
+        t["wins"] += s.wins
+        t["turns_sum"] += s.turns_sum
+
+    rows = [(t["wins"] / t["games"] if t["games"] else 0, pk) for pk, t in totals.items()]
+    rows.sort(key=lambda row: (-row[0], row[1]))
+    return len(rows), [pk for _, pk in rows[offset:offset + PAGE_SIZE]]
+
+
+def aggregate_page(offset):
+    rows = aggregate_global_stats()
+    return rows.count(), [row["bot"] for row in rows[offset:offset + PAGE_SIZE]]
+
+
+def materialized_page(offset):
+    rows = BotGlobalStats.objects.select_related("bot").order_by("-win_rate", "bot")
+    return rows.count(), [row.bot.pk for row in rows[offset:offset + PAGE_SIZE]]
+
+
+class Command(BaseCommand):
+    help = "Benchmark the global leaderboard: Python totals vs GROUP BY vs the materialized BotGlobalStats"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bots", type=int, default=10000)
+        parser.add_argument("--boards", type=int, default=5)
+        parser.add_argument("--repeat", type=int, default=5, help="Times to fetch each page")
+        parser.add_argument("--seed", type=int, default=412)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+
+        with transaction.atomic():
+            boards = Board.objects.bulk_create([
+                Board(name=f"bench {i}", width=40, height=24, food_count=5, board_json={"obstacles": [], "wrap": False})
+                for i in range(options["boards"])
+            ])
+            bots = Bot.objects.bulk_create([Bot(name=f"bench {i}") for i in range(options["bots"])])
+
+            stats = []
+            for bot in bots:
+                for board in rng.sample(boards, rng.randint(1, len(boards))):
+                    games = rng.randint(1, 200)
+                    wins = rng.randint(0, games)
+                    losses = rng.randint(0, games - wins)
+                    stats.append(BotBoardStats(
+                        bot=bot, board=board, games=games, wins=wins, losses=losses, draws=games - wins - losses,
+                        turns_sum=games * rng.randint(10, 2000), apples_sum=games * rng.randint(0, 30), turns_games=games,
+                    ))
+            BotBoardStats.objects.bulk_create(stats, batch_size=1000)
+
+            start = time.perf_counter()
+            rebuild_global_stats([bot.pk for bot in bots])
+            self.stdout.write(f"{len(bots)} bots, {len(stats)} BotBoardStats rows, materialized in {time.perf_counter() - start:.2f}s")
+
+            # only the fake bots count, any real ones would just shift the pages around
+            real = set(Bot.objects.exclude(pk__in=[bot.pk for bot in bots]).values_list("pk", flat=True))
+            if real:
+                self.stdout.write(f"  (there are also {len(real)} real bots in the database)")
+
+            last = (len(bots) + len(real) - 1) // PAGE_SIZE * PAGE_SIZE
+            pages = {}
+            for label, page in (("python", python_page), ("aggregate", aggregate_page), ("materialized", materialized_page)):
+                for offset in (0, last):
+                    start = time.perf_counter()
+                    for _ in range(options["repeat"]):
+                        result = page(offset)
+                    ms = (time.perf_counter() - start) / options["repeat"] * 1000
+                    pages[label, offset] = result
+                    self.stdout.write(f"  {label:<13} page at offset {offset:>6}  {ms:9.2f} ms")
+
+            for offset in (0, last):
+                if not pages["python", offset] == pages["aggregate", offset] == pages["materialized", offset]:
+                    raise CommandError(f"The three leaderboards don't agree at offset {offset}")
+
+            # Leave the database the way it was
+            transaction.set_rollback(True)
@@ -0,0 +1,86 @@
+# File: bench_pathfinding.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Management command to benchmark apple pathfinding in the engine.
+# Plays the same seeded matches with a BFS from each head every turn and with the shared
+# AppleDistanceField, checks both play out exactly the same, and reports turns/sec for each.
+# Defaults to the two biggest BOARD_SIZES (100x60 and 80x48).
+# Usage: python manage.py bench_pathfinding --board-type open --widths 100 80 --matches 3
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from project.forms import BOARD_TYPES
+from project.models import Bot, Board
+from project.engine.arena import step_game
+from project.engine.board_generator import generate_board
+from project.engine.context import get_board_context
+from project.engine.state import GameState
+
+
+def play(bot1, bot2, ctx, seed, max_turns, distance_field):
+    """Play one simulated match, returns (turns, seconds, final snapshot)"""
+    state = GameState.start(ctx, seed, distance_field=distance_field)
+
+    start = time.perf_counter()
+    for _ in range(max_turns):
+        if not (state.bot1_alive or state.bot2_alive):
+            break
+        step_game(state, bot1, bot2, ctx)
+
+    return state.move_number, time.perf_counter() - start, state.snapshot()
+
+
+class Command(BaseCommand):
+    help = "Benchmark per-head BFS against the shared apple distance field"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--board-type", action="append", choices=[t for t, _ in BOARD_TYPES],
+                            help="Board type to run (can be repeated, defaults to open and inner_maze)")
+        parser.add_argument("--widths", type=int, nargs="+", default=[100, 80])
+        parser.add_argument("--apples", type=int, default=5)
+        parser.add_argument("--wrap", action="store_true")
+        parser.add_argument("--matches", type=int, default=3)
+        parser.add_argument("--max-turns", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=412)
+
+    def handle(self, *args, **options):
+        board_types = options["board_type"] or ["open", "inner_maze"]
+
+        bot1 = Bot(name="Greedy", greediness=2.0, caution=1.0, direction_bias=0.0, circliness=0.5, introversion=0.5, chaos=0.05)
+        bot2 = Bot(name="Hungry", greediness=1.8, caution=1.2, direction_bias=0.2, circliness=0.3, introversion=0.8, chaos=0.05)
+
+        for board_type in board_types:
+            for width in options["widths"]:
+                height = int(width * 0.6)  # 5:3 aspect ratio, same as CreateBoardView
+                board = Board(
+                    name="bench",
+                    width=width,
+                    height=height,
+                    food_count=options["apples"],
+                    board_json=generate_board(board_type, width, height, options["wrap"], options["seed"]),
+                )
+                ctx = get_board_context(board)
+
+                self.stdout.write(f"{board_type} {width}x{height}, {options['apples']} apples, {options['matches']} matches")
+
+                rates = {}
+                finals = {}
+                for label, distance_field in (("BFS per head", False), ("distance field", True)):
+                    turns = 0
+                    elapsed = 0.0
+                    finals[label] = []
+                    for i in range(options["matches"]):
+                        t, seconds, final = play(bot1, bot2, ctx, options["seed"] + i, options["max_turns"], distance_field)
+                        turns += t
+                        elapsed += seconds
+                        finals[label].append(final)
+
+                    rates[label] = turns / elapsed if elapsed else 0
+                    self.stdout.write(f"  {label:<15} {turns:>7} turns in {elapsed:7.2f}s  {rates[label]:>9.1f} turns/sec")
+
+                if finals["BFS per head"] != finals["distance field"]:
+                    raise CommandError("The distance field played different matches than the per-head BFS")
+
+                if rates["BFS per head"]:
+                    self.stdout.write(f"  speedup: {rates['distance field'] / rates['BFS per head']:.2f}x")
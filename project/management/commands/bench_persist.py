@@ -0,0 +1,77 @@
+# File: bench_persist.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Management command to benchmark how fast run_match saves its MoveEvents.
+# Plays the same seeded match with one INSERT per turn (batch size 1), with bulk_create after the
+# engine is done, with the background writer thread, and with only the compact replay,
+# then reports rows/sec, timings and replay size.
+# Usage: python manage.py bench_persist --width 40 --max-turns 5000
+# Everything it creates is deleted again at the end.
+
+from django.core.management.base import BaseCommand
+
+from project.forms import BOARD_TYPES
+from project.models import Bot, Board
+from project.engine.board_generator import generate_board
+from project.engine.persist import MOVE_EVENT_BATCH_SIZE
+from project.engine.run_match import run_match
+
+
+class Command(BaseCommand):
+    help = "Benchmark MoveEvent persistence in run_match (per-turn INSERTs vs bulk vs writer thread)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--board-type", default="open", choices=[t for t, _ in BOARD_TYPES])
+        parser.add_argument("--width", type=int, default=40)
+        parser.add_argument("--apples", type=int, default=5)
+        parser.add_argument("--max-turns", type=int, default=5000)
+        parser.add_argument("--batch-size", type=int, default=MOVE_EVENT_BATCH_SIZE)
+        parser.add_argument("--seed", type=int, default=412)
+
+    def handle(self, *args, **options):
+        width = options["width"]
+        height = int(width * 0.6)  # 5:3 aspect ratio, same as CreateBoardView
+        seed = options["seed"]
+
+        board = Board.objects.create(
+            name="bench persist",
+            width=width,
+            height=height,
+            food_count=options["apples"],
+            board_json=generate_board(options["board_type"], width, height, False, seed),
+            seed=seed,
+        )
+        # Cautious bots so the match runs long
+        bot1 = Bot.objects.create(name="bench 1", greediness=1.0, caution=2.0, circliness=1.0, chaos=0.05)
+        bot2 = Bot.objects.create(name="bench 2", greediness=1.0, caution=2.0, circliness=1.0, chaos=0.05)
+
+        # (label, save MoveEvents, batch size, writer thread)
+        runs = [
+            ("one INSERT per turn", True, 1, False),
+            ("bulk after engine", True, options["batch_size"], False),
+            ("writer thread", True, options["batch_size"], True),
+            ("replay only", False, options["batch_size"], False),
+        ]
+
+        try:
+            for label, save_move_events, batch_size, background_writer in runs:
+                # same seed every time so each mode saves the exact same match
+                match = run_match(
+                    bot1, bot2, board,
+                    max_turns=options["max_turns"],
+                    save_move_events=save_move_events,
+                    batch_size=batch_size,
+                    background_writer=background_writer,
+                    seed=seed,
+                )
+                stats = match.persist_stats
+
+                self.stdout.write(
+                    f"{label:<20} batch {batch_size:>5}  {stats['rows']:>6} rows  "
+                    f"write {stats['write_seconds']:6.2f}s  total {stats['total_seconds']:6.2f}s  "
+                    f"{stats['rows_per_sec']:>10.1f} rows/sec  replay {stats['replay_bytes']} bytes"
+                )
+        finally:
+            # Cascades to the matches, MoveEvents and BotBoardStats
+            bot1.delete()
+            bot2.delete()
+            board.delete()
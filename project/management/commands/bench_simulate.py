@@ -0,0 +1,70 @@
+# File: bench_simulate.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Management command to benchmark how simulate_matches scales with the number of worker processes.
+# Runs the same seeded simulation with 1, 2, ... N workers, reports runs/sec and speedup over one worker
+# and checks every worker count gives exactly the same results.
+# Usage: python manage.py bench_simulate --runs 50 --max-workers 8
+
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from project.forms import BOARD_TYPES
+from project.models import Bot, Board
+from project.engine.board_generator import generate_board
+from project.engine.run_match import simulate_matches
+
+
+class Command(BaseCommand):
+    help = "Benchmark simulate_matches with 1..N worker processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--board-type", default="open", choices=[t for t, _ in BOARD_TYPES])
+        parser.add_argument("--width", type=int, default=40)
+        parser.add_argument("--apples", type=int, default=5)
+        parser.add_argument("--runs", type=int, default=50)
+        parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--max-turns", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=412)
+
+    def handle(self, *args, **options):
+        width = options["width"]
+        height = int(width * 0.6)  # 5:3 aspect ratio, same as CreateBoardView
+
+        # Nothing gets saved, so unsaved models are fine
+        board = Board(
+            name="bench",
+            width=width,
+            height=height,
+            food_count=options["apples"],
+            board_json=generate_board(options["board_type"], width, height, False, options["seed"]),
+        )
+        bot1 = Bot(name="Greedy", greediness=2.0, caution=1.0, direction_bias=0.0, circliness=0.5, introversion=0.5, chaos=0.05)
+        bot2 = Bot(name="Hungry", greediness=1.8, caution=1.2, direction_bias=0.2, circliness=0.3, introversion=0.8, chaos=0.05)
+
+        self.stdout.write(f"{options['board_type']} {width}x{height}, {options['apples']} apples, {options['runs']} runs")
+
+        baseline = None
+        serial_rate = None
+        for workers in range(1, options["max_workers"] + 1):
+            start = time.perf_counter()
+            results = simulate_matches(
+                bot1, bot2, board, options["runs"],
+                seed=options["seed"],
+                workers=workers,
+                max_turns=options["max_turns"],
+            )
+            elapsed = time.perf_counter() - start
+            rate = options["runs"] / elapsed if elapsed else 0
+
+            if baseline is None:
+                baseline = results
+                serial_rate = rate
+            elif results != baseline:
+                raise CommandError(f"{workers} workers gave different results than 1 worker")
+
+            self.stdout.write(
+                f"  {workers:>3} workers  {elapsed:7.2f}s  {rate:8.2f} runs/sec  "
+                f"speedup {rate / serial_rate if serial_rate else 0:5.2f}x"
+            )
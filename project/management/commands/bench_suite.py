@@ -0,0 +1,64 @@
+# File: bench_suite.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Management command that runs the engine benchmark suite (engine/benchmarks.py),
+# writes the results as JSON and compares them against a saved baseline. Fails (non-zero exit)
+# if any case got more than --tolerance slower than the baseline.
+# Usage: python manage.py bench_suite --save-baseline bench_baseline.json
+#        python manage.py bench_suite --baseline bench_baseline.json --output bench_results.json --tolerance 0.1
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from project.engine.benchmarks import DEFAULT_TOLERANCE, run_suite, compare, save_results, load_results
+
+
+class Command(BaseCommand):
+    help = "Benchmark the engine and compare against a baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", help="Write the results to this JSON file")
+        parser.add_argument("--baseline", help="Compare against the results in this JSON file")
+        parser.add_argument("--save-baseline", help="Write the results to this JSON file as the new baseline")
+        parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                            help="How much slower than the baseline a case can get, 0.1 is 10%%")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs of each case, the best one is kept")
+        parser.add_argument("--only", help="Only run cases with this in their name")
+        parser.add_argument("--quick", action="store_true", help="Only the smallest cases (names match the full suite)")
+
+    def handle(self, *args, **options):
+        # Load it first so a bad path fails before spending minutes benchmarking
+        baseline = None
+        if options["baseline"]:
+            if not os.path.exists(options["baseline"]):
+                raise CommandError(f"No baseline at {options['baseline']}, make one with --save-baseline")
+            baseline = load_results(options["baseline"])
+
+        def progress(name, result):
+            self.stdout.write(f"  {name:<60} {result['value']:>12.1f} {result['unit']}")
+
+        results = run_suite(quick=options["quick"], repeat=options["repeat"], only=options["only"], progress=progress)
+
+        if options["output"]:
+            save_results(options["output"], results)
+            self.stdout.write(f"Results written to {options['output']}")
+        if options["save_baseline"]:
+            save_results(options["save_baseline"], results)
+            self.stdout.write(f"Baseline written to {options['save_baseline']}")
+
+        if baseline is None:
+            return
+
+        regressions, rows = compare(results, baseline, options["tolerance"])
+
+        self.stdout.write(f"\nAgainst {options['baseline']} (tolerance {options['tolerance']:.0%}):")
+        for name, base, value, change in rows:
+            if base is None:
+                self.stdout.write(f"  {name:<60} {'new':>12}")
+                continue
+            flag = "  REGRESSION" if change < -options["tolerance"] else ""
+            self.stdout.write(f"  {name:<60} {base:>12.1f} -> {value:>12.1f}  {change:+7.1%}{flag}")
+
+        if regressions:
+            raise CommandError(f"{len(regressions)} case(s) more than {options['tolerance']:.0%} slower than the baseline")
+        self.stdout.write(self.style.SUCCESS("No regressions"))
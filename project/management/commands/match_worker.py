@@ -0,0 +1,23 @@
+# File: match_worker.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Management command that runs match workers for the match job queue (see engine/jobs.py).
+# Matches and simulations asked for on the site just wait in the queue until one of these picks them up,
+# and so do queued tournaments and simulation units (see simulate_league), from any host that shares the database.
+# Usage: python manage.py match_worker --processes 4 [--once]
+
+from django.core.management.base import BaseCommand
+
+from project.engine.jobs import POLL_SECONDS, run_workers
+
+
+class Command(BaseCommand):
+    help = "Play queued matches from the match job queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=1, help="Worker processes to run side by side")
+        parser.add_argument("--poll", type=float, default=POLL_SECONDS, help="Seconds between queue checks when idle")
+        parser.add_argument("--once", action="store_true", help="Stop once the queue is empty instead of waiting for more")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Starting {options['processes']} match worker(s)")
+        run_workers(options["processes"], options["poll"], options["once"])
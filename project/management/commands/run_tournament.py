@@ -0,0 +1,61 @@
+# File: run_tournament.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Management command to run a round robin tournament (see engine/tournament.py) right here
+# instead of through the match workers. Creates the tournament, or with --tournament plays whatever an
+# existing one is missing (after it was interrupted, or new bots were added). Reports matches/sec as it goes.
+# Usage: python manage.py run_tournament --name "Open boards" --board 1 --board 2 [--bot 3 --bot 4] --workers 4
+#        python manage.py run_tournament --tournament 5
+
+from django.core.management.base import BaseCommand, CommandError
+
+from project.models import Bot, Board, Tournament
+from project.engine.seeding import new_seed
+from project.engine.tournament import TOURNAMENT_BATCH_SIZE, run_tournament
+
+
+class Command(BaseCommand):
+    help = "Play every bot pairing on the chosen boards (only the ones not played yet)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tournament", type=int, help="Resume/extend this tournament")
+        parser.add_argument("--name", help="Name of a new tournament")
+        parser.add_argument("--board", type=int, action="append", help="Board id (can be repeated)")
+        parser.add_argument("--bot", type=int, action="append", help="Bot id (can be repeated, defaults to every bot)")
+        parser.add_argument("--rounds", type=int, default=2)
+        parser.add_argument("--max-turns", type=int, default=5000)
+        parser.add_argument("--seed", type=int)
+        parser.add_argument("--workers", type=int, help="Worker processes (defaults to SNAKE_SIMULATION_WORKERS)")
+        parser.add_argument("--batch-size", type=int, default=TOURNAMENT_BATCH_SIZE, help="Matches saved per transaction")
+
+    def handle(self, *args, **options):
+        if options["tournament"]:
+            try:
+                tournament = Tournament.objects.get(pk=options["tournament"])
+            except Tournament.DoesNotExist:
+                raise CommandError(f"No tournament {options['tournament']}")
+        else:
+            if not options["name"] or not options["board"]:
+                raise CommandError("A new tournament needs --name and at least one --board")
+            boards = Board.objects.filter(pk__in=options["board"])
+            bots = Bot.objects.filter(pk__in=options["bot"] or [])
+            tournament = Tournament.objects.create(
+                name=options["name"],
+                rounds=options["rounds"],
+                max_turns=options["max_turns"],
+                seed=options["seed"] if options["seed"] is not None else new_seed(),
+            )
+            tournament.boards.set(boards)
+            tournament.bots.set(bots)
+
+        self.stdout.write(f"Tournament {tournament.pk}: {tournament.name}")
+
+        def progress(played, scheduled, rate):
+            self.stdout.write(f"  {played:>6} / {scheduled} matches  {rate:8.2f} matches/sec")
+
+        played, rate = run_tournament(tournament, workers=options["workers"], batch_size=options["batch_size"], progress=progress)
+        tournament.status = Tournament.DONE
+        tournament.played = played
+        tournament.scheduled = played
+        tournament.matches_per_sec = rate
+        tournament.save()
+        self.stdout.write(f"Played {played} matches at {rate:.2f} matches/sec")
@@ -0,0 +1,114 @@
+# File: simulate_league.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Coordinator for big simulated league runs spread across machines (see engine/sim_queue.py).
+# Queues every bot pairing's runs on the chosen boards as simulation units, then waits for match workers
+# (here with --workers, and/or match_worker on any host sharing the database) to play them, merging each
+# finished unit into BotBoardStats as it comes in. Running it again with the same --batch just picks up
+# waiting and merging where it left off.
+# Usage: python manage.py simulate_league --batch nightly --board 1 --board 2 --runs 1000 --workers 4
+#        python manage.py simulate_league --batch nightly [--retry-failed]
+
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from project.models import Bot, Board, SimulationUnit
+from project.engine.jobs import start_workers
+from project.engine.seeding import new_seed
+from project.engine.sim_queue import UNIT_SIZE, enqueue_simulations, merge_units, pairings, retry_failed, unit_counts
+from project.engine.termination import EARLY_STOP_POLICIES
+
+
+class Command(BaseCommand):
+    help = "Queue simulated matches between every pair of bots for the match workers and merge the results into the stats"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", required=True, help="Name of the league run, to resume it later")
+        parser.add_argument("--board", type=int, action="append", help="Board id (can be repeated)")
+        parser.add_argument("--bot", type=int, action="append", help="Bot id (can be repeated, defaults to every bot)")
+        parser.add_argument("--runs", type=int, default=100, help="Runs per pairing per board")
+        parser.add_argument("--unit-size", type=int, default=UNIT_SIZE, help="Runs per work unit")
+        parser.add_argument("--max-turns", type=int, default=5000)
+        parser.add_argument("--early-stop", action="store_true", help="End runs once they're decided or going in circles")
+        parser.add_argument("--seed", type=int)
+        parser.add_argument("--workers", type=int, default=0, help="Match worker processes to run here as well")
+        parser.add_argument("--poll", type=float, default=2.0, help="Seconds between checks for finished units")
+        parser.add_argument("--retry-failed", action="store_true", help="Queue the batch's failed units again")
+        parser.add_argument("--no-wait", action="store_true", help="Only queue the units, merge them with a later run")
+
+    def handle(self, *args, **options):
+        batch = options["batch"][:60]
+
+        if SimulationUnit.objects.filter(batch=batch).exists():
+            self.stdout.write(f"Batch {batch} is already queued, waiting on it")
+            if options["retry_failed"]:
+                self.stdout.write(f"Queued {retry_failed(batch)} failed units again")
+        else:
+            if not options["board"]:
+                raise CommandError("A new batch needs at least one --board")
+            if options["runs"] < 1 or options["unit_size"] < 1:
+                raise CommandError("--runs and --unit-size have to be at least 1")
+            boards = list(Board.objects.filter(pk__in=options["board"]).order_by("pk"))
+            bots = Bot.objects.filter(pk__in=options["bot"]) if options["bot"] else Bot.objects.all()
+            games = pairings(bots, boards)
+            if not games:
+                raise CommandError("Need at least two bots and one board")
+
+            seed = options["seed"] if options["seed"] is not None else new_seed()
+            units = enqueue_simulations(
+                batch,
+                games,
+                options["runs"],
+                seed,
+                unit_size=options["unit_size"],
+                max_turns=options["max_turns"],
+                termination=EARLY_STOP_POLICIES if options["early_stop"] else (),
+            )
+            self.stdout.write(f"Queued {len(games)} pairings x {options['runs']} runs as {units} units (seed {seed})")
+
+        if options["no_wait"]:
+            return
+
+        stop = None
+        local = []
+        if options["workers"] > 0:
+            stop = multiprocessing.Event()
+            local = start_workers(options["workers"], stop=stop)
+            self.stdout.write(f"Started {len(local)} local worker(s)")
+
+        start = time.perf_counter()
+        merged_runs = 0
+        # Units finished before we started don't count towards runs/sec
+        earlier = None
+        last = None
+        try:
+            while True:
+                _, matches = merge_units(batch)
+                merged_runs += matches
+                if earlier is None:
+                    earlier = matches
+                counts = unit_counts(batch)
+
+                line = (
+                    f"  {counts['merged']} merged, {counts['done']} done, {counts['running']} running, "
+                    f"{counts['queued']} queued, {counts['failed']} failed units"
+                )
+                if line != last:
+                    elapsed = time.perf_counter() - start
+                    self.stdout.write(f"{line}  {(merged_runs - earlier) / elapsed if elapsed else 0:8.1f} runs/sec")
+                    last = line
+
+                if not (counts["queued"] or counts["running"] or counts["done"]):
+                    break
+                time.sleep(options["poll"])
+        finally:
+            if stop is not None:
+                stop.set()
+                for p in local:
+                    p.join()
+
+        counts = unit_counts(batch)
+        self.stdout.write(f"Merged {merged_runs} runs into the stats ({counts['runs']} in the batch so far)")
+        if counts["failed"]:
+            self.stdout.write(self.style.WARNING(f"{counts['failed']} units failed, --retry-failed queues them again"))
@@ -0,0 +1,96 @@
+# File: sweep_bots.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Management command to tune bot personalities with a parameter sweep (see engine/sweep.py).
+# Scores grid, random or evolved candidates against a pool of opponent bots on the chosen boards, using
+# every core by default. Progress is checkpointed to --checkpoint after every chunk, so running the same
+# command again after it was stopped carries on from there. --save-top saves the best ones as Bots.
+# Usage: python manage.py sweep_bots --strategy evolve --board 1 --board 2 --opponent 3 --opponent 4 --generations 10
+#        python manage.py sweep_bots --strategy random --candidates 500 --board 1 --save-top 3 --name "Tuned"
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from project.models import Bot, Board
+from project.engine.sweep import SWEEP_STRATEGIES, Sweep, save_top, candidate_key
+from project.engine.termination import EARLY_STOP_POLICIES
+
+
+class Command(BaseCommand):
+    help = "Search bot personalities for the ones that do best against a pool of opponents"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--strategy", choices=SWEEP_STRATEGIES, default="evolve")
+        parser.add_argument("--board", type=int, action="append", help="Board id to play on (can be repeated)")
+        parser.add_argument("--opponent", type=int, action="append", help="Opponent bot id (can be repeated, defaults to every bot)")
+        parser.add_argument("--games", type=int, default=4, help="Games against every opponent on every board")
+        parser.add_argument("--max-turns", type=int, default=2000)
+        parser.add_argument("--early-stop", action="store_true", help="End games once they're decided or looping")
+        parser.add_argument("--seed", type=int, default=412)
+        parser.add_argument("--steps", type=int, default=3, help="Values per parameter for grid (steps ** 6 candidates)")
+        parser.add_argument("--candidates", type=int, default=100, help="Candidates for random")
+        parser.add_argument("--population", type=int, default=24, help="Candidates per generation for evolve")
+        parser.add_argument("--generations", type=int, default=10, help="Generations for evolve")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--checkpoint", default="sweep_checkpoint.json", help="Progress file, resumed from if it exists")
+        parser.add_argument("--restart", action="store_true", help="Ignore (and overwrite) an existing checkpoint")
+        parser.add_argument("--top", type=int, default=5, help="How many of the best to print")
+        parser.add_argument("--save-top", type=int, default=0, help="Save this many of the best as Bots")
+        parser.add_argument("--name", default="Tuned", help="Name prefix for saved Bots")
+
+    def handle(self, *args, **options):
+        if not options["board"]:
+            raise CommandError("Pick at least one --board")
+        boards = list(Board.objects.filter(pk__in=options["board"]).order_by("pk"))
+        if len(boards) != len(set(options["board"])):
+            raise CommandError("Some of those boards don't exist")
+
+        opponents = Bot.objects.order_by("pk")
+        if options["opponent"]:
+            opponents = opponents.filter(pk__in=options["opponent"])
+        opponents = list(opponents)
+        if not opponents:
+            raise CommandError("No opponent bots to play against")
+
+        sweep = Sweep(
+            options["strategy"],
+            opponents,
+            boards,
+            games=options["games"],
+            max_turns=options["max_turns"],
+            seed=options["seed"],
+            termination=EARLY_STOP_POLICIES if options["early_stop"] else (),
+            checkpoint=options["checkpoint"],
+            steps=options["steps"],
+            candidates=options["candidates"],
+            population=options["population"],
+            generations=options["generations"],
+        )
+        if not options["restart"]:
+            try:
+                if sweep.load():
+                    self.stdout.write(f"Resuming from {options['checkpoint']} ({len(sweep.evaluated)} candidates scored)")
+            except ValueError as e:
+                raise CommandError(f"{e}, use --restart or another --checkpoint")
+
+        self.stdout.write(
+            f"{options['strategy']} sweep: {len(opponents)} opponents x {len(boards)} boards x {options['games']} games "
+            f"per candidate, {options['workers']} workers"
+        )
+
+        def progress(scored, best, rate):
+            self.stdout.write(f"  {scored:>6} scored  {rate:6.2f}/sec  best {best['score']:.3f} ({candidate_key(best['params'])})")
+
+        results = sweep.run(workers=options["workers"], progress=progress)
+
+        self.stdout.write("Best:")
+        for result in results[:options["top"]]:
+            params = " ".join(f"{k}={v:g}" for k, v in result["params"].items())
+            self.stdout.write(
+                f"  {result['score']:.3f} win rate  {result['apples']:.2f} apples/game  "
+                f"{result['wins']}-{result['losses']}-{result['draws']}  {params}"
+            )
+
+        if options["save_top"]:
+            for bot in save_top(results, options["save_top"], options["name"]):
+                self.stdout.write(self.style.SUCCESS(f"Saved {bot.name} (bot {bot.pk})"))
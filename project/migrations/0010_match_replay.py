@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0009_alter_bot_color'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='replay',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
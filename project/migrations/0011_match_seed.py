@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0010_match_replay'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='seed',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='params',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='seed',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0011_match_seed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seed', models.BigIntegerField()),
+                ('max_turns', models.PositiveIntegerField(default=5000)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('turn', models.PositiveIntegerField(default=0)),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='project.board')),
+                ('bot1', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='project.bot')),
+                ('bot2', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='project.bot')),
+                ('match', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='project.match')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='project_mat_status_d95e3c_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0012_matchjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='moveevent',
+            index=models.Index(fields=['match', 'move_number'], name='project_mov_match_i_55f9d4_idx'),
+        ),
+    ]
@@ -0,0 +1,111 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def averages_to_sums(apps, schema_editor):
+    """Turn the running averages into totals, merging any duplicate (bot, board) rows on the way"""
+    BotBoardStats = apps.get_model('project', 'BotBoardStats')
+
+    keep = {}
+    for stats in BotBoardStats.objects.order_by('pk'):
+        turns = round(stats.avg_turns * stats.games)
+        apples = round(stats.avg_apples * stats.games)
+        first = keep.get((stats.bot_id, stats.board_id))
+        if first is None:
+            stats.turns_sum = turns
+            stats.apples_sum = apples
+            stats.save()
+            keep[stats.bot_id, stats.board_id] = stats
+        else:
+            first.games += stats.games
+            first.wins += stats.wins
+            first.losses += stats.losses
+            first.draws += stats.draws
+            first.turns_sum += turns
+            first.apples_sum += apples
+            first.save()
+            stats.delete()
+
+
+def fill_global_stats(apps, schema_editor):
+    """Add up the existing BotBoardStats of every bot"""
+    BotBoardStats = apps.get_model('project', 'BotBoardStats')
+    BotGlobalStats = apps.get_model('project', 'BotGlobalStats')
+
+    rows = BotBoardStats.objects.values('bot').annotate(
+        games=Sum('games'),
+        wins=Sum('wins'),
+        losses=Sum('losses'),
+        draws=Sum('draws'),
+        turns_sum=Sum('turns_sum'),
+        apples_sum=Sum('apples_sum'),
+    ).order_by()
+    BotGlobalStats.objects.bulk_create(
+        [
+            BotGlobalStats(
+                bot_id=row.pop('bot'),
+                win_rate=row['wins'] / row['games'] if row['games'] else 0.0,
+                **row,
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    replaces = [
+        ('project', '0014_botglobalstats'),
+        ('project', '0015_stats_sums'),
+    ]
+
+    dependencies = [
+        ('project', '0013_moveevent_match_move_number'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='botboardstats',
+            name='apples_sum',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='botboardstats',
+            name='turns_sum',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(averages_to_sums, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='botboardstats',
+            name='avg_apples',
+        ),
+        migrations.RemoveField(
+            model_name='botboardstats',
+            name='avg_turns',
+        ),
+        migrations.AddConstraint(
+            model_name='botboardstats',
+            constraint=models.UniqueConstraint(fields=('bot', 'board'), name='unique_bot_board_stats'),
+        ),
+        migrations.CreateModel(
+            name='BotGlobalStats',
+            fields=[
+                ('bot', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='global_stats', serialize=False, to='project.bot')),
+                ('games', models.IntegerField(default=0)),
+                ('wins', models.IntegerField(default=0)),
+                ('losses', models.IntegerField(default=0)),
+                ('draws', models.IntegerField(default=0)),
+                ('turns_sum', models.BigIntegerField(default=0)),
+                ('apples_sum', models.BigIntegerField(default=0)),
+                ('win_rate', models.FloatField(default=0.0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-win_rate', 'bot'], name='project_bot_win_rat_db78ca_idx')],
+            },
+        ),
+        migrations.RunPython(fill_global_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0014_botglobalstats_squashed_0015_stats_sums'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='tournament_round',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='Tournament',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=60)),
+                ('rounds', models.PositiveSmallIntegerField(default=2)),
+                ('max_turns', models.PositiveIntegerField(default=5000)),
+                ('seed', models.BigIntegerField()),
+                ('status', models.CharField(choices=[('idle', 'Not Started'), ('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='idle', max_length=10)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('played', models.PositiveIntegerField(default=0)),
+                ('scheduled', models.PositiveIntegerField(default=0)),
+                ('matches_per_sec', models.FloatField(default=0.0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('boards', models.ManyToManyField(related_name='tournaments', to='project.board')),
+                ('bots', models.ManyToManyField(blank=True, related_name='tournaments', to='project.bot')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='tournament',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='matches', to='project.tournament'),
+        ),
+        migrations.AddConstraint(
+            model_name='match',
+            constraint=models.UniqueConstraint(fields=('tournament', 'bot1', 'bot2', 'board', 'tournament_round'), name='unique_tournament_game'),
+        ),
+    ]
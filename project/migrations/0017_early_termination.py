@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0016_tournament'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='terminated_by',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='tournament',
+            name='early_stop',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0017_early_termination'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimulationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('config_key', models.CharField(db_index=True, max_length=64)),
+                ('runs', models.PositiveIntegerField()),
+                ('seed', models.BigIntegerField()),
+                ('results', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='project.board')),
+                ('bot1', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='project.bot')),
+                ('bot2', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='project.bot')),
+            ],
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0018_simulationrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimulationUnit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch', models.CharField(max_length=60)),
+                ('bots', models.JSONField()),
+                ('seed', models.BigIntegerField()),
+                ('first', models.PositiveIntegerField()),
+                ('count', models.PositiveIntegerField()),
+                ('max_turns', models.PositiveIntegerField(default=5000)),
+                ('termination', models.JSONField(default=list)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('merged', 'Merged'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('lease_until', models.DateTimeField(blank=True, null=True)),
+                ('results', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='project.board')),
+                ('bot1', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='project.bot')),
+                ('bot2', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='project.bot')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='project_sim_status_f9d647_idx'), models.Index(fields=['batch', 'status'], name='project_sim_batch_02f9d4_idx')],
+            },
+        ),
+    ]
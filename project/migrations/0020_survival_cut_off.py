@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:34
+
+from django.db import migrations, models
+from django.db.models import F, Sum
+
+
+def mark_cut_off(apps, schema_editor):
+    """Every game so far counted its survival time, then take the saved matches a "decided" early stop
+    cut off back out (the survivor of those is always the winner). Simulated runs weren't saved, so
+    they stay in."""
+    Match = apps.get_model('project', 'Match')
+    BotBoardStats = apps.get_model('project', 'BotBoardStats')
+    BotGlobalStats = apps.get_model('project', 'BotGlobalStats')
+
+    BotBoardStats.objects.update(turns_games=F('games'))
+
+    decided = Match.objects.filter(terminated_by='decided')
+    decided.filter(winner=1).update(a_cut_off=True)
+    decided.filter(winner=2).update(b_cut_off=True)
+    for bot, survival, winner in (('bot1', 'a_survival_time', 1), ('bot2', 'b_survival_time', 2)):
+        rows = decided.filter(winner=winner).values(bot, 'board').annotate(n=models.Count('pk'), turns=Sum(survival)).order_by()
+        for row in rows:
+            BotBoardStats.objects.filter(bot_id=row[bot], board_id=row['board']).update(
+                turns_sum=F('turns_sum') - row['turns'],
+                turns_games=F('turns_games') - row['n'],
+            )
+
+    for row in BotBoardStats.objects.values('bot').annotate(turns_sum=Sum('turns_sum'), turns_games=Sum('turns_games')).order_by():
+        BotGlobalStats.objects.filter(bot_id=row['bot']).update(turns_sum=row['turns_sum'], turns_games=row['turns_games'])
+
+    # Cached simulation results worked avg_turns out with the cut-off runs in
+    apps.get_model('project', 'SimulationRun').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0019_simulationunit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='botboardstats',
+            name='turns_games',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='botglobalstats',
+            name='turns_games',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='a_cut_off',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='b_cut_off',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_cut_off, migrations.RunPython.noop),
+    ]
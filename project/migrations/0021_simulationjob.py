@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0020_survival_cut_off'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimulationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('runs', models.PositiveIntegerField()),
+                ('seed', models.BigIntegerField()),
+                ('options', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='queued', max_length=10)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('results', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='project.board')),
+                ('bot1', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='project.bot')),
+                ('bot2', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='project.bot')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='project_sim_status_2a4024_idx')],
+            },
+        ),
+    ]
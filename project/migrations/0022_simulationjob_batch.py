@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0021_simulationjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simulationjob',
+            name='batch',
+            field=models.BooleanField(default=False),
+        ),
+    ]
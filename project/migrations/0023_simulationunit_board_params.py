@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:17
+
+from django.db import migrations, models
+
+
+def snapshot_boards(apps, schema_editor):
+    """Units queued before this play the board as it is now, same as they would have"""
+    SimulationUnit = apps.get_model('project', 'SimulationUnit')
+    for unit in SimulationUnit.objects.select_related('board'):
+        board = unit.board
+        unit.board_params = {
+            'width': board.width,
+            'height': board.height,
+            'food_count': board.food_count,
+            'board_json': board.board_json,
+        }
+        unit.save(update_fields=['board_params'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0022_simulationjob_batch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simulationunit',
+            name='board_params',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.RunPython(snapshot_boards, migrations.RunPython.noop),
+    ]
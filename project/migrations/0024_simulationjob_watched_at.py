@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0023_simulationunit_board_params'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simulationjob',
+            name='watched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
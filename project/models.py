@@ -61,6 +61,9 @@ class Board(models.Model):
     #JSON representation of the saved board.
     board_json = models.JSONField(blank=False)
 
+    # Seed the board was generated with (generate_board gives the same board for the same seed)
+    seed = models.BigIntegerField(null=True, blank=True)
+
     def __str__(self):
         return f"Board {self.name}: {self.width}x{self.height} with {self.food_count} food items."
     
@@ -90,6 +93,33 @@ class Match(models.Model):
     # A bot could theoretically win scorewise but have a lower survival time if it focused on eating apples quickly
     a_survival_time = models.PositiveIntegerField(default=0)  
     b_survival_time = models.PositiveIntegerField(default=0)  
+    # Set when the bot was still alive when an early stop ended the match, so its survival time is where it got cut off
+    a_cut_off = models.BooleanField(default=False)
+    b_cut_off = models.BooleanField(default=False)
+
+    # Name of the termination policy that ended the match before max_turns (see engine/termination.py), blank if none did
+    terminated_by = models.CharField(max_length=20, blank=True)
+
+    # Compact binary replay (see engine/replay.py). Replaces storing every turn as a MoveEvent,
+    # older matches may still only have MoveEvents until backfill_replays is run.
+    replay = models.BinaryField(null=True, blank=True, editable=False)
+
+    # Seed of the match's random number generator plus the bot parameters, food count and max turns it
+    # was played with. Together with the board that's enough to play the exact same match again.
+    seed = models.BigIntegerField(null=True, blank=True)
+    params = models.JSONField(null=True, blank=True)
+
+    # Tournament this match was played for and which of its rounds (see engine/tournament.py)
+    tournament = models.ForeignKey('Tournament', on_delete=models.SET_NULL, null=True, blank=True, related_name='matches')
+    tournament_round = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tournament", "bot1", "bot2", "board", "tournament_round"],
+                name="unique_tournament_game",
+            )
+        ]
 
     def __str__(self):
         return f"Match {self.id} between {self.bot1.name} and {self.bot2.name} won by {'Bot 1' if self.winner == 1 else 'Bot 2' if self.winner == 2 else 'NIETHER'} after {self.total_turns} turns.  Score: {self.apples_a}-{self.apples_b}"
@@ -98,6 +128,30 @@ class Match(models.Model):
         """Get all move events for this match ordered by move number"""
         return self.move_events.order_by('move_number')
 
+    def get_replay(self):
+        """Get the decoded Replay for this match. Matches saved without a replay are played again
+        from their seed. Returns None if it only has MoveEvents"""
+        # Imported here since the engine imports the models
+        from .engine.replay import Replay
+        if self.replay is not None:
+            return Replay(self.replay)
+        if self.is_replayable():
+            from .engine.run_match import replay_from_seed
+            _, blob = replay_from_seed(self)
+            return Replay(blob)
+        return None
+
+    def is_replayable(self):
+        """Returns true if the match can be played again from its seed"""
+        from project.engine.seeding import ENGINE_VERSION
+        from project.engine.termination import TERMINATION_POLICIES
+        return (
+            self.seed is not None
+            and bool(self.params)
+            and self.params.get("engine", 1) == ENGINE_VERSION
+            and all(name in TERMINATION_POLICIES for name in self.params.get("termination", ()))
+        )
+
 
 class MoveEvent(models.Model):
     """Encapsulate a single move event in a Match"""
@@ -126,6 +180,10 @@ class MoveEvent(models.Model):
 
     timestamp = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # The replay API reads a match's turns in order, often just a window of them
+        indexes = [models.Index(fields=["match", "move_number"])]
+
     def __str__(self):
         return f"Move {self.move_number} in Match {self.match.id}: Bot1 move {self.bot1_move} to ({self.bot1_body}), Bot2 move {self.bot2_move} to ({self.bot2_body}). Apples at {self.apple_positions}."
     
@@ -144,12 +202,280 @@ class BotBoardStats(models.Model):
     losses = models.IntegerField(default=0)
     draws = models.IntegerField(default=0)
 
-    # Other fun stats
-    avg_turns = models.FloatField(default=0.0)
-    avg_apples = models.FloatField(default=0.0)
+    # Other fun stats. Totals instead of running averages so matches can just add to them (see engine/stats.py)
+    turns_sum = models.BigIntegerField(default=0)
+    apples_sum = models.BigIntegerField(default=0)
+    # Games whose survival time is in turns_sum, the ones where the bot wasn't cut off by an early stop
+    turns_games = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["bot", "board"], name="unique_bot_board_stats")]
+
+    def avg_turns(self):
+        return self.turns_sum / self.turns_games if self.turns_games else 0
+
+    def avg_apples(self):
+        return self.apples_sum / self.games if self.games else 0
 
     def win_rate(self):
         """Calculate and return win rate for use in the leaderboards without having to store it and update it every time"""
         if self.games == 0:
             return 0
         return (self.wins / self.games) * 100
+
+
+class BotGlobalStats(models.Model):
+    """A bot's BotBoardStats added up across every board, kept up to date as matches finish
+    (see engine/stats.py) so the global leaderboard is just a sorted, paginated query"""
+    bot = models.OneToOneField(Bot, on_delete=models.CASCADE, primary_key=True, related_name='global_stats')
+
+    games = models.IntegerField(default=0)
+    wins = models.IntegerField(default=0)
+    losses = models.IntegerField(default=0)
+    draws = models.IntegerField(default=0)
+
+    turns_sum = models.BigIntegerField(default=0)
+    apples_sum = models.BigIntegerField(default=0)
+    turns_games = models.IntegerField(default=0)
+
+    # wins / games, stored so the leaderboard can be sorted by it with an index
+    win_rate = models.FloatField(default=0.0)
+
+    class Meta:
+        indexes = [models.Index(fields=["-win_rate", "bot"])]
+
+    def avg_turns(self):
+        return self.turns_sum / self.turns_games if self.turns_games else 0
+
+    def avg_apples(self):
+        return self.apples_sum / self.games if self.games else 0
+
+
+class MatchJob(models.Model):
+    """A match waiting to be played (or being played) by a match worker (see engine/jobs.py),
+    so creating a match doesn't have to run the whole thing inside the request"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    bot1 = models.ForeignKey(Bot, on_delete=models.CASCADE, related_name='+')
+    bot2 = models.ForeignKey(Bot, on_delete=models.CASCADE, related_name='+')
+    board = models.ForeignKey(Board, on_delete=models.CASCADE)
+    seed = models.BigIntegerField()
+    max_turns = models.PositiveIntegerField(default=5000)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    # Name of the worker process that claimed it
+    worker = models.CharField(max_length=100, blank=True)
+    # Progress, updated every few turns by the worker
+    turn = models.PositiveIntegerField(default=0)
+    rows = models.PositiveIntegerField(default=0)
+    # The finished match (or what went wrong)
+    match = models.ForeignKey(Match, on_delete=models.SET_NULL, null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Doubles as the worker's heartbeat while it's running
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"Match job {self.id} ({self.status}) between {self.bot1.name} and {self.bot2.name}"
+
+    def is_finished(self):
+        """Returns true once the worker is done with the job, one way or the other"""
+        return self.status in (self.DONE, self.FAILED)
+
+
+class Tournament(models.Model):
+    """A round robin between bots on a set of boards, played by a match worker (see engine/tournament.py).
+    Every pair of bots plays rounds matches on every board (taking turns being bot 1). Playing it again
+    only plays the matches it doesn't have yet, so it picks up where it left off and new bots just play
+    their own pairings."""
+
+    IDLE = "idle"
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (IDLE, "Not Started"),
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=60)
+    boards = models.ManyToManyField(Board, related_name='tournaments')
+    # No bots means every bot there is
+    bots = models.ManyToManyField(Bot, blank=True, related_name='tournaments')
+    rounds = models.PositiveSmallIntegerField(default=2)
+    max_turns = models.PositiveIntegerField(default=5000)
+    seed = models.BigIntegerField()
+    # End matches as soon as the winner can't change or the snakes are going in circles (see engine/termination.py)
+    early_stop = models.BooleanField(default=False)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=IDLE)
+    worker = models.CharField(max_length=100, blank=True)
+    # Progress of the current (or last) run
+    played = models.PositiveIntegerField(default=0)
+    scheduled = models.PositiveIntegerField(default=0)
+    matches_per_sec = models.FloatField(default=0.0)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Doubles as the worker's heartbeat while it's running
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Tournament {self.name} ({self.status})"
+
+    def get_absolute_url(self):
+        return reverse('tournament', args=[str(self.id)])
+
+    def is_finished(self):
+        return self.status not in (self.QUEUED, self.RUNNING)
+
+
+class SimulationRun(models.Model):
+    """Stored results of a simulation (see engine/sim_cache.py), so asking for the same simulation
+    again doesn't play every run again. key is a hash of both bots' personalities, the board, the
+    run count, seed and engine options, so editing a bot or board just makes new keys."""
+
+    key = models.CharField(max_length=64, unique=True)
+    # Same hash without the seed, for simulations asked for without one
+    config_key = models.CharField(max_length=64, db_index=True)
+
+    bot1 = models.ForeignKey(Bot, on_delete=models.CASCADE, related_name='+')
+    bot2 = models.ForeignKey(Bot, on_delete=models.CASCADE, related_name='+')
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='+')
+    runs = models.PositiveIntegerField()
+    seed = models.BigIntegerField()
+    # The results dict simulate_matches / simulate_batch returned
+    results = models.JSONField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    # For evicting the least recently used ones
+    last_used = models.DateTimeField(auto_now_add=True, db_index=True)
+    hits = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Simulation of {self.runs} runs between {self.bot1.name} and {self.bot2.name} on {self.board.name}"
+
+
+class SimulationJob(models.Model):
+    """A simulation asked for on the site, played by a match worker (see engine/sim_jobs.py) while the
+    live results page follows it through SimulationStreamView. results holds the totals so far."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+        (CANCELLED, "Cancelled"),
+    ]
+
+    bot1 = models.ForeignKey(Bot, on_delete=models.CASCADE, related_name='+')
+    bot2 = models.ForeignKey(Bot, on_delete=models.CASCADE, related_name='+')
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='+')
+    runs = models.PositiveIntegerField()
+    seed = models.BigIntegerField()
+    # Keyword arguments for the engine (margin, apples_margin, confidence, termination)
+    options = models.JSONField(default=dict)
+    # Played with the numpy batch engine instead of the regular one
+    batch = models.BooleanField(default=False)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    worker = models.CharField(max_length=100, blank=True)
+    results = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Doubles as the worker's heartbeat while it's running
+    updated_at = models.DateTimeField(auto_now=True)
+    # Last time a live results page was following it, the worker cancels it once nobody has been for a while
+    watched_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"Simulation job {self.id} ({self.status}) of {self.runs} runs between {self.bot1.name} and {self.bot2.name}"
+
+    def is_finished(self):
+        """Returns true once nobody is going to play any more of it"""
+        return self.status in (self.DONE, self.FAILED, self.CANCELLED)
+
+
+class SimulationUnit(models.Model):
+    """A slice of simulated runs between two bots on a board, waiting in the shared work queue for any
+    match worker on any host to lease it (see engine/sim_queue.py). The worker plays runs first to
+    first + count - 1 of seed and stores the stats they add up to, then the coordinator that queued
+    the batch merges them into BotBoardStats."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    MERGED = "merged"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (MERGED, "Merged"),
+        (FAILED, "Failed"),
+    ]
+
+    # Name of the league run it's part of
+    batch = models.CharField(max_length=60)
+    bot1 = models.ForeignKey(Bot, on_delete=models.CASCADE, related_name='+')
+    bot2 = models.ForeignKey(Bot, on_delete=models.CASCADE, related_name='+')
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='+')
+    # Both bots' personalities and the board when it was queued, so editing either mid batch doesn't mix two versions
+    bots = models.JSONField()
+    board_params = models.JSONField(default=dict)
+    seed = models.BigIntegerField()
+    first = models.PositiveIntegerField()
+    count = models.PositiveIntegerField()
+    max_turns = models.PositiveIntegerField(default=5000)
+    termination = models.JSONField(default=list)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    worker = models.CharField(max_length=100, blank=True)
+    # Times it's been claimed, a unit that keeps losing its worker is given up on eventually
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # The worker has it until then, renewed as it plays
+    lease_until = models.DateTimeField(null=True, blank=True)
+    # Stats changes the runs add up to (see sim_queue.run_unit), or what went wrong
+    results = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+            models.Index(fields=["batch", "status"]),
+        ]
+
+    def __str__(self):
+        return f"Simulation unit {self.id} ({self.status}) of {self.batch}: runs {self.first}-{self.first + self.count - 1}"
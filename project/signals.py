@@ -0,0 +1,18 @@
+# File: signals.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Model signal handlers, connected in ProjectConfig.ready.
+
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import Match
+from .engine.replay_cache import invalidate_replays
+
+
+@receiver(post_delete, sender=Match)
+def drop_cached_replays(sender, instance, **kwargs):
+    """Drop a deleted match's cached replays, whether it was deleted on its own or along with its bots,
+    board or anything else. Only once the delete is committed, so nobody caches it again in between."""
+    pk = instance.pk
+    transaction.on_commit(lambda: invalidate_replays([pk]))
@@ -1,3 +1,1718 @@
-from django.test import TestCase
+# File: tests.py
+# Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+# Description: Tests for the snake engine and the parts of the site built on it.
+# Run with: python manage.py test project
 
-# Create your tests here.
+import gzip
+import hashlib
+import json
+import random
+import shutil
+import subprocess
+import tempfile
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+
+import numpy as np
+
+from django.db import connection
+from django.db.models import QuerySet
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Board, Bot, BotBoardStats, BotGlobalStats, Match, MatchJob, MoveEvent, SimulationJob, SimulationRun, SimulationUnit, Tournament
+from .engine.arena import DIRECTIONS, choose_bot_move, dies, first_step_toward_target, step_game
+from .engine.batch import UNREACHED, BatchBoard, BatchMatches, simulate_batch
+from .engine.board_generator import generate_board
+from .engine.confidence import MIN_RUNS, WinRateEstimate, half_width, mean_interval, wilson_interval, z_value
+from .engine import context
+from .engine.context import BoardContext, get_board_context
+from .engine.distance import UNREACHABLE, AppleDistanceField
+from .engine.instrument import PHASES, EngineProfile, merge_summaries
+from .engine.jobs import JOB_STALE_SECONDS, claim_job, enqueue_match, run_job
+from .engine import leaderboard
+from .engine.leaderboard import aggregate_global_stats, rebuild_global_stats
+from .engine.occupancy import EMPTY, OBSTACLE, SNAKE1, SNAKE2, FreeCellSet, OccupancyGrid
+from .engine.pool import simulate_parallel
+from .engine.replay import Replay, ReplayEncoder
+from .engine.replay_cache import REPLAY_MAX_AGE, get_replay_payload
+from .engine.run_match import bot_params, iter_simulation, play_match, replay_from_seed, run_match, simulate_matches
+from .engine.seeding import ENGINE_VERSION, derive_seed
+from .engine.sim_cache import cache_simulation, get_cached_simulation
+from .engine import sim_jobs
+from .engine.sim_jobs import SIMULATION_WATCH_GRACE_SECONDS, claim_simulation, queue_simulation, run_simulation_job
+from .engine.sim_queue import UNIT_MAX_ATTEMPTS, claim_unit, enqueue_simulations, merge_units, pairings, play_unit, run_unit
+from .engine.state import GameState
+from .engine import sweep
+from .engine.sweep import PARAM_RANGES, Sweep, candidate_key, grid_candidates, save_top, score, snap
+from .engine.stats import STAT_FIELDS, StatsBatch, apply_stats, match_changes
+from .engine.termination import EARLY_STOP_POLICIES, REPETITION_LIMIT, DecidedOutcome, RepetitionLoop
+from .engine.tournament import TOURNAMENT_STALE_SECONDS, claim_tournament, queue_tournament, run_tournament, run_tournament_job, schedule
+
+
+def make_bots():
+    """Two unsaved bots with different personalities"""
+    return (
+        Bot(pk=1, name="Greedy", greediness=1.8, chaos=0.1),
+        Bot(pk=2, name="Calm", caution=1.8, circliness=1.2),
+    )
+
+
+def make_board(board_type="open", width=30, height=18, food_count=3, wrap=False):
+    """An unsaved board, the same one every time"""
+    return Board(width=width, height=height, food_count=food_count, board_json=generate_board(board_type, width, height, wrap, 1))
+
+
+def save_bots_and_board():
+    """The same bots and board as make_bots and make_board, saved"""
+    bot1, bot2 = make_bots()
+    bot1.pk = bot2.pk = None
+    bot1.save()
+    bot2.save()
+    board = make_board()
+    board.name = "open"
+    board.save()
+    return bot1, bot2, board
+
+
+def racing(claim):
+    """
+    Patch QuerySet.update so claim() runs right before the first UPDATE, like another worker
+    grabbing the same row between our SELECT and UPDATE. Returns the patch and a list claim()'s result goes in.
+    """
+    update = QuerySet.update
+    raced = []
+
+    def racing_update(queryset, **kwargs):
+        if not raced:
+            raced.append(None)
+            raced[0] = claim()
+        return update(queryset, **kwargs)
+
+    return mock.patch.object(QuerySet, "update", autospec=True, side_effect=racing_update), raced
+
+
+def play_recorded(board, seed, max_turns=400, keyframe_intervals=(100,)):
+    """Play a match in memory, returns (every turn as a MoveEvent-shaped dict, replay blob per keyframe interval)"""
+    bot1, bot2 = make_bots()
+    ctx = get_board_context(board)
+    state = GameState.start(ctx, seed)
+    encoders = [ReplayEncoder(ctx.width, ctx.height, ctx.wrap, interval) for interval in keyframe_intervals]
+    turns = []
+
+    def on_turn(s):
+        frame = s.snapshot()
+        del frame["match"]
+        for key in ("bot1_body", "bot2_body", "apple_positions"):
+            frame[key] = [list(p) for p in frame[key]]
+        turns.append(frame)
+        for encoder in encoders:
+            encoder.add(s)
+
+    on_turn(state)
+    play_match(state, bot1, bot2, ctx, max_turns, on_turn=on_turn)
+    return turns, [encoder.finish() for encoder in encoders]
+
+
+class ReplayCodecTests(SimpleTestCase):
+    """Encoding a match into a replay blob and reading the turns back out"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.turns, (cls.blob, cls.small_blob) = play_recorded(make_board(), 7, keyframe_intervals=(100, 7))
+
+    def test_round_trip(self):
+        replay = Replay(self.blob)
+        self.assertEqual(replay.total_turns, len(self.turns) - 1)
+        self.assertEqual(list(replay.frames()), self.turns)
+
+    def test_keyframe_windows(self):
+        # Windows that start on, right after and right before a keyframe, and ones that cross several
+        replay = Replay(self.small_blob)
+        self.assertGreater(len(replay.keyframe_turns), 3)
+        last = replay.total_turns
+        for from_turn, to_turn in ((0, 0), (6, 8), (7, 7), (13, 29), (1, last), (last - 3, last + 50)):
+            with self.subTest(from_turn=from_turn, to_turn=to_turn):
+                self.assertEqual(list(replay.frames(from_turn, to_turn)), self.turns[from_turn:to_turn + 1])
+
+    def test_single_turns(self):
+        replay = Replay(self.small_blob)
+        for turn in (0, 7, 20, replay.total_turns):
+            self.assertEqual(replay.frame(turn), self.turns[turn])
+        with self.assertRaises(IndexError):
+            replay.frame(replay.total_turns + 1)
+
+    def test_wrap_board(self):
+        turns, (blob,) = play_recorded(make_board(width=20, height=12, wrap=True), 3, keyframe_intervals=(5,))
+        replay = Replay(blob)
+        self.assertTrue(replay.wrap)
+        self.assertEqual(list(replay.frames()), turns)
+
+    def test_not_a_replay(self):
+        with self.assertRaises(ValueError):
+            Replay(b"NOPE" + self.blob[4:])
+
+
+class OccupancyGridTests(SimpleTestCase):
+    """The occupancy grid kept up to date by step_game and the collision checks that read it"""
+
+    def check_game(self, board, seed, max_turns=400):
+        bot1, bot2 = make_bots()
+        ctx = get_board_context(board)
+        state = GameState.start(ctx, seed)
+        while (state.bot1_alive or state.bot2_alive) and state.move_number < max_turns:
+            step_game(state, bot1, bot2, ctx)
+            # Obstacles with both bodies on top, dead ones stay where they died
+            expected = OccupancyGrid(ctx)
+            expected.place(state.bot1_body, SNAKE1)
+            expected.place(state.bot2_body, SNAKE2)
+            self.assertEqual(state.grid.cells, expected.cells, f"turn {state.move_number}")
+
+    def test_open_board(self):
+        self.check_game(make_board(), 1)
+
+    def test_outer_wall(self):
+        # The starting snakes sit on the wall, it has to come back once they move off
+        board = make_board("outer_wall", width=14, height=10, food_count=5)
+        ctx = get_board_context(board)
+        self.assertTrue(any(ctx.obstacle_map[ctx.index(x, y)] == OBSTACLE for x, y in ctx.start1))
+        self.check_game(board, 2)
+
+    def test_wrap_board(self):
+        self.check_game(make_board(width=12, height=8, food_count=6, wrap=True), 3)
+
+    def test_vacate_restores_obstacle(self):
+        ctx = get_board_context(make_board("outer_wall", width=10, height=8))
+        grid = OccupancyGrid(ctx)
+        grid.occupy(0, 0, SNAKE1)
+        grid.occupy(4, 4, SNAKE2)
+        self.assertEqual(grid.owner(0, 0), SNAKE1)
+        grid.vacate(0, 0)
+        grid.vacate(4, 4)
+        self.assertEqual(grid.owner(0, 0), OBSTACLE)
+        self.assertEqual(grid.owner(4, 4), EMPTY)
+        self.assertIsNot(grid.cells, ctx.obstacle_map)
+        self.assertEqual(grid.cells, bytearray(ctx.obstacle_map))
+
+    def test_dies(self):
+        ctx = get_board_context(make_board("outer_wall", width=10, height=8))
+        grid = OccupancyGrid(ctx)
+        mine = [(3, 3), (3, 4), (4, 4), (4, 3)]
+        theirs = [(6, 3), (6, 4), (6, 5)]
+        grid.place(mine, SNAKE1)
+        grid.place(theirs, SNAKE2)
+        self.assertFalse(dies(grid, (3, 2), mine, SNAKE1))
+        # Our own tail moves out of the way, anything else of ours or theirs doesn't
+        self.assertFalse(dies(grid, (4, 3), mine, SNAKE1))
+        self.assertTrue(dies(grid, (3, 4), mine, SNAKE1))
+        self.assertTrue(dies(grid, (6, 5), mine, SNAKE1))
+        self.assertTrue(dies(grid, (0, 3), mine, SNAKE1))
+        self.assertTrue(dies(grid, (-1, 3), mine, SNAKE1))
+        self.assertTrue(dies(grid, (3, 8), mine, SNAKE1))
+        # A tail sitting on the wall doesn't take the wall with it
+        on_wall = [(1, 0), (0, 0)]
+        grid.place(on_wall, SNAKE1)
+        self.assertTrue(dies(grid, (0, 0), on_wall, SNAKE1))
+
+
+class BoardContextTests(TestCase):
+    """Compiling boards into a BoardContext and caching them per board and timestamp"""
+
+    def setUp(self):
+        context._cache.clear()
+        self.addCleanup(context._cache.clear)
+
+    def test_cached(self):
+        _, _, board = save_bots_and_board()
+        ctx = get_board_context(board)
+        self.assertIs(get_board_context(Board.objects.get(pk=board.pk)), ctx)
+        # Unsaved boards are compiled every time
+        unsaved = make_board()
+        self.assertIsNot(get_board_context(unsaved), get_board_context(unsaved))
+
+    def test_edited_board(self):
+        _, _, board = save_bots_and_board()
+        old = get_board_context(board)
+
+        board.food_count = 7
+        board.board_json = generate_board("inner_maze", board.width, board.height, False, 2)
+        board.save()
+        edited = Board.objects.get(pk=board.pk)
+        ctx = get_board_context(edited)
+
+        self.assertIsNot(ctx, old)
+        self.assertEqual(ctx.food_count, 7)
+        self.assertEqual(ctx.obstacle_map, BoardContext(edited).obstacle_map)
+        self.assertNotEqual(ctx.obstacle_map, old.obstacle_map)
+        self.assertIs(get_board_context(edited), ctx)
+
+    def test_evicts_least_recently_used(self):
+        _, _, first = save_bots_and_board()
+        second = Board.objects.create(name="second", width=20, height=12, board_json=generate_board("open", 20, 12, False, 1))
+        third = Board.objects.create(name="third", width=20, height=12, board_json=generate_board("open", 20, 12, True, 1))
+        with mock.patch.object(context, "CONTEXT_CACHE_SIZE", 2):
+            ctx = get_board_context(first)
+            get_board_context(second)
+            # Using the first one again keeps it, so the third pushes out the second
+            self.assertIs(get_board_context(first), ctx)
+            get_board_context(third)
+            self.assertIs(get_board_context(first), ctx)
+            self.assertEqual(len(context._cache), 2)
+            self.assertNotIn((second.pk, second.timestamp), context._cache)
+
+    def test_neighbors(self):
+        for wrap in (False, True):
+            ctx = get_board_context(make_board(width=6, height=4, wrap=wrap))
+            for i in range(ctx.width * ctx.height):
+                x, y = ctx.position(i)
+                for d, (dx, dy) in enumerate(((0, -1), (1, 0), (0, 1), (-1, 0))):
+                    nx, ny = x + dx, y + dy
+                    if wrap:
+                        expected = ctx.index(nx % ctx.width, ny % ctx.height)
+                    else:
+                        expected = ctx.index(nx, ny) if 0 <= nx < ctx.width and 0 <= ny < ctx.height else -1
+                    self.assertEqual(ctx.neighbors[i][d], expected, (wrap, x, y, DIRECTIONS[d]))
+
+
+class GameStateTests(SimpleTestCase):
+    """step_game advancing one GameState in place"""
+
+    # sha256 of every turn of seeded reference games. Anything that changes how a seed plays out has to bump
+    # ENGINE_VERSION (see seeding.py) and then these get updated along with it.
+    REFERENCE_ENGINE = 2
+    REFERENCE_GAMES = (
+        ((), {}, 2024, "1721ebb8c46a7d3e658c6ab633b85982a0f20f8d45c4e8574f95e606dbc82fa4"),
+        ((), {"width": 16, "height": 10, "food_count": 4, "wrap": True}, 7, "0ecfbde5f410f310be4bf2491c361d43ae0518aa9b392acefdb9f074fd43232b"),
+    )
+
+    def test_reference_games(self):
+        self.assertEqual(ENGINE_VERSION, self.REFERENCE_ENGINE)
+        for args, kwargs, seed, digest in self.REFERENCE_GAMES:
+            with self.subTest(kwargs=kwargs, seed=seed):
+                turns, _ = play_recorded(make_board(*args, **kwargs), seed, max_turns=500)
+                self.assertEqual(hashlib.sha256(json.dumps(turns, sort_keys=True).encode()).hexdigest(), digest)
+
+    def test_dead_snakes_stay_put(self):
+        turns, _ = play_recorded(make_board(width=16, height=10, food_count=4, wrap=True), 7, max_turns=500)
+        for alive, move, body in (("bot1_alive", "bot1_move", "bot1_body"), ("bot2_alive", "bot2_move", "bot2_body")):
+            # The turn it dies on still has the move that killed it, after that it doesn't move at all
+            died = next(t for t in turns if not t[alive])["move_number"]
+            self.assertNotEqual(turns[died][move], "NONE")
+            for turn in turns[died:]:
+                self.assertFalse(turn[alive])
+                self.assertEqual(turn[body], turns[died - 1][body])
+            for turn in turns[died + 1:]:
+                self.assertEqual(turn[move], "NONE")
+
+    def test_snapshot_is_a_copy(self):
+        bot1, bot2 = make_bots()
+        ctx = get_board_context(make_board())
+        state = GameState.start(ctx, 5)
+        self.assertFalse(hasattr(state, "__dict__"))
+        before = state.snapshot()
+        frozen = json.dumps(before, default=str)
+        for _ in range(20):
+            step_game(state, bot1, bot2, ctx)
+        self.assertEqual(json.dumps(before, default=str), frozen)
+        self.assertEqual(state.move_number, 20)
+        self.assertNotEqual(state.snapshot()["bot1_body"], before["bot1_body"])
+
+
+class FreeCellSetTests(SimpleTestCase):
+    """The apple respawn sampler, checked against a plain set"""
+
+    def assertConsistent(self, cells, expected):
+        self.assertEqual(sorted(cells.cells), sorted(expected))
+        self.assertEqual(len(cells), len(expected))
+        for k, i in enumerate(cells.cells):
+            self.assertEqual(cells.pos[i], k)
+        self.assertEqual(sum(1 for k in cells.pos if k >= 0), len(expected))
+
+    def test_add_and_discard(self):
+        cells = FreeCellSet(10, [1, 3, 5])
+        cells.add(3)
+        cells.add(7)
+        cells.discard(1)
+        cells.discard(4)
+        self.assertConsistent(cells, {3, 5, 7})
+        self.assertIn(7, cells)
+        self.assertNotIn(1, cells)
+
+    def test_pop_random(self):
+        rng = random.Random(1)
+        cells = FreeCellSet(50, range(0, 50, 2))
+        popped = [cells.pop_random(rng) for _ in range(25)]
+        self.assertEqual(sorted(popped), list(range(0, 50, 2)))
+        self.assertEqual(len(cells), 0)
+        self.assertConsistent(cells, set())
+
+    def test_random_ops(self):
+        rng = random.Random(2)
+        cells = FreeCellSet(64)
+        expected = set()
+        for _ in range(2000):
+            i = rng.randrange(64)
+            op = rng.random()
+            if op < 0.45:
+                cells.add(i)
+                expected.add(i)
+            elif op < 0.9:
+                cells.discard(i)
+                expected.discard(i)
+            elif expected:
+                popped = cells.pop_random(rng)
+                self.assertIn(popped, expected)
+                expected.remove(popped)
+            self.assertConsistent(cells, expected)
+
+    def test_same_seed_same_draws(self):
+        draws = []
+        for _ in range(2):
+            rng = random.Random(3)
+            cells = FreeCellSet(100, range(100))
+            draws.append([cells.pop_random(rng) for _ in range(30)])
+        self.assertEqual(draws[0], draws[1])
+
+    def test_engine_keeps_it_in_sync(self):
+        # Every turn the set has to be exactly the spawn cells with no snake and no apple in them
+        bot1, bot2 = make_bots()
+        ctx = get_board_context(make_board("inner_maze", food_count=5))
+        state = GameState.start(ctx, 11)
+
+        def on_turn(s):
+            apples = {ctx.index(x, y) for x, y in s.apple_positions}
+            free = {i for i in range(ctx.width * ctx.height) if ctx.spawn_map[i] and not s.grid.cells[i] and i not in apples}
+            self.assertConsistent(s.spawnable, free)
+
+        on_turn(state)
+        play_match(state, bot1, bot2, ctx, 300, on_turn=on_turn)
+
+
+class ReplayFromSeedTests(TestCase):
+    """Playing a stored match again from its seed and params"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.bot1, cls.bot2, cls.board = save_bots_and_board()
+
+    def assertSameMatch(self, match, results):
+        for field in ("winner", "total_turns", "apples_a", "apples_b", "a_survival_time", "b_survival_time", "a_cut_off", "b_cut_off"):
+            self.assertEqual(getattr(match, field), results[field], field)
+
+    def test_same_match(self):
+        match = run_match(self.bot1, self.bot2, self.board, max_turns=300, seed=1234)
+        match = Match.objects.get(pk=match.pk)
+        results, blob = replay_from_seed(match)
+        self.assertSameMatch(match, results)
+        self.assertEqual(blob, bytes(match.replay))
+
+    def test_early_stop(self):
+        match = run_match(self.bot1, self.bot2, self.board, max_turns=2000, seed=99, termination=EARLY_STOP_POLICIES)
+        match = Match.objects.get(pk=match.pk)
+        self.assertTrue(match.terminated_by)
+        results, blob = replay_from_seed(match)
+        self.assertSameMatch(match, results)
+        self.assertEqual(results["terminated_by"], match.terminated_by)
+        self.assertEqual(blob, bytes(match.replay))
+
+    def test_without_saved_replay(self):
+        # get_replay plays it again, with the food count the match had even after the board is edited
+        saved = run_match(self.bot1, self.bot2, self.board, max_turns=300, seed=55)
+        match = run_match(self.bot1, self.bot2, self.board, max_turns=300, seed=55, save_replay=False)
+        self.board.food_count = 8
+        self.board.save()
+        match = Match.objects.get(pk=match.pk)
+        self.assertIsNone(match.replay)
+        self.assertTrue(match.is_replayable())
+        self.assertEqual(match.get_replay().blob, bytes(saved.replay))
+
+    def test_simulated_run_matches(self):
+        match = run_match(self.bot1, self.bot2, self.board, max_turns=300, seed=7)
+        self.assertSameMatch(match, run_match(self.bot1, self.bot2, self.board, max_turns=300, seed=7, simulate=True))
+
+
+class MoveEventWriteTests(TransactionTestCase):
+    """
+    Saving a match's MoveEvents in batches, all at once or from the writer thread.
+    Not a TestCase since the writer thread has its own connection and only sees committed rows.
+    """
+
+    def setUp(self):
+        self.bot1, self.bot2, self.board = save_bots_and_board()
+        self.turns, _ = play_recorded(make_board(), 21, max_turns=300)
+
+    def saved_turns(self, match):
+        fields = list(self.turns[0])
+        return list(MoveEvent.objects.filter(match=match).order_by("move_number").values(*fields))
+
+    def test_bulk(self):
+        with CaptureQueriesContext(connection) as queries:
+            match = run_match(self.bot1, self.bot2, self.board, max_turns=300, seed=21, save_move_events=True, batch_size=37)
+        self.assertEqual(self.saved_turns(match), self.turns)
+        inserts = [q for q in queries if q["sql"].startswith("INSERT") and MoveEvent._meta.db_table in q["sql"]]
+        self.assertEqual(len(inserts), -(-len(self.turns) // 37))
+        self.assertEqual(match.persist_stats["mode"], "bulk")
+        self.assertEqual(match.persist_stats["rows"], len(self.turns))
+
+    def test_writer_thread(self):
+        match = run_match(
+            self.bot1, self.bot2, self.board, max_turns=300, seed=21, save_move_events=True, batch_size=37, background_writer=True,
+        )
+        self.assertEqual(self.saved_turns(match), self.turns)
+        self.assertEqual(match.persist_stats["mode"], "thread")
+        self.assertEqual(match.persist_stats["rows"], len(self.turns))
+        self.assertEqual(bytes(Match.objects.get(pk=match.pk).replay), bytes(match.replay))
+
+    def test_failed_write_leaves_nothing(self):
+        # The error from the writer thread comes back out of run_match, and the match goes with it
+        for target, background_writer in (("project.engine.persist.bulk_write_moves", True), ("project.engine.run_match.bulk_write_moves", False)):
+            with self.subTest(background_writer=background_writer):
+                with mock.patch(target, side_effect=RuntimeError("disk full")):
+                    with self.assertRaisesMessage(RuntimeError, "disk full"):
+                        run_match(self.bot1, self.bot2, self.board, max_turns=300, seed=21, save_move_events=True,
+                                  background_writer=background_writer)
+                self.assertFalse(Match.objects.exists())
+                self.assertFalse(MoveEvent.objects.exists())
+                self.assertFalse(BotBoardStats.objects.exists())
+
+
+class InstrumentTests(SimpleTestCase):
+    """Per-phase engine profiling"""
+
+    def test_profile_doesnt_change_the_match(self):
+        bot1, bot2 = make_bots()
+        board = make_board()
+        plain = run_match(bot1, bot2, board, max_turns=300, simulate=True, seed=8)
+        profiled = run_match(bot1, bot2, board, max_turns=300, simulate=True, seed=8, profile=True)
+        summary = profiled.pop("profile")
+        self.assertEqual(profiled, plain)
+
+        self.assertEqual(summary["matches"], 1)
+        self.assertEqual(summary["counts"]["turns"], plain["total_turns"])
+        self.assertGreater(summary["counts"]["respawn_draws"], 0)
+        self.assertEqual(set(summary["seconds"]), set(PHASES))
+        self.assertAlmostEqual(sum(summary["share"].values()), 1.0)
+
+    def test_merge(self):
+        first, second = EngineProfile(), EngineProfile()
+        for profile, seconds, turns in ((first, 0.5, 10), (second, 1.5, 30)):
+            profile.matches = 1
+            profile.add("scoring", seconds)
+            profile.count("turns", turns)
+        merged = merge_summaries([first.summary(), second.summary()])
+        self.assertEqual(merged["matches"], 2)
+        self.assertEqual(merged["seconds"]["scoring"], 2.0)
+        self.assertEqual(merged["counts"]["turns"], 40)
+        self.assertEqual(merged["us_per_turn"]["scoring"], 2.0 * 1e6 / 40)
+
+    def test_simulation_counts(self):
+        # The same work gets counted whether the runs are played here or in a process pool
+        bot1, bot2 = make_bots()
+        board = make_board(width=20, height=12)
+        summaries = [
+            simulate_matches(bot1, bot2, board, 6, seed=4, workers=workers, max_turns=200, profile=True)["profile"]
+            for workers in (1, 2)
+        ]
+        self.assertEqual(summaries[0]["matches"], 6)
+        self.assertEqual(summaries[0]["counts"], summaries[1]["counts"])
+
+
+class StatsTests(TestCase):
+    """BotBoardStats/BotGlobalStats updates, one match at a time or batched"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.bots = [Bot.objects.create(name=name) for name in ("A", "B", "C")]
+        cls.boards = [Board.objects.create(name=name, board_json={}) for name in ("one", "two")]
+
+    def random_results(self, rng):
+        winner = rng.choice((0, 1, 2))
+        return {
+            "winner": winner,
+            "a_survival_time": rng.randrange(1, 500),
+            "b_survival_time": rng.randrange(1, 500),
+            "apples_a": rng.randrange(30),
+            "apples_b": rng.randrange(30),
+            "a_cut_off": winner != 1 and rng.random() < 0.3,
+            "b_cut_off": winner != 2 and rng.random() < 0.3,
+        }
+
+    def random_matches(self, count, seed):
+        rng = random.Random(seed)
+        pks = [bot.pk for bot in self.bots]
+        matches = []
+        for _ in range(count):
+            # Bots play themselves too, both sides have to count
+            matches.append((rng.choice(pks), rng.choice(pks), rng.choice(self.boards).pk, self.random_results(rng)))
+        return matches
+
+    def expected(self, matches):
+        """What the stats should add up to, worked out by hand"""
+        totals = {}
+        for bot1, bot2, board, results in matches:
+            for key, change in match_changes(bot1, bot2, board, results):
+                total = totals.setdefault(key, [0] * len(STAT_FIELDS))
+                for i, value in enumerate(change):
+                    total[i] += value
+        return totals
+
+    def board_stats(self):
+        return {(row["bot"], row["board"]): [row[field] for field in STAT_FIELDS] for row in BotBoardStats.objects.values("bot", "board", *STAT_FIELDS)}
+
+    def assertGlobalStatsMatch(self):
+        aggregated = {row["bot"]: row for row in aggregate_global_stats()}
+        stored = {row.bot_id: row for row in BotGlobalStats.objects.all()}
+        self.assertEqual(set(aggregated), set(stored))
+        for bot, row in aggregated.items():
+            for field in STAT_FIELDS:
+                self.assertEqual(getattr(stored[bot], field), row[field], field)
+            self.assertAlmostEqual(stored[bot].win_rate, row["win_rate"])
+
+    def test_one_match_at_a_time(self):
+        matches = self.random_matches(60, 1)
+        for bot1, bot2, board, results in matches:
+            batch = StatsBatch()
+            batch.add_results(bot1, bot2, board, results)
+            batch.flush()
+        self.assertEqual(self.board_stats(), self.expected(matches))
+        self.assertGlobalStatsMatch()
+
+    def test_batched(self):
+        matches = self.random_matches(200, 2)
+        batch = StatsBatch()
+        for i, (bot1, bot2, board, results) in enumerate(matches):
+            batch.add_results(bot1, bot2, board, results)
+            if i % 70 == 69:
+                self.assertEqual(batch.flush(), 70)
+        batch.flush()
+        self.assertEqual(self.board_stats(), self.expected(matches))
+        self.assertGlobalStatsMatch()
+
+    def test_bot_playing_itself(self):
+        bot, board = self.bots[0].pk, self.boards[0].pk
+        batch = StatsBatch()
+        batch.add_results(bot, bot, board, {"winner": 1, "a_survival_time": 40, "b_survival_time": 30, "apples_a": 5, "apples_b": 2})
+        batch.flush()
+        stats = BotBoardStats.objects.get(bot=bot, board=board)
+        self.assertEqual([getattr(stats, field) for field in STAT_FIELDS], [2, 1, 1, 0, 70, 7, 2])
+
+    def test_cut_off_survival_left_out(self):
+        bot1, bot2, board = self.bots[0].pk, self.bots[1].pk, self.boards[0].pk
+        apply_stats(dict(match_changes(bot1, bot2, board, {
+            "winner": 1, "a_survival_time": 300, "b_survival_time": 120, "apples_a": 9, "apples_b": 4,
+            "a_cut_off": True, "b_cut_off": False,
+        })))
+        winner = BotBoardStats.objects.get(bot=bot1, board=board)
+        self.assertEqual((winner.turns_sum, winner.turns_games, winner.apples_sum), (0, 0, 9))
+        loser = BotGlobalStats.objects.get(bot=bot2)
+        self.assertEqual((loser.turns_sum, loser.turns_games, loser.win_rate), (120, 1, 0.0))
+
+
+class ConfidenceTests(SimpleTestCase):
+    """Intervals in confidence.py and simulations stopping once they're narrow enough"""
+
+    def test_z_value(self):
+        self.assertAlmostEqual(z_value(0.95), 1.959964, places=5)
+        self.assertAlmostEqual(z_value(0.99), 2.575829, places=5)
+
+    def test_wilson_interval(self):
+        self.assertEqual(wilson_interval(0, 0), (0.0, 1.0))
+        # Known values, and it doesn't collapse when one bot wins everything
+        lo, hi = wilson_interval(50, 100)
+        self.assertAlmostEqual(lo, 0.4038, places=4)
+        self.assertAlmostEqual(hi, 0.5962, places=4)
+        lo, hi = wilson_interval(15, 15)
+        self.assertAlmostEqual(lo, 0.7961, places=4)
+        self.assertAlmostEqual(hi, 1.0)
+        lo, hi = wilson_interval(0, 15)
+        self.assertAlmostEqual(lo, 0.0)
+        self.assertAlmostEqual(hi, 1 - 0.7961, places=4)
+
+    def test_wilson_interval_narrows(self):
+        widths = [half_width(wilson_interval(n * 3 // 10, n)) for n in (10, 100, 1000, 10000)]
+        self.assertEqual(widths, sorted(widths, reverse=True))
+        self.assertLess(widths[-1], 0.01)
+        for n in (10, 100, 1000):
+            lo, hi = wilson_interval(n * 3 // 10, n)
+            self.assertLessEqual(lo, 0.3)
+            self.assertGreaterEqual(hi, 0.3)
+
+    def test_mean_interval(self):
+        self.assertEqual(mean_interval(0, 0, 0), (0.0, 0.0))
+        self.assertEqual(mean_interval(1, 4, 16), (4.0, 4.0))
+        # 2, 4, 4, 4, 5, 5, 7, 9: mean 5, sample variance 32/7
+        values = [2, 4, 4, 4, 5, 5, 7, 9]
+        lo, hi = mean_interval(len(values), sum(values), sum(v * v for v in values))
+        self.assertAlmostEqual((lo + hi) / 2, 5.0)
+        self.assertAlmostEqual(half_width((lo, hi)), 1.959964 * (32 / 7 / 8) ** 0.5, places=5)
+
+    def test_precise_enough(self):
+        estimate = WinRateEstimate()
+        results = {"winner": 1, "apples_a": 5, "apples_b": 1}
+        for _ in range(MIN_RUNS - 1):
+            estimate.add(results)
+        # Never before MIN_RUNS, however lopsided
+        self.assertFalse(estimate.precise_enough(margin=0.5))
+        estimate.add(results)
+        self.assertTrue(estimate.precise_enough(margin=0.5))
+        self.assertFalse(estimate.precise_enough(margin=0.01))
+        self.assertTrue(estimate.precise_enough(apples_margin=0.1))
+        estimate.add({"winner": 2, "apples_a": 0, "apples_b": 9})
+        self.assertFalse(estimate.precise_enough(apples_margin=0.1))
+        self.assertTrue(estimate.precise_enough())
+
+    def test_adaptive_stops_early(self):
+        bot1, bot2 = make_bots()
+        board = make_board(width=20, height=12)
+        # A margin any 10 runs get inside stops right at MIN_RUNS
+        results = simulate_matches(bot1, bot2, board, 200, seed=5, workers=1, max_turns=150, margin=0.3)
+        self.assertEqual(results["runs"], MIN_RUNS)
+        self.assertTrue(results["adaptive"]["stopped_early"])
+        self.assertLessEqual(half_width(results["bot1"]["win_rate_ci"]), 0.3)
+
+        # And those runs are exactly the first MIN_RUNS of the same seed
+        fixed = simulate_matches(bot1, bot2, board, MIN_RUNS, seed=5, workers=1, max_turns=150)
+        for bot in ("bot1", "bot2"):
+            for field in ("wins", "losses", "draws", "avg_apples", "win_rate_ci"):
+                self.assertEqual(results[bot][field], fixed[bot][field])
+        self.assertIsNone(fixed["adaptive"])
+
+    def test_adaptive_runs_to_the_cap(self):
+        bot1, bot2 = make_bots()
+        results = simulate_matches(bot1, bot2, make_board(width=20, height=12), 15, seed=5, workers=1, max_turns=150, margin=0.001)
+        self.assertEqual(results["runs"], 15)
+        self.assertFalse(results["adaptive"]["stopped_early"])
+
+
+class MatchJobTests(TestCase):
+    """Claiming and running queued matches"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.bot1, cls.bot2, cls.board = save_bots_and_board()
+
+    def queue(self, count=1):
+        return [enqueue_match(self.bot1, self.bot2, self.board, seed=i, max_turns=50) for i in range(count)]
+
+    def test_oldest_first_and_only_once(self):
+        first, second = self.queue(2)
+        self.assertEqual(claim_job("a").pk, first.pk)
+        self.assertEqual(claim_job("b").pk, second.pk)
+        self.assertIsNone(claim_job("c"))
+        self.assertEqual(MatchJob.objects.get(pk=first.pk).worker, "a")
+        self.assertEqual(MatchJob.objects.get(pk=second.pk).worker, "b")
+
+    def test_no_double_claim(self):
+        # "a" claims the job in between "b" picking it and trying to take it, "b" has to back off
+        (job,) = self.queue()
+        patch, raced = racing(lambda: claim_job("a"))
+        with patch:
+            self.assertIsNone(claim_job("b"))
+        self.assertEqual(raced[0].pk, job.pk)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker), (MatchJob.RUNNING, "a"))
+
+    def test_lost_race_takes_the_next_job(self):
+        first, second = self.queue(2)
+        patch, raced = racing(lambda: claim_job("a"))
+        with patch:
+            self.assertEqual(claim_job("b").pk, second.pk)
+        self.assertEqual(raced[0].pk, first.pk)
+
+    def test_stale_job_claimed_again(self):
+        (job,) = self.queue()
+        claim_job("a")
+        self.assertIsNone(claim_job("b"))
+
+        # "a" stopped reporting progress
+        MatchJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(seconds=JOB_STALE_SECONDS + 1))
+        self.assertEqual(claim_job("b").pk, job.pk)
+        self.assertEqual(MatchJob.objects.get(pk=job.pk).worker, "b")
+
+    def test_run_job(self):
+        self.queue()
+        match = run_job(claim_job("a"))
+        job = MatchJob.objects.get()
+        self.assertEqual(job.status, MatchJob.DONE)
+        self.assertEqual(job.match_id, match.pk)
+        self.assertIsNotNone(match.winner)
+
+    def test_worker_that_lost_its_job(self):
+        # "a" went stale and "b" took over, "a" finishing late mustn't leave a second match behind
+        self.queue()
+        late = claim_job("a")
+        MatchJob.objects.update(updated_at=timezone.now() - timedelta(seconds=JOB_STALE_SECONDS + 1))
+        match = run_job(claim_job("b"))
+        self.assertIsNone(run_job(late))
+        self.assertEqual(list(Match.objects.values_list("pk", flat=True)), [match.pk])
+        self.assertEqual(MatchJob.objects.get().worker, "b")
+
+
+class SimulationCacheTests(TestCase):
+    """Storing simulation results and finding them again"""
+
+    OPTIONS = {"margin": None, "apples_margin": None, "confidence": 0.95, "batch": False}
+
+    def setUp(self):
+        self.bot1, self.bot2, self.board = save_bots_and_board()
+
+    def store(self, seed, runs=10, options=OPTIONS):
+        # The cache doesn't look inside the results, so they don't need to be real
+        results = {"seed": seed, "runs": runs, "bot1": {"name": "old", "color": "old"}, "bot2": {"name": "old", "color": "old"}}
+        cache_simulation(self.bot1, self.bot2, self.board, runs, options, results)
+        return results
+
+    def lookup(self, seed, runs=10, options=OPTIONS):
+        return get_cached_simulation(self.bot1, self.bot2, self.board, runs, seed, options)
+
+    def test_hit(self):
+        self.store(5)
+        results = self.lookup(5)
+        self.assertEqual((results["seed"], results["runs"]), (5, 10))
+        # Names and colors come from the bots now, not from when it was stored
+        self.assertEqual(results["bot1"]["name"], self.bot1.name)
+        self.assertEqual(results["bot2"]["color"], self.bot2.color)
+        self.assertEqual(SimulationRun.objects.get().hits, 1)
+
+    def test_misses(self):
+        self.store(5)
+        self.assertIsNone(self.lookup(6))
+        self.assertIsNone(self.lookup(5, runs=11))
+        self.assertIsNone(self.lookup(5, options=dict(self.OPTIONS, batch=True)))
+        self.assertIsNone(self.lookup(5, options=dict(self.OPTIONS, termination=list(EARLY_STOP_POLICIES))))
+        self.assertIsNone(self.lookup(5, options=dict(self.OPTIONS, margin=0.05)))
+
+        # Renaming a bot keeps its simulations, changing how it plays doesn't
+        self.bot1.name = "Renamed"
+        self.bot1.save()
+        self.assertEqual(self.lookup(5)["bot1"]["name"], "Renamed")
+        self.bot1.greediness += 0.1
+        self.bot1.save()
+        self.assertIsNone(self.lookup(5))
+
+    def test_edited_board(self):
+        self.store(5)
+        self.board.food_count += 1
+        self.board.save()
+        self.assertIsNone(self.lookup(5))
+
+    def test_any_seed(self):
+        # Without a seed the most recently used one comes back
+        self.store(1)
+        self.store(2)
+        self.assertEqual(self.lookup(None)["seed"], 2)
+        self.lookup(1)
+        self.assertEqual(self.lookup(None)["seed"], 1)
+
+    def test_stored_twice(self):
+        self.store(5)
+        self.store(5)
+        self.assertEqual(SimulationRun.objects.count(), 1)
+
+    @override_settings(SNAKE_SIMULATION_CACHE_SIZE=2, SNAKE_SIMULATION_CACHE_DAYS=30)
+    def test_eviction(self):
+        for seed in (1, 2):
+            self.store(seed)
+        self.lookup(1)
+        self.store(3)
+        self.assertEqual(sorted(SimulationRun.objects.values_list("seed", flat=True)), [1, 3])
+
+        SimulationRun.objects.filter(seed=1).update(last_used=timezone.now() - timedelta(days=31))
+        self.store(4)
+        self.assertEqual(sorted(SimulationRun.objects.values_list("seed", flat=True)), [3, 4])
+
+    def test_worker_stores_for_the_view(self):
+        # A simulation a worker finished comes straight back the next time the form asks for it
+        options = {"margin": None, "apples_margin": None, "confidence": 0.95}
+        queue_simulation(self.bot1, self.bot2, self.board, 5, seed=9, options=options)
+        self.assertTrue(run_simulation_job(claim_simulation("worker")))
+
+        data = {"bot1": self.bot1.pk, "bot2": self.bot2.pk, "board": self.board.pk, "runs": 5, "confidence": 0.95, "seed": 9}
+        response = self.client.post(reverse("simulate"), data)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["cached"])
+        self.assertEqual(response.context["results"], SimulationJob.objects.get().results)
+        self.assertEqual(SimulationJob.objects.count(), 1)
+
+
+class SimulationUnitTests(TestCase):
+    """Leasing simulation units out to workers and merging what they played"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.bot1, cls.bot2, cls.board = save_bots_and_board()
+
+    def queue(self, runs=6, unit_size=3):
+        return enqueue_simulations("test", pairings([self.bot1, self.bot2], [self.board]), runs, 42, unit_size=unit_size, max_turns=50)
+
+    def expire(self, unit):
+        SimulationUnit.objects.filter(pk=unit.pk).update(lease_until=timezone.now() - timedelta(seconds=1))
+
+    def test_leased_once(self):
+        self.assertEqual(self.queue(), 2)
+        a = claim_unit("a")
+        b = claim_unit("b")
+        self.assertNotEqual(a.pk, b.pk)
+        self.assertIsNone(claim_unit("c"))
+        self.assertEqual((a.status, a.worker, a.attempts), (SimulationUnit.RUNNING, "a", 1))
+        self.assertGreater(a.lease_until, timezone.now())
+
+    def test_no_double_claim(self):
+        self.queue(runs=3)
+        patch, raced = racing(lambda: claim_unit("a"))
+        with patch:
+            self.assertIsNone(claim_unit("b"))
+        unit = SimulationUnit.objects.get()
+        self.assertEqual(raced[0].pk, unit.pk)
+        self.assertEqual((unit.worker, unit.attempts), ("a", 1))
+
+    def test_expired_lease_claimed_again(self):
+        self.queue(runs=3)
+        late = claim_unit("a")
+        self.expire(late)
+        unit = claim_unit("b")
+        self.assertEqual((unit.pk, unit.worker, unit.attempts), (late.pk, "b", 2))
+
+        # "a" coming back to life can't touch it any more, only "b"'s results count
+        self.assertFalse(run_unit(late))
+        self.assertTrue(run_unit(unit))
+        unit.refresh_from_db()
+        self.assertEqual((unit.status, unit.worker, unit.results["matches"]), (SimulationUnit.DONE, "b", 3))
+
+    def test_lease_runs_out_too_often(self):
+        self.queue(runs=3)
+        for attempt in range(UNIT_MAX_ATTEMPTS):
+            self.expire(claim_unit(f"w{attempt}"))
+        self.assertIsNone(claim_unit("last"))
+        self.assertEqual(SimulationUnit.objects.get().status, SimulationUnit.FAILED)
+
+    def test_merged_once(self):
+        self.queue()
+        while (unit := claim_unit("a")) is not None:
+            run_unit(unit)
+        self.assertEqual(merge_units("test"), (2, 6))
+        self.assertEqual(merge_units("test"), (0, 0))
+        stats = BotBoardStats.objects.get(bot=self.bot1, board=self.board)
+        self.assertEqual(stats.games, 6)
+        self.assertEqual(BotGlobalStats.objects.get(bot=self.bot2).games, 6)
+
+    def test_board_edited_after_queueing(self):
+        # Units play the board they were queued with
+        self.queue(runs=3)
+        before = play_unit(SimulationUnit.objects.get())
+        self.board.food_count = 7
+        self.board.board_json = generate_board("inner_maze", self.board.width, self.board.height, False, 1)
+        self.board.save()
+        self.assertEqual(play_unit(claim_unit("a"))["stats"], before["stats"])
+
+
+@override_settings(SNAKE_REPLAY_CACHE="default")
+class ReplayCacheTests(TestCase):
+    """Finished replays served from the cache with ETags"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.bot1, cls.bot2, cls.board = save_bots_and_board()
+        cls.match = run_match(cls.bot1, cls.bot2, cls.board, max_turns=200, seed=8)
+        cls.frames = list(cls.match.get_replay().frames())
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("move_events_api", kwargs={"match_pk": self.match.pk})
+
+    def test_gzip_and_etag(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(response.content)), self.frames)
+        self.assertEqual(int(response["X-Total-Turns"]), self.match.total_turns)
+        self.assertEqual(response["Cache-Control"], f"private, max-age={REPLAY_MAX_AGE}, must-revalidate")
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+        etag = f'"{get_replay_payload("json", self.match.pk)["etag"]}-gzip"'
+        self.assertEqual(response["ETag"], etag)
+
+    def test_plain_body(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(json.loads(response.content), self.frames)
+        # The cached copy gives the same thing
+        self.assertEqual(json.loads(self.client.get(self.url).content), self.frames)
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")["ETag"]
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+        # Any encoding's tag means the client has this replay
+        plain = etag.replace("-gzip", "")
+        self.assertEqual(self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=f'"other", {plain}').status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_columns(self):
+        url = reverse("replay_columns_api", kwargs={"match_pk": self.match.pk})
+        response = self.client.get(url)
+        self.assertEqual(json.loads(response.content), self.match.get_replay().columns())
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+    def test_windows_not_cached(self):
+        response = self.client.get(self.url, {"from_turn": 5, "to_turn": 9})
+        self.assertEqual(response.json(), self.frames[5:10])
+        self.assertFalse(response.has_header("ETag"))
+        self.assertIsNone(get_replay_payload("json", self.match.pk))
+
+    def test_unfinished_match_not_cached(self):
+        Match.objects.filter(pk=self.match.pk).update(winner=None)
+        response = self.client.get(self.url)
+        self.assertEqual(response.json(), self.frames)
+        self.assertIsNone(get_replay_payload("json", self.match.pk))
+
+    def test_deleting_drops_the_cache(self):
+        # Deleting the bot takes its matches with it, their replays can't be served any more
+        self.client.get(self.url)
+        self.assertIsNotNone(get_replay_payload("json", self.match.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bot1.delete()
+        self.assertIsNone(get_replay_payload("json", self.match.pk))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+@override_settings(SNAKE_REPLAY_CACHE="default")
+class MoveEventAPITests(TestCase):
+    """Turn windows and streaming in the move event API"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.bot1, cls.bot2, cls.board = save_bots_and_board()
+        cls.match = run_match(cls.bot1, cls.bot2, cls.board, max_turns=500, seed=21, save_move_events=True)
+        cls.frames = list(cls.match.get_replay().frames())
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("move_events_api", kwargs={"match_pk": self.match.pk})
+
+    def test_bad_turns(self):
+        for params, field in (
+            ({"from_turn": "abc"}, "from_turn"),
+            ({"to_turn": "1.5"}, "to_turn"),
+            ({"from_turn": -1}, "from_turn"),
+            ({"from_turn": 2, "to_turn": -3}, "to_turn"),
+            ({"stream": 1, "from_turn": "x"}, "from_turn"),
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(field, response.json())
+
+    def test_windows(self):
+        last = self.match.total_turns
+        for params, expected in (
+            ({"from_turn": 10, "to_turn": 20}, self.frames[10:21]),
+            ({"from_turn": last - 2}, self.frames[-3:]),
+            ({"to_turn": 3}, self.frames[:4]),
+            ({"from_turn": 20, "to_turn": 10}, []),
+            ({"from_turn": last + 10}, []),
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), expected)
+                self.assertEqual(int(response["X-Total-Turns"]), last)
+
+    def test_stream(self):
+        response = self.client.get(self.url, {"stream": 1, "from_turn": 100})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], self.frames[100:])
+
+    def test_move_events_fallback(self):
+        # Older matches only have MoveEvent rows, windows come out of those the same way
+        Match.objects.filter(pk=self.match.pk).update(replay=None, seed=None)
+        response = self.client.get(self.url, {"from_turn": 40, "to_turn": 45})
+        self.assertEqual(response.json(), self.frames[40:46])
+        self.assertEqual(int(response["X-Total-Turns"]), self.match.total_turns)
+        self.assertEqual(self.client.get(self.url, {"to_turn": "x"}).status_code, 400)
+
+
+class TournamentTests(TestCase):
+    """Tournaments played by match workers, and handing one over to another worker"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.bot1, cls.bot2, cls.board = save_bots_and_board()
+        cls.bot3 = Bot.objects.create(name="Hungry", greediness=1.2, caution=1.4)
+
+    def setUp(self):
+        self.tournament = Tournament.objects.create(name="test", rounds=2, max_turns=60, seed=3)
+        self.tournament.boards.set([self.board])
+        self.tournament.bots.set([self.bot1, self.bot2, self.bot3])
+        queue_tournament(self.tournament)
+
+    def go_quiet(self):
+        Tournament.objects.filter(pk=self.tournament.pk).update(updated_at=timezone.now() - timedelta(seconds=TOURNAMENT_STALE_SECONDS + 1))
+
+    def test_run_by_a_worker(self):
+        run_tournament_job(claim_tournament("a"))
+        self.tournament.refresh_from_db()
+        self.assertEqual(self.tournament.status, Tournament.DONE)
+        self.assertEqual((self.tournament.played, self.tournament.scheduled), (6, 6))
+        self.assertEqual(self.tournament.matches.count(), 6)
+        self.assertEqual(schedule(self.tournament), [])
+
+    def test_taken_over_halfway(self):
+        # "a" goes quiet after its first batch and "b" takes over, "a" has to stop and "b" only plays the rest
+        first = claim_tournament("a")
+        mine = Tournament.objects.filter(pk=first.pk, worker="a", status=Tournament.RUNNING)
+        taken = []
+
+        def progress(played, scheduled, rate):
+            if not taken:
+                self.go_quiet()
+                taken.append(claim_tournament("b"))
+
+        played, _ = run_tournament(first, workers=1, batch_size=2, progress=progress, mine=mine)
+        self.assertEqual(played, 2)
+        self.assertEqual(self.tournament.matches.count(), 2)
+        self.assertEqual(len(schedule(self.tournament)), 4)
+
+        run_tournament_job(taken[0])
+        self.tournament.refresh_from_db()
+        self.assertEqual((self.tournament.status, self.tournament.worker), (Tournament.DONE, "b"))
+        self.assertEqual(self.tournament.matches.count(), 6)
+        self.assertEqual(BotGlobalStats.objects.get(bot=self.bot1).games, 4)
+
+    def test_heartbeat(self):
+        # A worker that's still playing keeps the tournament, one that lost it stops on its next heartbeat
+        first = claim_tournament("a")
+        with mock.patch("project.engine.tournament.TOURNAMENT_HEARTBEAT_SECONDS", 0):
+            before = Tournament.objects.get().updated_at
+            run_tournament(first, workers=1, batch_size=100, mine=Tournament.objects.filter(pk=first.pk, worker="a"))
+            self.assertGreater(Tournament.objects.get().updated_at, before)
+            Match.objects.all().delete()
+
+            played, _ = run_tournament(first, workers=1, batch_size=100, mine=Tournament.objects.filter(pk=first.pk, worker="z"))
+        self.assertEqual(played, 0)
+        self.assertFalse(Match.objects.exists())
+
+    def test_lost_worker_marks_nothing(self):
+        first = claim_tournament("a")
+        self.go_quiet()
+        claim_tournament("b")
+        run_tournament_job(first)
+        self.tournament.refresh_from_db()
+        self.assertEqual((self.tournament.status, self.tournament.worker), (Tournament.RUNNING, "b"))
+        self.assertFalse(self.tournament.matches.exists())
+
+
+class GlobalStatsRebuildTests(TestCase):
+    """Working BotGlobalStats out again from BotBoardStats"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.bots = [Bot.objects.create(name=name) for name in ("A", "B", "C")]
+        cls.boards = [Board.objects.create(name=name, board_json={}) for name in ("one", "two")]
+
+    def setUp(self):
+        a, b, c = (bot.pk for bot in self.bots)
+        one, two = (board.pk for board in self.boards)
+        results = {"winner": 1, "a_survival_time": 50, "b_survival_time": 20, "apples_a": 4, "apples_b": 1}
+        batch = StatsBatch()
+        batch.add_results(a, b, one, results)
+        batch.add_results(b, a, two, results)
+        batch.add_results(c, a, two, results)
+        batch.flush()
+
+    def assertGlobalStatsMatch(self):
+        aggregated = {row["bot"]: [row[field] for field in STAT_FIELDS] for row in aggregate_global_stats()}
+        stored = {row["bot"]: [row[field] for field in STAT_FIELDS] for row in BotGlobalStats.objects.values("bot", *STAT_FIELDS)}
+        self.assertEqual(stored, aggregated)
+
+    def test_rebuild(self):
+        BotGlobalStats.objects.filter(bot=self.bots[0]).update(games=999, wins=0)
+        BotGlobalStats.objects.filter(bot=self.bots[1]).delete()
+        self.assertEqual(rebuild_global_stats(), 3)
+        self.assertGlobalStatsMatch()
+        self.assertAlmostEqual(BotGlobalStats.objects.get(bot=self.bots[0]).win_rate, 1 / 3)
+
+    def test_bot_without_stats_loses_its_row(self):
+        BotBoardStats.objects.filter(bot=self.bots[2]).delete()
+        rebuild_global_stats([self.bots[2].pk])
+        self.assertFalse(BotGlobalStats.objects.filter(bot=self.bots[2]).exists())
+
+    def test_match_finishing_during_rebuild(self):
+        # A match adds its stats (creating the bot's global row) after the rebuild read the totals
+        BotGlobalStats.objects.all().delete()
+        real = leaderboard.aggregate_global_stats
+        raced = []
+
+        def racing_aggregate(bots=None):
+            if raced:
+                return real(bots)
+            rows = list(real(bots))
+            raced.append(True)
+            batch = StatsBatch()
+            batch.add_results(self.bots[0].pk, self.bots[2].pk, self.boards[0].pk, {"winner": 2, "a_survival_time": 9, "b_survival_time": 30, "apples_a": 0, "apples_b": 3})
+            batch.flush()
+            return rows
+
+        with mock.patch.object(leaderboard, "aggregate_global_stats", racing_aggregate):
+            rebuild_global_stats()
+        self.assertGlobalStatsMatch()
+        self.assertEqual(BotGlobalStats.objects.get(bot=self.bots[0]).games, 4)
+
+    def test_delete_board(self):
+        response = self.client.post(reverse("delete_board", kwargs={"pk": self.boards[1].pk}))
+        self.assertEqual(response.status_code, 302)
+        self.assertGlobalStatsMatch()
+        # C only ever played on that board
+        self.assertFalse(BotGlobalStats.objects.filter(bot=self.bots[2]).exists())
+
+    def test_delete_board_is_all_or_nothing(self):
+        with mock.patch("project.views.rebuild_global_stats", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post(reverse("delete_board", kwargs={"pk": self.boards[1].pk}))
+        self.assertTrue(Board.objects.filter(pk=self.boards[1].pk).exists())
+        self.assertGlobalStatsMatch()
+
+
+# Reads a columns payload on stdin and prints the turns static/js/replay_columns.js rebuilds from it
+DECODE_COLUMNS_JS = """
+const { decodeReplayColumns } = require(process.argv[1]);
+let input = "";
+process.stdin.on("data", (chunk) => input += chunk);
+process.stdin.on("end", () => process.stdout.write(JSON.stringify(decodeReplayColumns(JSON.parse(input)))));
+"""
+
+
+@skipUnless(shutil.which("node"), "needs node to run the replay page's decoder")
+class ReplayColumnsTests(TestCase):
+    """The replay page's columns decoder has to rebuild exactly the turns Replay.frames gives"""
+
+    def decode(self, columns):
+        script = str(settings.BASE_DIR / "static" / "js" / "replay_columns.js")
+        out = subprocess.run(["node", "-e", DECODE_COLUMNS_JS, script], input=json.dumps(columns), capture_output=True, text=True, check=True)
+        return json.loads(out.stdout)
+
+    def test_round_trip(self):
+        for board, seed, interval in (
+            (make_board(), 7, 100),
+            (make_board("inner_maze", food_count=6), 4, 9),
+            (make_board(width=20, height=12, wrap=True), 3, 5),
+        ):
+            with self.subTest(seed=seed):
+                turns, (blob,) = play_recorded(board, seed, keyframe_intervals=(interval,))
+                replay = Replay(blob)
+                self.assertEqual(self.decode(replay.columns()), turns)
+
+    def test_api(self):
+        # A saved seeded match, through the same API the replay page loads it from
+        bot1, bot2, board = save_bots_and_board()
+        match = run_match(bot1, bot2, board, max_turns=300, seed=31)
+        with override_settings(SNAKE_REPLAY_CACHE="default"):
+            cache.clear()
+            columns = self.client.get(reverse("replay_columns_api", kwargs={"match_pk": match.pk})).json()
+        self.assertEqual(self.decode(columns), list(match.get_replay().frames()))
+
+        page = self.client.get(reverse("match_replay", kwargs={"pk": match.pk}))
+        self.assertContains(page, reverse("replay_columns_api", kwargs={"match_pk": match.pk}))
+        self.assertContains(page, "js/replay_columns.js")
+
+
+class DistanceFieldTests(SimpleTestCase):
+    """The incrementally updated apple distance field against a fresh BFS every turn"""
+
+    def check_game(self, board, seed, max_turns=400):
+        bot1, bot2 = make_bots()
+        ctx = get_board_context(board)
+        state = GameState.start(ctx, seed)
+        checked = []
+
+        def on_turn(s):
+            fresh = AppleDistanceField(ctx, s.grid, s.apple_positions)
+            self.assertEqual(s.field.dist, fresh.dist, f"turn {s.move_number}")
+
+            for bot, body, other, direction, alive, me in (
+                (bot1, s.bot1_body, s.bot2_body, s.bot1_move, s.bot1_alive, SNAKE1),
+                (bot2, s.bot2_body, s.bot1_body, s.bot2_move, s.bot2_alive, SNAKE2),
+            ):
+                if not alive:
+                    continue
+                head = body[0]
+                step = s.field.first_step(ctx.neighbors[ctx.index(*head)])
+                self.assertEqual(
+                    None if step is None else DIRECTIONS[step],
+                    first_step_toward_target(head, s.apple_positions, ctx, s.grid) if s.apple_positions else None,
+                )
+
+                # Same move either way, from the same point in the match's random numbers
+                moves = []
+                for field in (s.field, None):
+                    rng = random.Random()
+                    rng.setstate(s.rng.getstate())
+                    moves.append(choose_bot_move(bot, body, other, s.apple_positions, ctx, direction, s.grid, me, rng, field=field))
+                self.assertEqual(moves[0], moves[1])
+            checked.append(s.move_number)
+
+        on_turn(state)
+        play_match(state, bot1, bot2, ctx, max_turns, on_turn=on_turn)
+        return checked
+
+    def test_open_board(self):
+        self.assertGreater(len(self.check_game(make_board(food_count=4), 5)), 100)
+
+    def test_maze(self):
+        for seed in (1, 2, 3):
+            with self.subTest(seed=seed):
+                self.check_game(make_board("inner_maze", food_count=6), seed)
+
+    def test_wrap_board(self):
+        self.check_game(make_board("open", width=20, height=12, food_count=2, wrap=True), 9)
+
+    def test_crowded_board(self):
+        # Small board with lots of apples, so bodies cut the board up and apples get walled off
+        self.check_game(make_board("outer_wall", width=10, height=8, food_count=8), 4, max_turns=300)
+
+
+class BatchEngineTests(SimpleTestCase):
+    """The numpy batch engine against the one match at a time engine"""
+
+    def check_distances(self, board, seed, k=40, body_chance=0.35, apple_chance=0.02):
+        """The packed BFS of every row against AppleDistanceField on random bodies, apples and heads"""
+        ctx = get_board_context(board)
+        n = ctx.width * ctx.height
+        bot1, bot2 = make_bots()
+        rng = np.random.default_rng(seed)
+        matches = BatchMatches(BatchBoard(ctx), bot1, bot2, k, rng)
+
+        # Scatter snake cells and apples over the free cells, some rows with no apple at all
+        free = matches.occ[:, :n] == EMPTY
+        body = free & (rng.random((k, n)) < body_chance)
+        matches.occ[:, :n][body] = np.where(rng.random((k, n)) < 0.5, SNAKE1, SNAKE2)[body]
+        matches.apples[:] = False
+        matches.apples[:, :n] = (matches.occ[:, :n] == EMPTY) & (rng.random((k, n)) < apple_chance)
+        matches.apples[:3] = False
+        matches.alive = [rng.random(k) < 0.8, rng.random(k) < 0.8]
+        heads = [rng.integers(0, n, k), rng.integers(0, n, k)]
+
+        dist = matches._apple_distances(heads)
+        for row in range(k):
+            apples = [(c % ctx.width, c // ctx.width) for c in np.flatnonzero(matches.apples[row, :n])]
+            field = AppleDistanceField(ctx, SimpleNamespace(cells=bytes(matches.occ[row, :n])), apples)
+            for s in range(2):
+                expected = [field.dist[j] if j >= 0 else UNREACHABLE for j in ctx.neighbors[heads[s][row]]]
+                got = [int(d) for d in dist[row, s]]
+                msg = f"row {row} snake {s}"
+
+                # Whatever the search got to is exact
+                for e, g in zip(expected, got):
+                    if g != UNREACHED:
+                        self.assertEqual(g, e, msg)
+                if not matches.alive[s][row]:
+                    continue
+                # and it always gets as far as the closest neighbor, with every tie for it
+                closest = min(expected)
+                if closest == UNREACHABLE:
+                    self.assertEqual(got, [UNREACHED] * 4, msg)
+                else:
+                    self.assertEqual([e == closest for e in expected], [g == closest for g in got], msg)
+
+    def test_distances_open_board(self):
+        self.check_distances(make_board(width=12, height=8), 1)
+
+    def test_distances_maze(self):
+        self.check_distances(make_board("inner_maze", width=20, height=14), 2)
+
+    def test_distances_wrap_board(self):
+        self.check_distances(make_board(width=12, height=8, wrap=True), 3)
+
+    def test_distances_wide_boards(self):
+        # More than one word per board row, and a row that ends right on a word.
+        # Only an apple or two per match and fewer bodies so the paths have to cross from one word to the next
+        for width, wrap in ((70, False), (70, True), (128, True)):
+            with self.subTest(width=width, wrap=wrap):
+                board = make_board(width=width, height=6, wrap=wrap)
+                self.check_distances(board, width, k=60, body_chance=0.1, apple_chance=0.003)
+
+    def test_agrees_with_scalar_engine(self):
+        # The batch engine uses its own random numbers so the runs differ, but the same bots on the same board
+        # should come out the same within sampling error (about 3 standard errors for the win rates here)
+        bot1, bot2 = make_bots()
+        board = make_board(width=20, height=12)
+        scalar = simulate_matches(bot1, bot2, board, 200, seed=11, workers=1, max_turns=120)
+        batch = simulate_batch(bot1, bot2, board, 1000, seed=11, max_turns=120)
+
+        for results, runs in ((scalar, 200), (batch, 1000)):
+            self.assertEqual(results["bot1"]["wins"] + results["bot1"]["losses"] + results["bot1"]["draws"], runs)
+        for bot in ("bot1", "bot2"):
+            with self.subTest(bot=bot):
+                self.assertAlmostEqual(scalar[bot]["wins"] / 200, batch[bot]["wins"] / 1000, delta=0.1)
+                self.assertAlmostEqual(scalar[bot]["avg_apples"], batch[bot]["avg_apples"], delta=0.1 * scalar[bot]["avg_apples"])
+                self.assertAlmostEqual(scalar[bot]["avg_turns"], batch[bot]["avg_turns"], delta=0.1 * scalar[bot]["avg_turns"])
+        self.assertAlmostEqual(scalar["avg_total_turns"], batch["avg_total_turns"], delta=0.1 * scalar["avg_total_turns"])
+
+
+class ParallelSimulationTests(SimpleTestCase):
+    """Simulating across a process pool against playing the same seeds one after another"""
+
+    def setUp(self):
+        self.bot1, self.bot2 = make_bots()
+        self.board = make_board(width=20, height=12)
+        self.ctx = get_board_context(self.board)
+
+    def play_serial(self, seeds, max_turns):
+        return [play_match(GameState.start(self.ctx, seed), self.bot1, self.bot2, self.ctx, max_turns) for seed in seeds]
+
+    def test_same_results_as_serial(self):
+        seeds = list(range(100, 124))
+        serial = self.play_serial(seeds, 200)
+        for window in (None, 3):
+            with self.subTest(window=window):
+                parallel = simulate_parallel(bot_params(self.bot1), bot_params(self.bot2), self.ctx, seeds, 200, 2, window=window)
+                self.assertEqual(list(parallel), serial)
+
+    def test_iter_simulation_workers(self):
+        # Every results dict along the way comes out the same, not just the last one
+        runs = [
+            [json.dumps(results, sort_keys=True) for results in iter_simulation(self.bot1, self.bot2, self.board, 16, seed=5, workers=workers, max_turns=200)]
+            for workers in (1, 2)
+        ]
+        self.assertEqual(len(runs[0]), 16)
+        self.assertEqual(runs[0], runs[1])
+
+    def test_closing_stops_submitting(self):
+        handed_out = []
+
+        def seeds():
+            for seed in range(1000):
+                handed_out.append(seed)
+                yield seed
+
+        parallel = simulate_parallel(bot_params(self.bot1), bot_params(self.bot2), self.ctx, seeds(), 200, 2, window=4)
+        first = [next(parallel) for _ in range(3)]
+        parallel.close()
+
+        # The window ahead of the third result and nothing after the close
+        self.assertEqual(handed_out, list(range(7)))
+        self.assertEqual(first, self.play_serial(range(3), 200))
+
+    def test_adaptive_stops_handing_out_seeds(self):
+        # Lopsided pairing so the interval gets narrow long before the cap, and only a window (workers * 2)
+        # of seeds past the last run gets handed out
+        bot1, bot2 = Bot(pk=1, name="Greedy", greediness=2.0), Bot(pk=2, name="Lost", chaos=1.0)
+        with mock.patch("project.engine.run_match.derive_seed", wraps=derive_seed) as seeds:
+            for results in iter_simulation(bot1, bot2, self.board, 5000, seed=3, workers=2, max_turns=200, margin=0.15):
+                pass
+        self.assertTrue(results["adaptive"]["stopped_early"])
+        self.assertLess(results["runs"], 100)
+        self.assertLessEqual(seeds.call_count, results["runs"] + 4)
+
+
+class TerminationTests(TestCase):
+    """The early stopping policies on crafted positions and on real matches"""
+
+    # A snake of 3 going clockwise around the 2x2 square at (1, 1), a new turn every step
+    SQUARE = [(1, 1), (2, 1), (2, 2), (1, 2)]
+    INTO = ["UP", "RIGHT", "DOWN", "LEFT"]
+
+    def looping_state(self, turn, random_picks=0):
+        square = self.SQUARE
+        return SimpleNamespace(
+            bot1_body=[square[(turn - i) % 4] for i in range(3)],
+            bot2_body=[(8, 5), (9, 5), (10, 5)],
+            bot1_move=self.INTO[turn % 4],
+            bot2_move="LEFT",
+            bot1_alive=True,
+            bot2_alive=False,
+            apple_positions=[(5, 5), (7, 2)],
+            random_picks=random_picks,
+        )
+
+    def test_incremental_hash(self):
+        # The bodies' hash kept up turn by turn against hashing both bodies from scratch
+        bot1, bot2 = make_bots()
+        for board, seed in ((make_board(), 3), (make_board(width=12, height=8, food_count=6, wrap=True), 4)):
+            ctx = get_board_context(board)
+            state = GameState.start(ctx, seed)
+            policy = RepetitionLoop(ctx, state, bot1, bot2)
+            while (state.bot1_alive or state.bot2_alive) and state.move_number < 400:
+                step_game(state, bot1, bot2, ctx)
+                policy.check(state, 0, 0)
+                self.assertEqual(policy.bodies, RepetitionLoop(ctx, state, bot1, bot2).bodies, f"turn {state.move_number}")
+
+    def test_body_order(self):
+        # Same cells in a different order are different positions
+        ctx = get_board_context(make_board())
+        square = self.SQUARE
+        bodies = set()
+        for body in (square, square[::-1], square[1:] + square[:1], [square[0], square[3], square[2], square[1]]):
+            state = SimpleNamespace(bot1_body=body, bot2_body=[(8, 5), (9, 5)])
+            bodies.add(RepetitionLoop(ctx, state, None, None).bodies)
+        self.assertEqual(len(bodies), 4)
+
+    def test_loop_fires(self):
+        ctx = get_board_context(make_board())
+        policy = RepetitionLoop(ctx, self.looping_state(0), None, None)
+        calls = [policy.check(self.looping_state(turn), 2, 1) for turn in range(1, 4 * REPETITION_LIMIT)]
+        # Every position comes back every 4 turns, the first one to come up REPETITION_LIMIT times ends it
+        self.assertEqual(calls[:4 * (REPETITION_LIMIT - 1)], [None] * 4 * (REPETITION_LIMIT - 1))
+        self.assertEqual(calls[4 * (REPETITION_LIMIT - 1)], 1)
+
+    def test_loop_needs_the_same_position(self):
+        ctx = get_board_context(make_board())
+        for name, state, apples in (
+            # A random pick every turn
+            ("random", lambda turn: self.looping_state(turn, random_picks=turn), lambda turn: (2, 1)),
+            # An apple every turn
+            ("apples", self.looping_state, lambda turn: (turn, 1)),
+        ):
+            with self.subTest(name):
+                policy = RepetitionLoop(ctx, state(0), None, None)
+                self.assertEqual([policy.check(state(turn), *apples(turn)) for turn in range(1, 30)], [None] * 29)
+
+    def test_decided(self):
+        policy = DecidedOutcome(None, None, None, None)
+        for alive, apples, winner in (
+            ((True, False), (3, 2), 1),
+            ((False, True), (1, 4), 2),
+            # Tied, the survivor can still win
+            ((True, False), (2, 2), None),
+            # The dead one's ahead, the survivor can still catch up
+            ((False, True), (5, 4), None),
+            ((True, True), (9, 0), None),
+            ((False, False), (3, 1), None),
+        ):
+            with self.subTest(alive=alive, apples=apples):
+                state = SimpleNamespace(bot1_alive=alive[0], bot2_alive=alive[1])
+                self.assertEqual(policy.check(state, *apples), winner)
+
+    def test_recorded_on_match(self):
+        bot1, bot2, board = save_bots_and_board()
+        circler1 = Bot.objects.create(name="Circler 1", chaos=0, circliness=2)
+        circler2 = Bot.objects.create(name="Circler 2", chaos=0, circliness=2)
+        for policy, bots, seed in ((DecidedOutcome.name, (bot1, bot2), 3), (RepetitionLoop.name, (circler1, circler2), 2)):
+            with self.subTest(policy):
+                match = run_match(*bots, board, max_turns=1500, seed=seed, termination=(policy,))
+                match = Match.objects.get(pk=match.pk)
+                self.assertEqual(match.terminated_by, policy)
+                self.assertLess(match.total_turns, 1500)
+                self.assertEqual(match.params["termination"], [policy])
+
+                # Without the policy nothing stops it
+                played = run_match(*bots, board, max_turns=1500, seed=seed, simulate=True)
+                self.assertIsNone(played["terminated_by"])
+                self.assertEqual(played["winner"], match.winner)
+
+    def test_loop_plays_out(self):
+        # A loop ends the match with exactly what playing it out to max_turns gives
+        circler1 = Bot(pk=1, name="Circler 1", chaos=0, circliness=2)
+        circler2 = Bot(pk=2, name="Circler 2", chaos=0, circliness=2)
+        board = make_board()
+        stopped = 0
+        for seed in range(8):
+            looped = run_match(circler1, circler2, board, max_turns=600, seed=seed, simulate=True, termination=(RepetitionLoop.name,))
+            played = run_match(circler1, circler2, board, max_turns=600, seed=seed, simulate=True)
+            if looped["terminated_by"] is not None:
+                stopped += 1
+            for key in ("winner", "apples_a", "apples_b", "a_survival_time", "b_survival_time"):
+                self.assertEqual(looped[key], played[key], f"seed {seed} {key}")
+        self.assertGreater(stopped, 4)
+
+
+class SweepTests(TestCase):
+    """Parameter sweeps scoring candidates on the same games, in a pool and from checkpoints"""
+
+    def setUp(self):
+        self.bot1, self.bot2, self.board = save_bots_and_board()
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def make_sweep(self, strategy="random", checkpoint=None, **kwargs):
+        kwargs = dict({"games": 2, "max_turns": 100, "seed": 3, "candidates": 4, "population": 4, "generations": 2}, **kwargs)
+        return Sweep(strategy, [self.bot1, self.bot2], [self.board], checkpoint=checkpoint, **kwargs)
+
+    def test_candidates(self):
+        self.assertEqual(snap("chaos", 1.7), 1.0)
+        self.assertEqual(snap("direction_bias", -0.33), -0.35)
+        candidates = grid_candidates(2)
+        self.assertEqual(len(candidates), 2 ** 6)
+        self.assertEqual(len({candidate_key(c) for c in candidates}), 2 ** 6)
+        for field, (lo, hi) in PARAM_RANGES.items():
+            self.assertEqual({c[field] for c in candidates}, {lo, hi})
+        self.assertEqual(score({"games": 4, "wins": 1, "losses": 1, "draws": 2, "apples": 10}), (0.5, 2.5))
+
+    def test_workers(self):
+        # Same candidates, same games, same scores in a process pool
+        self.assertEqual(self.make_sweep().run(workers=1), self.make_sweep().run(workers=2, chunk=3))
+
+    def test_resume(self):
+        path = f"{self.dir}/sweep.json"
+        self.make_sweep(checkpoint=path).run()
+
+        # Asking for more candidates only plays the new ones
+        more = self.make_sweep(checkpoint=path, candidates=6)
+        self.assertTrue(more.load())
+        with mock.patch.object(sweep, "play_candidate", wraps=sweep.play_candidate) as played:
+            results = more.run()
+        self.assertEqual(played.call_count, 2)
+        self.assertEqual(results, self.make_sweep(candidates=6).run())
+        with open(path) as f:
+            self.assertEqual(len(json.load(f)["evaluated"]), 6)
+
+    def test_resume_evolve(self):
+        # Stopped after the first generation, the second is bred from the same parents
+        path = f"{self.dir}/evolve.json"
+        self.make_sweep("evolve", checkpoint=path, generations=1).run()
+        resumed = self.make_sweep("evolve", checkpoint=path)
+        resumed.load()
+        results = resumed.run()
+        fresh = self.make_sweep("evolve")
+        self.assertEqual(results, fresh.run())
+        self.assertEqual(resumed.generation_lists, fresh.generation_lists)
+
+    def test_wrong_checkpoint(self):
+        path = f"{self.dir}/sweep.json"
+        self.make_sweep(checkpoint=path).run()
+        with self.assertRaises(ValueError):
+            self.make_sweep(checkpoint=path, max_turns=200).load()
+
+    def test_save_top(self):
+        results = self.make_sweep().run()
+        bots = save_top(results, 2, prefix="Test")
+        self.assertEqual([bot.name for bot in bots], ["Test #1", "Test #2"])
+        for bot, result in zip(bots, results):
+            bot.refresh_from_db()
+            self.assertEqual(bot_params(bot), result["params"])
+
+
+class SimulationStreamTests(TestCase):
+    """The live simulation page following a SimulationJob over Server-Sent Events"""
+
+    def setUp(self):
+        self.bot1, self.bot2, self.board = save_bots_and_board()
+        self.job = queue_simulation(self.bot1, self.bot2, self.board, 5, seed=9, options={"margin": None, "apples_margin": None, "confidence": 0.95})
+        self.url = reverse("simulate_stream", kwargs={"pk": self.job.pk})
+
+    def stream(self, worker=()):
+        """
+        Read the whole stream, with the worker steps (functions) run in place of the sleeps between polls.
+        Returns the (event, data) of every message, event None for the comments.
+        """
+        steps = iter(worker)
+        with mock.patch("project.views.time.sleep", side_effect=lambda seconds: next(steps)()):
+            response = self.client.get(self.url)
+            self.assertEqual(response["Content-Type"], "text/event-stream")
+            body = b"".join(response.streaming_content).decode()
+        messages = []
+        for message in body.split("\n\n")[:-1]:
+            if message.startswith(":"):
+                messages.append((None, None))
+            else:
+                event, data = message.split("\n")
+                messages.append((event[len("event: "):], json.loads(data[len("data: "):])))
+        return messages
+
+    def write(self, status=SimulationJob.RUNNING, **fields):
+        """A worker step that writes onto the job"""
+        def step():
+            SimulationJob.objects.filter(pk=self.job.pk).update(status=status, updated_at=timezone.now(), **fields)
+        return step
+
+    def test_progress(self):
+        messages = self.stream([
+            self.write(results={"runs": 1}),
+            # Nothing new since the last poll
+            lambda: None,
+            self.write(results={"runs": 2}),
+            self.write(SimulationJob.DONE, results={"runs": 5}),
+        ])
+        self.assertEqual(messages, [
+            (None, None),
+            ("run", {"runs": 1}),
+            (None, None),
+            ("run", {"runs": 2}),
+            ("done", {"runs": 5}),
+        ])
+
+    def test_stopped(self):
+        for status, error in ((SimulationJob.CANCELLED, ""), (SimulationJob.FAILED, "Traceback")):
+            with self.subTest(status):
+                SimulationJob.objects.filter(pk=self.job.pk).update(status=status, error=error)
+                self.assertEqual(self.stream(), [("stopped", {"status": status, "error": error})])
+
+    def test_cancel(self):
+        url = reverse("simulate_cancel", kwargs={"pk": self.job.pk})
+        self.assertEqual(self.client.post(url).json(), {"cancelled": True})
+        self.assertEqual(SimulationJob.objects.get(pk=self.job.pk).status, SimulationJob.CANCELLED)
+        self.assertEqual(self.client.post(url).json(), {"cancelled": False})
+        self.assertEqual(self.client.post(reverse("simulate_cancel", kwargs={"pk": self.job.pk + 1})).status_code, 404)
+        # and no worker picks it up anymore
+        self.assertIsNone(claim_simulation("worker"))
+
+    def test_live_page(self):
+        # Asking for a simulation that isn't stored queues it and links the page to its stream
+        data = {"bot1": self.bot1.pk, "bot2": self.bot2.pk, "board": self.board.pk, "runs": 5, "confidence": 0.95, "seed": 4}
+        response = self.client.post(reverse("simulate"), data)
+        job = SimulationJob.objects.latest("pk")
+        self.assertEqual(response.context["stream_url"], reverse("simulate_stream", kwargs={"pk": job.pk}))
+        self.assertEqual(response.context["results"]["runs"], 0)
+
+        self.url = response.context["stream_url"]
+        SimulationJob.objects.filter(pk=self.job.pk).delete()
+        messages = self.stream([lambda: run_simulation_job(claim_simulation("worker"))])
+        self.assertEqual(messages[-1], ("done", SimulationJob.objects.get(pk=job.pk).results))
+        self.assertEqual(messages[-1][1]["runs"], 5)
+
+    def test_disconnect_keeps_running(self):
+        # The browser going away (or reconnecting) isn't a cancel, the next stream just picks it back up
+        SimulationJob.objects.filter(pk=self.job.pk).update(watched_at=None)
+        response = self.client.get(self.url)
+        with mock.patch("project.views.time.sleep"):
+            self.assertEqual(next(iter(response.streaming_content)), b": waiting\n\n")
+        response.close()
+        job = SimulationJob.objects.get(pk=self.job.pk)
+        self.assertEqual(job.status, SimulationJob.QUEUED)
+        # and it got marked as watched
+        self.assertGreater(job.watched_at, timezone.now() - timedelta(seconds=5))
+
+        messages = self.stream([self.write(SimulationJob.DONE, results={"runs": 5})])
+        self.assertEqual(messages[-1], ("done", {"runs": 5}))
+
+    def test_unwatched(self):
+        gone = timezone.now() - timedelta(seconds=SIMULATION_WATCH_GRACE_SECONDS + 1)
+
+        # Nobody came back while it was queued, so no worker plays it
+        SimulationJob.objects.filter(pk=self.job.pk).update(watched_at=gone)
+        self.assertIsNone(claim_simulation("worker"))
+        self.assertEqual(SimulationJob.objects.get(pk=self.job.pk).status, SimulationJob.CANCELLED)
+
+        # Nobody came back while it was running, so the worker stops on its next progress write
+        job = queue_simulation(self.bot1, self.bot2, self.board, 50, seed=9, options={"margin": None, "apples_margin": None, "confidence": 0.95})
+        job = claim_simulation("worker")
+        SimulationJob.objects.filter(pk=job.pk).update(watched_at=gone)
+        with mock.patch.object(sim_jobs, "SIMULATION_PROGRESS_SECONDS", 0):
+            self.assertFalse(run_simulation_job(job))
+        job.refresh_from_db()
+        self.assertEqual(job.status, SimulationJob.CANCELLED)
+        self.assertIsNone(job.results)
+
+    def test_watched(self):
+        # Still watched (or never meant to be), it plays out
+        for watched_at in (timezone.now(), None):
+            with self.subTest(watched_at=watched_at):
+                SimulationJob.objects.update(status=SimulationJob.DONE)
+                job = queue_simulation(self.bot1, self.bot2, self.board, 5, seed=9, options={"margin": None, "apples_margin": None, "confidence": 0.95})
+                SimulationJob.objects.filter(pk=job.pk).update(watched_at=watched_at)
+                with mock.patch.object(sim_jobs, "SIMULATION_PROGRESS_SECONDS", 0):
+                    self.assertTrue(run_simulation_job(claim_simulation("worker")))
+                self.assertEqual(SimulationJob.objects.get(pk=job.pk).status, SimulationJob.DONE)
@@ -28,12 +28,20 @@ urlpatterns = [
     path('matches/all/', MatchListView.as_view(), name="matches"),
     path('matches/all/<int:pk>/', MatchDetailView.as_view(), name="match"),
     path('matches/create/', MatchCreateView.as_view(), name="new_match"),
+    path('matches/jobs/<int:pk>/', MatchJobView.as_view(), name="match_job"),
+    path('matches/jobs/<int:pk>/status/', MatchJobStatusView.as_view(), name="match_job_status"),
     path('matches/<int:pk>/replay/', MatchReplayView.as_view(), name="match_replay"),
     path('matches/<int:pk>/delete/', MatchDeleteView.as_view(), name="delete_match"),
 
     #Leaderboards
     path('leaderboards/', LeaderboardHubView.as_view(), name="leaderboards"),
     path('leaderboards/simulate/', SimulationView.as_view(), name="simulate"),
+    path('leaderboards/simulate/<int:pk>/stream/', SimulationStreamView.as_view(), name="simulate_stream"),
+    path('leaderboards/simulate/<int:pk>/cancel/', SimulationCancelView.as_view(), name="simulate_cancel"),
+    path('leaderboards/tournaments/', TournamentListView.as_view(), name="tournaments"),
+    path('leaderboards/tournaments/create/', CreateTournamentView.as_view(), name="create_tournament"),
+    path('leaderboards/tournaments/<int:pk>/', TournamentDetailView.as_view(), name="tournament"),
+    path('leaderboards/tournaments/<int:pk>/run/', RunTournamentView.as_view(), name="run_tournament"),
     path('leaderboards/global_leaderboard/', GlobalLeaderboardView.as_view(), name="global_leaderboard"),
     path('leaderboards/board_leaderboard/', BoardLeaderboardHubView.as_view(), name="board_leaderboard_hub"),
     path('leaderboards/board_leaderboard/<int:pk>/', BoardLeaderboardView.as_view(), name="board_leaderboard"),
@@ -41,4 +49,6 @@ urlpatterns = [
 
     # Allows the JS to access MoveEvents via API by passing in match pk (clarified variable name since it's match not move event and that is a little confusing)
     path('api/move_events/<int:match_pk>/', MoveEventListAPIView.as_view(), name="move_events_api"),
+    # Same replay as columns (much smaller, static/js/replay_columns.js rebuilds the bodies for the replay page)
+    path('api/replay_columns/<int:match_pk>/', MatchColumnsAPIView.as_view(), name="replay_columns_api"),
 ]
\ No newline at end of file
@@ -9,15 +9,27 @@ from .models import *
 from .forms import *
 from django.urls import reverse
 from random import choice
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views import View
+import time
 from .engine.board_generator import generate_board
+from .engine.seeding import new_seed
 import json
-from django.shortcuts import redirect
+from django.shortcuts import redirect, get_object_or_404
 from .engine.run_match import run_match, simulate_matches
+from .engine.jobs import enqueue_match
+from .engine.sim_jobs import queue_simulation, cancel_simulation
+from .engine.leaderboard import rebuild_global_stats
+from .engine.tournament import queue_tournament
+from .engine.termination import EARLY_STOP_POLICIES
+from .engine.sim_cache import get_cached_simulation
+from .engine.replay_cache import get_replay_payload, cache_replay_payload, replay_response
 from .engine.plots import *
 from plotly.offline import plot
+from django.db import transaction
+from django.utils import timezone
 # Allows for OR query
-from django.db.models import Q
+from django.db.models import Q, Count
 
 class HomePageTemplateView(TemplateView):
     """Define a view class to display the home snake navigation page"""
@@ -122,6 +134,7 @@ class CreateBoardView(CreateView):
             height = int(width * 0.6) # 5:3 aspect ratio
             num_apples = int(request.POST.get('num_apples'))
             board_json = json.loads(request.POST.get("board_json_str"))
+            seed = int(request.POST.get('seed'))
             wraparound = board_json.get('wrap', False)
             board_type = board_json.get('type', 'open')
 
@@ -133,12 +146,14 @@ class CreateBoardView(CreateView):
                     height=height,
                     food_count=num_apples,
                     board_json=board_json,
+                    seed=seed,
                 )
                 board.save()
                 return redirect('boards')
             else:
-                # Regenerate the board
-                board_data = generate_board(board_type, width, height, wraparound)
+                # Regenerate the board (with a new seed, the same one would give the same board)
+                seed = new_seed()
+                board_data = generate_board(board_type, width, height, wraparound, seed)
                  # Convert board data to JSON string for hidden field so we can convert it BACK to JSON later
                 board_json_str = json.dumps(board_data)
 
@@ -149,6 +164,7 @@ class CreateBoardView(CreateView):
                     'height': height,
                     'num_apples': num_apples,
                     'board_json_str': board_json_str,
+                    'seed': seed,
                     'board_json': board_data,
                 }
                 return render(request, 'project/board_preview.html', context)
@@ -162,8 +178,11 @@ class CreateBoardView(CreateView):
                 height = int(width * 0.6) # 5:3 aspect ratio
                 num_apples = int(form.cleaned_data['num_apples'])
                 wraparound = form.cleaned_data['wraparound']
+                seed = form.cleaned_data['seed']
+                if seed is None:
+                    seed = new_seed()
 
-                board_data = generate_board(board_type, width, height, wraparound)
+                board_data = generate_board(board_type, width, height, wraparound, seed)
                 # Convert board data to JSON string for hidden field so we can convert it BACK to JSON later
                 board_json_str = json.dumps(board_data)
 
@@ -174,6 +193,7 @@ class CreateBoardView(CreateView):
                     'height': height,
                     'num_apples': num_apples,
                     'board_json_str': board_json_str,
+                    'seed': seed,
                     # NEED both, one for preview, one for hidden field for reconversion later
                     'board_json': board_data,
                 }
@@ -186,6 +206,15 @@ class DeleteBoardView(DeleteView):
     template_name = 'project/delete_board.html'
     context_object_name = 'board'
 
+    def form_valid(self, form):
+        """The board's BotBoardStats get deleted with it, so the global totals of those bots are worked out again.
+        Both in one transaction, so nobody ever sees the totals with the board's games still in them after it's gone."""
+        with transaction.atomic():
+            bots = list(BotBoardStats.objects.filter(board=self.object).values_list('bot', flat=True))
+            response = super().form_valid(form)
+            rebuild_global_stats(bots)
+        return response
+
     def get_success_url(self):
         return reverse('boards')
     
@@ -235,15 +264,44 @@ class MatchCreateView(FormView):
     form_class = StartMatchForm
 
     def form_valid(self, form):
-        """When the form is valid, start the match and redirect to match detail page"""
+        """When the form is valid, queue the match for a match worker and redirect to its status page"""
         bot1 = form.cleaned_data['bot1']
         bot2 = form.cleaned_data['bot2']
         board = form.cleaned_data['board']
 
-        match = run_match(bot1, bot2, board)
-
-        # Redirect to replay page
-        return redirect('match_replay', pk=match.pk)
+        job = enqueue_match(bot1, bot2, board, seed=form.cleaned_data['seed'])
+
+        # The status page sends the user on to the replay once the match is done
+        return redirect('match_job', pk=job.pk)
+
+class MatchJobView(DetailView):
+    """Define a view class to display the progress of a queued match"""
+    model = MatchJob
+    template_name = 'project/match_job.html'
+    context_object_name = 'job'
+
+    def get(self, request, *args, **kwargs):
+        """Skip straight to the replay if the match is already done"""
+        job = self.get_object()
+        if job.status == MatchJob.DONE and job.match_id:
+            return redirect('match_replay', pk=job.match_id)
+        return super().get(request, *args, **kwargs)
+
+class MatchJobStatusView(DetailView):
+    """JSON progress of a queued match, polled by the status page"""
+    model = MatchJob
+
+    def get(self, request, *args, **kwargs):
+        job = self.get_object()
+        data = {
+            "status": job.status,
+            "turn": job.turn,
+            "max_turns": job.max_turns,
+            "rows": job.rows,
+            "error": job.error,
+            "replay_url": reverse('match_replay', kwargs={'pk': job.match_id}) if job.match_id else None,
+        }
+        return JsonResponse(data)
 
 class MatchReplayView(DetailView):
     """Define a view class to display the match replay page"""
@@ -272,58 +330,10 @@ class GlobalLeaderboardView(ListView):
     paginate_by = 25
 
     def get_queryset(self):
-        """Override the queryset to give us a list of rows for the stats of each bot"""
+        """Each bot's stats across all boards, kept up to date in BotGlobalStats (see engine/leaderboard.py)
+        so the paginator only pulls one page of rows off the win rate index"""
         # use select_related to avoid the N + 1 query problem 
-        stats = BotBoardStats.objects.select_related("bot")
-        totals = {}
-
-        # Go through and accumulate each bot's total stats
-        for s in stats:
-            pk = s.bot.pk
-
-            if pk not in totals:
-                totals[pk] = {
-                    "bot": s.bot,
-                    "games": 0,
-                    "wins": 0,
-                    "losses": 0,
-                    "draws": 0,
-                    "avg_turns_sum": 0,
-                    "avg_apples_sum": 0,
-                    "entries": 0,
-                }
-            
-            t = totals[pk]
-            t["games"] += s.games
-            t["wins"] += s.wins
-            t["losses"] += s.losses
-            t["draws"] += s.draws
-            t["avg_turns_sum"] += s.avg_turns
-            t["avg_apples_sum"] += s.avg_apples
-            t["entries"] += 1
-
-        # Make rows for our html template
-        rows = []
-        for pk in totals:
-            t = totals[pk]
-            rows.append({
-                "bot": t["bot"],
-                "games": t["games"],
-                "wins": t["wins"],
-                "losses": t["losses"],
-                "draws": t["draws"],
-                "avg_turns": t["avg_turns_sum"] / t["entries"],
-                "avg_apples": t["avg_apples_sum"] / t["entries"],
-                "win_rate": t["wins"] / t["games"] if t["games"] > 0 else 0
-            })
-
-        def sort_win_rate(row):
-            return row['win_rate']
-
-        #Sort by the win rate in decreasing order
-        rows.sort(key=sort_win_rate, reverse=True)
-
-        return rows
+        return BotGlobalStats.objects.select_related("bot").order_by("-win_rate", "bot")
 
 
 class BoardLeaderboardView(ListView):
@@ -355,6 +365,121 @@ class BoardLeaderboardHubView(ListView):
     template_name = "project/board_leaderboard_hub.html"
     context_object_name = "boards"
 
+class TournamentListView(ListView):
+    """Define a view to list the round robin tournaments"""
+    model = Tournament
+    template_name = "project/tournaments.html"
+    context_object_name = "tournaments"
+    paginate_by = 25
+
+    def get_queryset(self):
+        return super().get_queryset().order_by('-created_at')
+
+class CreateTournamentView(CreateView):
+    """Define a view to set up a tournament and queue it for the match workers"""
+    template_name = "project/create_tournament.html"
+    form_class = TournamentForm
+
+    def form_valid(self, form):
+        """Pick a seed if none was given, then hand it to the workers"""
+        if form.cleaned_data['seed'] is None:
+            form.instance.seed = new_seed()
+        response = super().form_valid(form)
+        queue_tournament(self.object)
+        return response
+
+class TournamentDetailView(DetailView):
+    """Define a view to show a tournament's progress and standings"""
+    model = Tournament
+    template_name = "project/tournament.html"
+    context_object_name = "tournament"
+
+    def get_context_data(self, **kwargs):
+        """Add the standings of the tournament's matches so far"""
+        context = super().get_context_data(**kwargs)
+        tournament = self.object
+        matches = tournament.matches.all()
+
+        # Counted by the database, once for the games each bot played as bot 1 and once as bot 2
+        standings = {}
+        for side, win, loss in (('bot1', 1, 2), ('bot2', 2, 1)):
+            counts = matches.values(side, f'{side}__name').annotate(
+                games=Count('id'),
+                wins=Count('id', filter=Q(winner=win)),
+                losses=Count('id', filter=Q(winner=loss)),
+            ).order_by()
+            for c in counts:
+                row = standings.setdefault(c[side], {"name": c[f'{side}__name'], "games": 0, "wins": 0, "losses": 0})
+                row["games"] += c['games']
+                row["wins"] += c['wins']
+                row["losses"] += c['losses']
+
+        rows = list(standings.values())
+        for row in rows:
+            row["draws"] = row["games"] - row["wins"] - row["losses"]
+        rows.sort(key=lambda row: (-row["wins"], row["games"]))
+        context['standings'] = rows
+        context['match_count'] = sum(row["games"] for row in rows) // 2
+        return context
+
+class RunTournamentView(DetailView):
+    """Queue a tournament again, to resume it or play the pairings of bots added since"""
+    model = Tournament
+
+    def post(self, request, *args, **kwargs):
+        tournament = self.get_object()
+        if tournament.is_finished():
+            queue_tournament(tournament)
+        return redirect('tournament', pk=tournament.pk)
+
+# How often the live stream checks its SimulationJob for new totals (an empty comment goes out otherwise,
+# so a browser that went away is noticed within this long too)
+SIMULATION_EVENT_SECONDS = 0.25
+
+# How often the live stream marks its SimulationJob as still watched (see SIMULATION_WATCH_GRACE_SECONDS)
+SIMULATION_WATCH_SECONDS = 5
+
+
+def simulation_options(cleaned_data):
+    """The engine keyword arguments a valid SimulationForm asks for (cleaned_data["batch"] says which engine)"""
+    options = {
+        "margin": cleaned_data["margin"],
+        "apples_margin": cleaned_data["apples_margin"],
+        "confidence": cleaned_data["confidence"],
+    }
+    if cleaned_data["early_stop"]:
+        options["termination"] = EARLY_STOP_POLICIES
+    return options
+
+
+def simulation_plots(results):
+    """The 4 plotly plots of a simulation as html divs"""
+    # Only the first one carries plotly.js (~4.5MB), the rest use it from the page
+    return {
+        "plot_win_loss": plot(win_loss_plot(results), output_type="div"),
+        "plot_win_rate": plot(win_rate_plot(results), output_type="div", include_plotlyjs=False),
+        "plot_avg_turns": plot(avg_turns_plot(results), output_type="div", include_plotlyjs=False),
+        "plot_avg_apples": plot(avg_apples_plot(results), output_type="div", include_plotlyjs=False),
+    }
+
+
+def empty_results(bot1, bot2, seed, runs, options):
+    """Results of a simulation that hasn't played any runs yet, for the live page to start from"""
+    bot = {"wins": 0, "losses": 0, "draws": 0, "avg_turns": 0, "avg_apples": 0, "win_rate_ci": [0, 1], "avg_apples_ci": [0, 0]}
+    adaptive = options["margin"] is not None or options["apples_margin"] is not None
+    return {
+        "seed": seed,
+        "runs": 0,
+        "confidence": options["confidence"],
+        "bot1": dict(bot, name=bot1.name, color=bot1.color),
+        "bot2": dict(bot, name=bot2.name, color=bot2.color),
+        "termination": list(options.get("termination", ())),
+        "terminated_by": {},
+        "avg_total_turns": 0,
+        "adaptive": {"max_runs": runs} if adaptive else None,
+    }
+
+
 class SimulationView(FormView):
     """Define a view to simulate runs number of matches and show statistics
     in order to compare bots and boards more objectively"""
@@ -363,53 +488,256 @@ class SimulationView(FormView):
 
     def form_valid(self, form):
         """Overrite form_valid to simulate matches, then graph the plots, 
-        and send them to the next html template"""
-        results = simulate_matches(
-            bot1=form.cleaned_data["bot1"],
-            bot2=form.cleaned_data["bot2"],
-            board=form.cleaned_data["board"],
-            num_runs=form.cleaned_data["runs"],
-        )
+        and send them to the next html template.
+        Simulations that aren't stored yet (with either engine) are queued for a match worker and come back
+        right away as a live page that follows them through SimulationStreamView, so nobody waits on a spinner
+        (and submits it again) and the runs don't tie up the web server. Only profiled runs (at most 50
+        regular ones) are played here, since the timings are what they're for."""
+        options = simulation_options(form.cleaned_data)
+
+        bot1 = form.cleaned_data["bot1"]
+        bot2 = form.cleaned_data["bot2"]
+        board = form.cleaned_data["board"]
+        runs = form.cleaned_data["runs"]
+        seed = form.cleaned_data["seed"]
+
+        # Same bots, board, runs, seed and options as a stored simulation gives the stored results.
+        # Profiling is about timing this run, so it always plays them.
+        profile = not form.cleaned_data["batch"] and form.cleaned_data["profile"]
+        cache_options = dict(options, batch=form.cleaned_data["batch"])
+        results = None if profile else get_cached_simulation(bot1, bot2, board, runs, seed, cache_options)
+        cached = results is not None
 
         context = self.get_context_data(form=form)
+
+        if results is None and not profile:
+            job = queue_simulation(bot1, bot2, board, runs, seed, options, batch=form.cleaned_data["batch"])
+            context["results"] = empty_results(bot1, bot2, job.seed, runs, options)
+            context["stream_url"] = reverse("simulate_stream", kwargs={"pk": job.pk})
+            context["cancel_url"] = reverse("simulate_cancel", kwargs={"pk": job.pk})
+            context.update(simulation_plots(context["results"]))
+            return render(self.request, "project/simulation_results.html", context)
+
+        if results is None:
+            results = simulate_matches(bot1=bot1, bot2=bot2, board=board, num_runs=runs, seed=seed, profile=True, **options)
+
         context["results"] = results
+        context["cached"] = cached
+
+        # One row per phase for the engine profile table
+        profile = results.get("profile")
+        if profile:
+            context["profile_phases"] = [
+                {
+                    "phase": phase,
+                    "seconds": seconds,
+                    "percent": profile["share"][phase] * 100,
+                    "us_per_turn": profile["us_per_turn"][phase],
+                }
+                for phase, seconds in profile["seconds"].items()
+            ]
 
         #Call our plotting functions to get 4 html plots.
-        context["plot_win_loss"] = plot(
-            win_loss_plot(results),
-            output_type="div",
-        )
-        context["plot_win_rate"] = plot(
-            win_rate_plot(results),
-            output_type="div",
-        )
-        context["plot_avg_turns"] = plot(
-            avg_turns_plot(results),
-            output_type="div",
-        )
-        context["plot_avg_apples"] = plot(
-            avg_apples_plot(results),
-            output_type="div",
-        )
+        context.update(simulation_plots(results))
 
         return render(self.request, "project/simulation_results.html", context)
-    
 
 
+class SimulationStreamView(View):
+    """
+    Follows a SimulationJob a match worker is playing and streams its totals as Server-Sent Events:
+    a "run" event with the results dict so far whenever the worker writes new ones, then "done" with the
+    finished results, or "stopped" if it failed or was cancelled. Nothing is played here, the view just
+    reads the job every SIMULATION_EVENT_SECONDS and marks it as watched every SIMULATION_WATCH_SECONDS.
+    A dropped connection doesn't stop anything: EventSource reconnects and picks the stream back up,
+    and only a job nobody comes back to gets cancelled by its worker (see sim_jobs.py).
+    """
+
+    def get(self, request, pk, *args, **kwargs):
+        job = get_object_or_404(SimulationJob, pk=pk)
+        response = StreamingHttpResponse(self.events(job.pk), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # Otherwise nginx holds the events back until it has a full buffer
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def events(self, pk):
+        job = SimulationJob.objects.filter(pk=pk)
+        sent = None
+        watched = None
+        while True:
+            now = time.monotonic()
+            if watched is None or now - watched >= SIMULATION_WATCH_SECONDS:
+                watched = now
+                job.update(watched_at=timezone.now())
+
+            status, results, error, updated_at = job.values_list("status", "results", "error", "updated_at").get()
+            if status == SimulationJob.DONE:
+                yield f"event: done\ndata: {json.dumps(results)}\n\n"
+                return
+            if status in (SimulationJob.FAILED, SimulationJob.CANCELLED):
+                yield f"event: stopped\ndata: {json.dumps({'status': status, 'error': error})}\n\n"
+                return
+
+            if results is not None and updated_at != sent:
+                sent = updated_at
+                yield f"event: run\ndata: {json.dumps(results)}\n\n"
+            else:
+                # A comment, only there to find out if anyone's still listening
+                yield ": waiting\n\n"
+            time.sleep(SIMULATION_EVENT_SECONDS)
+
+
+class SimulationCancelView(View):
+    """Stop button of the live results page, cancels the SimulationJob so its worker stops the runs"""
+
+    def post(self, request, pk, *args, **kwargs):
+        get_object_or_404(SimulationJob, pk=pk)
+        return JsonResponse({"cancelled": cancel_simulation(pk)})
 
 
 ################################################################################
 # enable the REST API for this application
 from rest_framework import generics
+from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+from collections import namedtuple
+from .engine.replay import Replay, ReplayEncoder
+from django.db.models import Max
 from .serializers import *
 
+# How many turns go into each chunk of a streamed (NDJSON) replay
+STREAM_CHUNK_TURNS = 200
+
 class MoveEventListAPIView(generics.ListAPIView):
-    """Exposes the API to return all MoveEvents for a given Match (for the JS replay)"""
+    """
+    Exposes the API to return the MoveEvents for a given Match (for the JS replay).
+    ?from_turn=&to_turn= only returns that window of turns (inclusive), and ?stream=1 streams them
+    as newline delimited JSON (one turn per line) so the player can start before the rest arrives.
+    The X-Total-Turns header has the last turn of the whole match either way.
+    """
     queryset = MoveEvent.objects.all()
     serializer_class = MoveEventSerializer
     pagination_class = None
 
+    def turn_param(self, name):
+        """Read an optional non-negative turn number from the query string"""
+        value = self.request.query_params.get(name)
+        if value in (None, ""):
+            return None
+        try:
+            turn = int(value)
+        except ValueError:
+            raise ValidationError({name: "Must be a whole number"})
+        if turn < 0:
+            raise ValidationError({name: "Can't be negative"})
+        return turn
+
     def get_queryset(self):
-        """Override to filter by match_pk from URL"""
+        """Override to filter by match_pk from URL (and the turn window)"""
+        match_pk = self.kwargs['match_pk']
+        moves = MoveEvent.objects.filter(match__pk=match_pk).order_by('move_number')
+        from_turn = self.turn_param('from_turn')
+        to_turn = self.turn_param('to_turn')
+        if from_turn is not None:
+            moves = moves.filter(move_number__gte=from_turn)
+        if to_turn is not None:
+            moves = moves.filter(move_number__lte=to_turn)
+        return moves
+
+    def list(self, request, *args, **kwargs):
+        """Newer matches only have a compact replay, so rebuild the turns from it in the same
+        shape as MoveEventSerializer. Older matches fall back to their MoveEvent rows.
+        Whole replays of finished matches come out of the replay cache after the first request."""
+        match_pk = self.kwargs['match_pk']
+        stream = bool(request.query_params.get('stream'))
+        window = self.turn_param('from_turn') is not None or self.turn_param('to_turn') is not None
+        kind = 'ndjson' if stream else 'json'
+
+        if not window:
+            payload = get_replay_payload(kind, match_pk)
+            if payload is not None:
+                return replay_response(request, kind, payload)
+
+        match = get_object_or_404(Match, pk=match_pk)
+        replay = match.get_replay()
+        if replay is not None:
+            frames = replay.frames(self.turn_param('from_turn') or 0, self.turn_param('to_turn'))
+            total_turns = replay.total_turns
+        else:
+            frames = (MoveEventSerializer(move).data for move in self.get_queryset().iterator(chunk_size=STREAM_CHUNK_TURNS))
+            total_turns = MoveEvent.objects.filter(match=match).aggregate(last=Max('move_number'))['last'] or 0
+
+        # Matches still being played (background writer) can't be cached yet
+        cache = not window and match.winner is not None
+
+        if stream:
+            response = StreamingHttpResponse(self.ndjson(frames, match_pk if cache else None, total_turns), content_type='application/x-ndjson')
+        elif cache:
+            body = json.dumps(list(frames), separators=(',', ':')).encode()
+            return replay_response(request, kind, cache_replay_payload(kind, match_pk, body, total_turns))
+        else:
+            response = Response(list(frames))
+        response['X-Total-Turns'] = total_turns
+        return response
+
+    def ndjson(self, frames, cache_pk=None, total_turns=0):
+        """Turn the frames into chunks of newline delimited JSON, STREAM_CHUNK_TURNS turns per chunk.
+        With cache_pk the whole thing goes into the replay cache once the last chunk is sent."""
+        lines = []
+        chunks = []
+        for frame in frames:
+            lines.append(json.dumps(frame, separators=(',', ':')))
+            if len(lines) >= STREAM_CHUNK_TURNS:
+                chunks.append('\n'.join(lines) + '\n')
+                yield chunks[-1]
+                lines = []
+        if lines:
+            chunks.append('\n'.join(lines) + '\n')
+            yield chunks[-1]
+
+        if cache_pk is not None:
+            cache_replay_payload('ndjson', cache_pk, ''.join(chunks).encode(), total_turns)
+
+
+# MoveEvent fields in the order ReplayEncoder needs them, for the columnar API
+COLUMN_FIELDS = ('move_number', 'bot1_move', 'bot2_move', 'bot1_body', 'bot2_body', 'apple_positions',
+                 'bot1_alive', 'bot2_alive', 'bot1_ate', 'bot2_ate')
+MoveRow = namedtuple('MoveRow', COLUMN_FIELDS)
+
+class MatchColumnsAPIView(DetailView):
+    """
+    The whole replay of a match as column arrays (see Replay.columns) instead of one serialized
+    MoveEvent per turn: starting bodies, then per turn directions, ate/alive bitsets and spawned apples.
+    Skips DRF altogether since there's nothing to serialize per row.
+    """
+    model = Match
+    pk_url_kwarg = 'match_pk'
+
+    def get(self, request, *args, **kwargs):
         match_pk = self.kwargs['match_pk']
-        return MoveEvent.objects.filter(match__pk=match_pk).order_by('move_number')
+        payload = get_replay_payload('columns', match_pk)
+        if payload is not None:
+            return replay_response(request, 'columns', payload)
+
+        match = get_object_or_404(Match.objects.select_related('board'), pk=match_pk)
+        replay = match.get_replay()
+
+        if replay is None:
+            # Older matches only have MoveEvents, encode them on the fly straight from the rows
+            rows = match.move_events.order_by('move_number').values_list(*COLUMN_FIELDS)
+            if not rows.exists():
+                raise Http404("This match has no moves")
+            board = match.board
+            encoder = ReplayEncoder(board.width, board.height, bool(board.board_json.get('wrap', False)))
+            for row in rows.iterator(chunk_size=STREAM_CHUNK_TURNS):
+                encoder.add(MoveRow(*row))
+            replay = Replay(encoder.finish())
+
+        columns = replay.columns()
+        if match.winner is None:
+            # Still being played, don't cache half a match
+            return JsonResponse(columns, json_dumps_params={'separators': (',', ':')})
+
+        body = json.dumps(columns, separators=(',', ':')).encode()
+        return replay_response(request, 'columns', cache_replay_payload('columns', match_pk, body, replay.total_turns))
@@ -20,6 +20,8 @@
     const BASE_INTERVAL = 100; // ms at 1x speed
 
     let moves = [];
+    // true once the replay has arrived
+    let loaded = false;
     let currentIndex = 0;
     let playing = false;
     let speed = 1;
@@ -32,21 +34,23 @@
     const cellWidth = canvas.width / BOARD_WIDTH;
     const cellHeight = canvas.height / BOARD_HEIGHT;
 
-    // load move events from API
+    // load the replay from the columns API
+    // It only has each turn's moves, flags and spawned apples (a fraction of the size of every turn's
+    // bodies), decodeReplayColumns (replay_columns.js) rebuilds the turns from them.
 
     async function loadMoves() {
         try {
-            const response = await fetch(MOVE_EVENTS_API_URL);
+            const response = await fetch(REPLAY_COLUMNS_API_URL);
             if (!response.ok) {
-                console.error("Failed to load move events:", response.status);
+                console.error("Failed to load the replay:", response.status);
+                drawEmpty();
                 return;
             }
 
-            const data = await response.json();
-            // Safely process API response
-            moves = Array.isArray(data) ? data : data.results;
+            moves = decodeReplayColumns(await response.json());
+            loaded = true;
 
-            if (!Array.isArray(moves) || moves.length === 0) {
+            if (moves.length === 0) {
                 console.warn("No moves found for this match.");
                 drawEmpty();
                 return;
@@ -59,7 +63,7 @@
             renderMove(moves[0], true);
             updateUI(moves[0]);
         } catch (err) {
-            console.error("Error fetching move events:", err);
+            console.error("Error fetching the replay:", err);
         }
     }
 
@@ -225,10 +229,14 @@
     function scheduleNextFrame() {
         if (!playing) return;
 
-        if (!moves || moves.length === 0) return;
         if (currentIndex >= moves.length) {
-            // Stop at the end for now
-            playing = false;
+            if (loaded) {
+                // Stop at the end for now
+                playing = false;
+            } else {
+                // Caught up with the download, wait for more turns
+                timerId = setTimeout(scheduleNextFrame, BASE_INTERVAL / speed);
+            }
             return;
         }
 
@@ -249,7 +257,7 @@
         if (playing) return;
 
         // If we reached the end, restart
-        if (currentIndex >= moves.length) {
+        if (loaded && currentIndex >= moves.length) {
             currentIndex = 0;
             scoreBot1 = 0;
             scoreBot2 = 0;
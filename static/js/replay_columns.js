@@ -0,0 +1,96 @@
+// File: replay_columns.js
+// Author: Dawson Maska (dawsonwm@bu.edu), 10/18/2026
+// Description: Rebuilds every turn of a match from the columnar replay payload (see Replay.columns in
+// project/engine/replay.py) into the same MoveEvent-shaped objects the move event API returns, so the
+// replay page only has to download the moves, flags and spawned apples instead of both bodies every turn.
+
+(function (root) {
+    const LETTER_DIRS = { U: "UP", R: "RIGHT", D: "DOWN", L: "LEFT", N: "NONE" };
+    const DIR_DELTAS = { UP: [0, -1], RIGHT: [1, 0], DOWN: [0, 1], LEFT: [-1, 0] };
+
+    // atob isn't a global in older Node, the tests run this file there
+    const atob = root.atob || ((b64) => Buffer.from(b64, "base64").toString("binary"));
+
+    function bitsetReader(b64) {
+        const raw = atob(b64);
+        return (turn) => ((raw.charCodeAt(turn >> 3) >> (turn & 7)) & 1) === 1;
+    }
+
+    function decodeReplayColumns(columns) {
+        const width = columns.width;
+        const height = columns.height;
+        const toPos = (cell) => [cell % width, Math.floor(cell / width)];
+
+        const alive1 = bitsetReader(columns.bot1_alive);
+        const alive2 = bitsetReader(columns.bot2_alive);
+        const ate1 = bitsetReader(columns.bot1_ate);
+        const ate2 = bitsetReader(columns.bot2_ate);
+
+        // Spawned apples and keyframe resets by turn
+        const spawns = new Map();
+        for (let i = 0; i < columns.spawns.length; i += 2) {
+            const turn = columns.spawns[i];
+            if (!spawns.has(turn)) spawns.set(turn, []);
+            spawns.get(turn).push(columns.spawns[i + 1]);
+        }
+        const resets = new Map(columns.resets.map((reset) => [reset.turn, reset]));
+
+        function nextHead(body, direction) {
+            const [dx, dy] = DIR_DELTAS[direction];
+            let x = body[0] % width + dx;
+            let y = Math.floor(body[0] / width) + dy;
+            if (columns.wrap) {
+                x = (x + width) % width;
+                y = (y + height) % height;
+            }
+            return y * width + x;
+        }
+
+        let bodies = [columns.bot1_body.slice(), columns.bot2_body.slice()];
+        let apples = columns.apples.slice();
+        const frames = [];
+
+        for (let turn = 0; turn <= columns.total_turns; turn++) {
+            const dirs = [LETTER_DIRS[columns.bot1_moves[turn]], LETTER_DIRS[columns.bot2_moves[turn]]];
+            const alive = [alive1(turn), alive2(turn)];
+            const ate = [ate1(turn), ate2(turn)];
+
+            if (resets.has(turn)) {
+                const reset = resets.get(turn);
+                bodies = [reset.bot1_body.slice(), reset.bot2_body.slice()];
+                apples = reset.apples.slice();
+            } else if (turn > 0) {
+                // Same as Replay._apply_delta: bot 1 then bot 2, only snakes alive before and after the turn move
+                const wasAlive = [alive1(turn - 1), alive2(turn - 1)];
+                for (let i = 0; i < 2; i++) {
+                    if (!(alive[i] && wasAlive[i])) continue;
+                    const head = nextHead(bodies[i], dirs[i]);
+                    if (ate[i]) {
+                        apples.splice(apples.indexOf(head), 1);
+                    } else {
+                        bodies[i].pop();
+                    }
+                    bodies[i].unshift(head);
+                }
+                apples.push(...(spawns.get(turn) || []));
+            }
+
+            frames.push({
+                move_number: turn,
+                bot1_move: dirs[0],
+                bot2_move: dirs[1],
+                bot1_body: bodies[0].map(toPos),
+                bot2_body: bodies[1].map(toPos),
+                apple_positions: apples.map(toPos),
+                bot1_alive: alive[0],
+                bot2_alive: alive[1],
+                bot1_ate: ate[0],
+                bot2_ate: ate[1],
+            });
+        }
+        return frames;
+    }
+
+    root.decodeReplayColumns = decodeReplayColumns;
+    if (typeof module !== "undefined") module.exports = { decodeReplayColumns };
+})(typeof window !== "undefined" ? window : globalThis);